@@ -0,0 +1,42 @@
+# Pruebas de las unidades de Zeta Motion que no dependen de Blender.
+# El paquete se registra sin ejecutar su __init__ (que registra operadores y
+# propiedades en bpy); fuera de Blender, un módulo `bpy` mínimo permite
+# importar los módulos que solo lo usan para definir operadores.
+
+import os
+import sys
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE_DIR = os.path.join(ROOT, "zeta_motion")
+
+
+def _install_package_shell():
+    if "zeta_motion" in sys.modules:
+        return
+    package = types.ModuleType("zeta_motion")
+    package.__path__ = [PACKAGE_DIR]
+    sys.modules["zeta_motion"] = package
+
+
+def _install_bpy_standin():
+    try:
+        import bpy  # noqa: F401  (dentro de Blender se usa el real)
+        return
+    except ImportError:
+        pass
+    bpy = types.ModuleType("bpy")
+    prop = lambda *args, **kwargs: None
+    bpy.types = types.SimpleNamespace(Operator=object, Panel=object, PropertyGroup=object, Scene=object)
+    bpy.props = types.SimpleNamespace(StringProperty=prop, BoolProperty=prop, IntProperty=prop,
+                                      FloatProperty=prop, EnumProperty=prop)
+    bpy.app = types.SimpleNamespace(timers=types.SimpleNamespace(register=lambda *a, **k: None,
+                                                                 is_registered=lambda f: False,
+                                                                 unregister=lambda f: None))
+    bpy.path = types.SimpleNamespace(abspath=lambda p: p)
+    bpy.utils = types.SimpleNamespace(register_class=lambda c: None, unregister_class=lambda c: None)
+    sys.modules["bpy"] = bpy
+
+
+_install_package_shell()
+_install_bpy_standin()
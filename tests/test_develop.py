@@ -0,0 +1,24 @@
+import numpy as np
+from PIL import Image
+
+from zeta_motion import zm_develop
+
+
+def test_write_tiff16_round_trip(tmp_path):
+    # Varias strips, la última incompleta
+    rows = zm_develop.TIFF_ROWS_PER_STRIP * 2 + 5
+    rgb = np.random.default_rng(0).integers(0, 65536, (rows, 37, 3), dtype=np.uint16)
+    path = tmp_path / "shot_00001.tif"
+    zm_develop.write_tiff16(str(path), rgb)
+    with Image.open(path) as img:
+        assert img.size == (37, rows)
+        # PIL lo abre a 8 bits: debe ser el byte alto de cada muestra
+        assert np.array_equal(np.asarray(img.convert("RGB")), (rgb >> 8).astype(np.uint8))
+
+
+def test_write_tiff16_single_strip(tmp_path):
+    rgb = np.full((3, 2, 3), 0x1234, dtype=np.uint16)
+    path = tmp_path / "tiny.tif"
+    zm_develop.write_tiff16(str(path), rgb)
+    with Image.open(path) as img:
+        assert np.asarray(img.convert("RGB")).tolist() == [[[0x12] * 3] * 2] * 3
@@ -0,0 +1,137 @@
+import struct
+
+from zeta_motion import zm_embedded
+from zeta_motion.zm_embedded import (CR3_PREVIEW_UUID, TAG_COMPRESSION, TAG_JPEG_LENGTH, TAG_JPEG_OFFSET,
+                                     TAG_MP_ENTRY, TAG_STRIP_BYTES, TAG_STRIP_OFFSETS, TAG_SUBIFDS)
+
+
+# --- Fixtures sintéticas (solo cabeceras: no hace falta que decodifiquen) ---
+
+def segment(marker, payload):
+    return bytes([0xFF, marker]) + struct.pack(">H", len(payload) + 2) + payload
+
+def jpeg(width, height, sof=0xC0, before=b""):
+    sof_payload = struct.pack(">BHHB", 8, height, width, 3) + b"\x01\x22\x00" * 3
+    return (b"\xff\xd8" + before + segment(sof, sof_payload)
+            + segment(0xDA, b"\x00" * 10) + b"scan" + b"\xff\xd9")
+
+def ifd(order, entries, next_offset=0):
+    """entries: [(tag, tipo, valores)] con valores que caben en 4 bytes."""
+    out = struct.pack(order + "H", len(entries))
+    for tag, typ, values in sorted(entries):
+        fmt = "H" if typ == 3 else "I"
+        raw = struct.pack(order + fmt * len(values), *values).ljust(4, b"\0")
+        out += struct.pack(order + "HHI", tag, typ, len(values)) + raw
+    return out + struct.pack(order + "I", next_offset)
+
+def ifd_size(count):
+    return 2 + count * 12 + 4
+
+
+def tiff_raw(order="<"):
+    """
+    RAW tipo TIFF: IFD0 -> JPEG por JPEGInterchangeFormat y una SubIFD con un
+    JPEG sin pérdida (no decodificable); IFD1 -> JPEG por strip (compression 6).
+    """
+    big, small, lossless = jpeg(1620, 1080), jpeg(160, 120), jpeg(6000, 4000, sof=0xC3)
+    ifd0_at = 8
+    sub_at = ifd0_at + ifd_size(3)
+    ifd1_at = sub_at + ifd_size(2)
+    data_at = ifd1_at + ifd_size(3)
+    big_at, small_at, lossless_at = data_at, data_at + len(big), data_at + len(big) + len(small)
+    magic = b"II" if order == "<" else b"MM"
+    return (magic + struct.pack(order + "HI", 42, ifd0_at)
+            + ifd(order, [(TAG_JPEG_OFFSET, 4, [big_at]), (TAG_JPEG_LENGTH, 4, [len(big)]),
+                          (TAG_SUBIFDS, 4, [sub_at])], ifd1_at)
+            + ifd(order, [(TAG_STRIP_OFFSETS, 4, [lossless_at]), (TAG_STRIP_BYTES, 4, [len(lossless)])])
+            + ifd(order, [(TAG_COMPRESSION, 3, [6]), (TAG_STRIP_OFFSETS, 4, [small_at]),
+                          (TAG_STRIP_BYTES, 4, [len(small)])])
+            + big + small + lossless), (big_at, small_at)
+
+def jpeg_with_mpf(order=">"):
+    """JPEG principal con un APP2 MPF cuya segunda entrada es una vista previa."""
+    preview, main = jpeg(1920, 1280), jpeg(6000, 4000)
+    mpf_base = 2 + 4 + 4                        # SOI + cabecera APP2 + "MPF\0"
+    entries_at = 8 + ifd_size(1)
+    app2_size = 4 + 4 + entries_at + 32
+    preview_at = 2 + app2_size + len(main) - 2  # tras el JPEG principal (sin su SOI)
+    entries = (struct.pack(order + "IIIHH", 0x030000, len(main), 0, 0, 0)
+               + struct.pack(order + "IIIHH", 0x010002, len(preview), preview_at - mpf_base, 0, 0))
+    # MPEntry es UNDEFINED: la cuenta son bytes y el valor, su offset
+    mp_ifd = (struct.pack(order + "H", 1) + struct.pack(order + "HHII", TAG_MP_ENTRY, 7, len(entries), entries_at)
+              + struct.pack(order + "I", 0))
+    tiff = (b"MM" if order == ">" else b"II") + struct.pack(order + "HI", 42, 8) + mp_ifd + entries
+    return b"\xff\xd8" + segment(0xE2, b"MPF\0" + tiff) + main[2:] + preview, preview_at
+
+def cr3(width=1620, height=1080):
+    preview = jpeg(width, height)
+    ftyp = struct.pack(">I4s", 24, b"ftyp") + b"crx \x00\x00\x00\x01crx isom"
+    prvw = struct.pack(">I4sIHHHHI", 24 + len(preview), b"PRVW", 0, 1, width, height, 1, len(preview)) + preview
+    body = CR3_PREVIEW_UUID + b"\0" * 8 + prvw
+    box = struct.pack(">I4s", 8 + len(body), b"uuid") + body
+    preview_at = len(ftyp) + 8 + 16 + 8 + 24
+    return ftyp + box, preview_at, len(preview)
+
+
+# --- Segmentos JPEG / SOF ---
+
+def test_jpeg_dimensions_reads_sof_after_app_segments_and_fill():
+    data = jpeg(640, 480, before=segment(0xE0, b"JFIF\0" + b"\0" * 9) + b"\xff")
+    assert zm_embedded.jpeg_dimensions(data) == (640, 480)
+
+
+def test_jpeg_dimensions_from_path_and_garbage(tmp_path):
+    path = tmp_path / "frame.jpg"
+    path.write_bytes(jpeg(320, 200, sof=0xC2))
+    assert zm_embedded.jpeg_dimensions(str(path)) == (320, 200)
+    assert zm_embedded.jpeg_dimensions(b"not a jpeg") is None
+    assert zm_embedded.jpeg_dimensions(b"\xff\xd8" + segment(0xDA, b"")) is None
+
+
+# --- TIFF: IFD0, cadena de IFDs y SubIFDs ---
+
+def test_tiff_walk_finds_jpeg_tags_strips_and_subifds(tmp_path):
+    for order in ("<", ">"):
+        data, (big_at, small_at) = tiff_raw(order)
+        path = tmp_path / f"frame{order == '<'}.cr2"
+        path.write_bytes(data)
+        previews = zm_embedded.find_previews(str(path))
+        # El JPEG sin pérdida (SOF3) de la SubIFD se descarta
+        assert [(w, h, off) for w, h, off, _ in previews] == [(1620, 1080, big_at), (160, 120, small_at)]
+
+
+def test_tiff_walk_survives_ifd_loops(tmp_path):
+    data = b"II" + struct.pack("<HI", 42, 8) + ifd("<", [(TAG_SUBIFDS, 4, [8])], 8)
+    path = tmp_path / "loop.nef"
+    path.write_bytes(data)
+    assert zm_embedded.find_previews(str(path)) == []
+
+
+# --- MPF (APP2) ---
+
+def test_mpf_entries_skip_the_main_image(tmp_path):
+    for order in (">", "<"):
+        data, preview_at = jpeg_with_mpf(order)
+        path = tmp_path / "frame.jpg"
+        path.write_bytes(data)
+        assert [(w, h, off) for w, h, off, _ in zm_embedded.find_previews(str(path))] == [(1920, 1280, preview_at)]
+
+
+# --- CR3: caja PRVW ---
+
+def test_cr3_prvw_offset_and_length(tmp_path):
+    data, preview_at, length = cr3()
+    path = tmp_path / "frame.cr3"
+    path.write_bytes(data)
+    assert zm_embedded.find_previews(str(path)) == [(1620, 1080, preview_at, length)]
+    extracted, size = zm_embedded.extract_preview(str(path))
+    assert size == (1620, 1080)
+    assert extracted == jpeg(1620, 1080)
+
+
+def test_extract_preview_picks_smallest_covering(tmp_path):
+    data, _ = tiff_raw()
+    path = tmp_path / "frame.arw"
+    path.write_bytes(data)
+    assert zm_embedded.extract_preview(str(path), min_size=(100, 100))[1] == (160, 120)
+    assert zm_embedded.extract_preview(str(path), min_size=(4000, 3000))[1] == (1620, 1080)
@@ -0,0 +1,103 @@
+import threading
+import time
+
+from zeta_motion.zm_framebus import FrameBus, MjpegSplitter
+
+
+def jpeg(payload=b"data"):
+    return b"\xff\xd8" + payload + b"\xff\xd9"
+
+
+# --- MjpegSplitter ---
+
+def test_splitter_returns_complete_frames():
+    splitter = MjpegSplitter()
+    assert splitter.feed(jpeg(b"a") + jpeg(b"b")) == [jpeg(b"a"), jpeg(b"b")]
+
+
+def test_splitter_joins_frames_across_chunks():
+    splitter = MjpegSplitter()
+    data = jpeg(b"first") + jpeg(b"second")
+    frames = []
+    for i in range(0, len(data), 3):
+        frames += splitter.feed(data[i:i + 3])
+    assert frames == [jpeg(b"first"), jpeg(b"second")]
+
+
+def test_splitter_handles_soi_split_between_reads():
+    splitter = MjpegSplitter()
+    assert splitter.feed(b"junk\xff") == []
+    assert splitter.feed(b"\xd8abc\xff\xd9") == [jpeg(b"abc")]
+
+
+def test_splitter_skips_garbage_before_soi():
+    splitter = MjpegSplitter()
+    assert splitter.feed(b"garbage" + jpeg(b"x") + b"tail") == [jpeg(b"x")]
+
+
+# --- FrameBus ---
+
+def test_wait_next_returns_latest_frame():
+    bus = FrameBus()
+    bus.publish(b"one")
+    bus.publish(b"two")
+    frame = bus.wait_next(0, timeout=0.1)
+    assert frame.seq == 2 and frame.data == b"two"
+
+
+def test_wait_next_times_out_without_new_frames():
+    bus = FrameBus()
+    bus.publish(b"one")
+    assert bus.wait_next(1, timeout=0.05) is None
+
+
+def test_wait_since_returns_every_buffered_frame():
+    bus = FrameBus(size=4)
+    for i in range(6):
+        bus.publish(bytes([i]))
+    assert [f.seq for f in bus.wait_since(3, timeout=0.1)] == [4, 5, 6]
+
+
+def test_clear_then_wait_does_not_fail():
+    bus = FrameBus()
+    bus.publish(b"one")
+    bus.publish(b"two")
+    bus.clear()
+    assert bus.wait_next(1, timeout=0.05) is None
+    assert bus.wait_since(1, timeout=0.05) == []
+
+
+def test_clear_then_wait_gets_next_published_frame():
+    bus = FrameBus()
+    bus.publish(b"one")
+    bus.clear()
+    threading.Timer(0.05, bus.publish, args=(b"two",)).start()
+    frame = bus.wait_next(0, timeout=2)
+    assert frame is not None and frame.data == b"two"
+
+
+def test_consumer_survives_clear_and_failing_callback():
+    bus = FrameBus()
+    received = []
+    failed = threading.Event()
+
+    def callback(frame):
+        if frame.data == b"bad":
+            failed.set()
+            raise ValueError("bad frame")
+        received.append(frame.data)
+
+    bus.subscribe("test", callback)
+    try:
+        bus.publish(b"bad")
+        assert failed.wait(2)
+        bus.clear()
+        time.sleep(0.05)
+        bus.publish(b"good")
+        deadline = time.monotonic() + 2
+        while not received and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert received == [b"good"]
+        assert bus.has_consumer("test")
+    finally:
+        bus.unsubscribe_all()
@@ -0,0 +1,80 @@
+import os
+
+from zeta_motion.zm_manifest import MANIFEST_NAME, Manifest
+
+SETTINGS = {"quality": 85, "decode": "FAST"}
+LEVELS = ["25", "50"]
+
+
+def proxy_path_for(hd_path, level):
+    root, ext = os.path.splitext(hd_path)
+    return f"{root}_{level}{ext}"
+
+
+def make_frame(directory, name="shot_00001.jpg", data=b"hd frame"):
+    hd = directory / name
+    hd.write_bytes(data)
+    for level in LEVELS:
+        (directory / os.path.basename(proxy_path_for(str(hd), level))).write_bytes(b"proxy")
+    return str(hd)
+
+
+def recorded(directory, hd):
+    manifest = Manifest(str(directory))
+    manifest.record(hd, {level: proxy_path_for(hd, level) for level in LEVELS}, SETTINGS)
+    return manifest
+
+
+def test_unknown_frame_is_stale_in_every_level(tmp_path):
+    hd = make_frame(tmp_path)
+    assert Manifest(str(tmp_path)).stale_levels(hd, LEVELS, SETTINGS, proxy_path_for) == LEVELS
+
+
+def test_recorded_proxies_are_up_to_date(tmp_path):
+    hd = make_frame(tmp_path)
+    manifest = recorded(tmp_path, hd)
+    assert manifest.stale_levels(hd, LEVELS, SETTINGS, proxy_path_for) == []
+    assert manifest.frames["shot_00001.jpg"]["proxies"]["50"]["file"] == "shot_00001_50.jpg"
+
+
+def test_other_settings_or_missing_proxy_are_stale(tmp_path):
+    hd = make_frame(tmp_path)
+    manifest = recorded(tmp_path, hd)
+    assert manifest.stale_levels(hd, LEVELS, dict(SETTINGS, quality=70), proxy_path_for) == LEVELS
+    os.remove(proxy_path_for(hd, "25"))
+    assert manifest.stale_levels(hd, LEVELS, SETTINGS, proxy_path_for) == ["25"]
+
+
+def test_new_content_invalidates_but_touch_does_not(tmp_path):
+    hd = make_frame(tmp_path)
+    manifest = recorded(tmp_path, hd)
+    st = os.stat(hd)
+    os.utime(hd, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert manifest.stale_levels(hd, LEVELS, SETTINGS, proxy_path_for) == []
+    with open(hd, "wb") as f:
+        f.write(b"retaken frame")
+    assert manifest.stale_levels(hd, LEVELS, SETTINGS, proxy_path_for) == LEVELS
+
+
+def test_dirty_frames_are_stale_until_recorded_again(tmp_path):
+    hd = make_frame(tmp_path)
+    manifest = recorded(tmp_path, hd)
+    manifest.mark_dirty(hd)
+    assert manifest.stale_levels(hd, LEVELS, SETTINGS, proxy_path_for) == LEVELS
+    manifest.record(hd, {"25": proxy_path_for(hd, "25")}, SETTINGS)
+    # Tras un frame 'dirty' se empieza de cero: el 50 no se conserva
+    assert manifest.stale_levels(hd, LEVELS, SETTINGS, proxy_path_for) == ["50"]
+
+
+def test_failed_level_is_forgotten(tmp_path):
+    hd = make_frame(tmp_path)
+    manifest = recorded(tmp_path, hd)
+    manifest.record(hd, {"50": None}, SETTINGS)
+    assert manifest.stale_levels(hd, LEVELS, SETTINGS, proxy_path_for) == ["50"]
+
+
+def test_save_and_reload(tmp_path):
+    hd = make_frame(tmp_path)
+    recorded(tmp_path, hd).save()
+    assert (tmp_path / MANIFEST_NAME).exists()
+    assert Manifest(str(tmp_path)).stale_levels(hd, LEVELS, SETTINGS, proxy_path_for) == []
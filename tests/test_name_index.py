@@ -0,0 +1,82 @@
+import types
+
+from PIL import Image
+
+from zeta_motion.zm_convert import HD_LEVEL, NameIndex, remap_strip
+
+
+NAMES = [
+    "shot_00001.jpg", "shot_25_00001.jpg", "shot_50_00001.jpg",
+    "shot_00002.tif", "shot_00002.jpg", "shot_50_00002.jpg",
+    "shot_00003.cr2",              # RAW: Blender no lo carga, no es un HD mostrable
+    "notes.txt",
+]
+
+
+def make_strip(directory, filenames, fit_method="FIT"):
+    return types.SimpleNamespace(
+        type='IMAGE', name="shot", directory=str(directory), fit_method=fit_method,
+        elements=[types.SimpleNamespace(filename=f) for f in filenames],
+        transform=types.SimpleNamespace(scale_x=1.0, scale_y=1.0),
+    )
+
+
+def write_frames(directory, sizes):
+    for name, size in sizes.items():
+        Image.new("RGB", size).save(directory / name)
+
+
+# --- NameIndex ---
+
+def test_counterpart_maps_hd_and_proxy_levels():
+    index = NameIndex(NAMES)
+    assert index.counterpart("shot_00001.jpg", "50") == "shot_50_00001.jpg"
+    assert index.counterpart("shot_25_00001.jpg", HD_LEVEL) == "shot_00001.jpg"
+    assert index.counterpart("shot_50_00001.jpg", "25") == "shot_25_00001.jpg"
+
+
+def test_counterpart_prefers_developed_tiff_as_hd():
+    index = NameIndex(NAMES)
+    assert index.counterpart("shot_50_00002.jpg", HD_LEVEL) == "shot_00002.tif"
+    assert index.counterpart("shot_00002.jpg", "50") == "shot_50_00002.jpg"
+
+
+def test_counterpart_missing_level_and_unknown_file():
+    index = NameIndex(NAMES)
+    assert index.counterpart("shot_00002.tif", "25") is False
+    assert index.counterpart("shot_00003.cr2", "50") is None
+    assert index.counterpart("notes.txt", HD_LEVEL) is None
+
+
+# --- remap_strip ---
+
+def test_remap_strip_rewrites_every_known_frame(tmp_path):
+    for name in NAMES:
+        (tmp_path / name).write_bytes(b"")
+    strip = make_strip(tmp_path, ["shot_00001.jpg", "placeholder_00009.png", "shot_00002.tif"])
+    assert remap_strip(strip, "50") == (2, 0)
+    assert [e.filename for e in strip.elements] == ["shot_50_00001.jpg", "placeholder_00009.png", "shot_50_00002.jpg"]
+
+
+def test_remap_strip_changes_nothing_if_a_level_is_missing(tmp_path):
+    for name in NAMES:
+        (tmp_path / name).write_bytes(b"")
+    strip = make_strip(tmp_path, ["shot_00001.jpg", "shot_00002.tif"])
+    assert remap_strip(strip, "25") == (0, 1)
+    assert [e.filename for e in strip.elements] == ["shot_00001.jpg", "shot_00002.tif"]
+
+
+def test_remap_strip_keeps_framing_with_original_fit(tmp_path):
+    write_frames(tmp_path, {"shot_00001.jpg": (400, 300), "shot_50_00001.jpg": (200, 150)})
+    strip = make_strip(tmp_path, ["shot_00001.jpg"], fit_method="ORIGINAL")
+    assert remap_strip(strip, "50") == (1, 0)
+    assert (strip.transform.scale_x, strip.transform.scale_y) == (2.0, 2.0)
+    assert remap_strip(strip, HD_LEVEL) == (1, 0)
+    assert (strip.transform.scale_x, strip.transform.scale_y) == (1.0, 1.0)
+
+
+def test_remap_strip_leaves_scale_alone_when_fitted(tmp_path):
+    write_frames(tmp_path, {"shot_00001.jpg": (400, 300), "shot_50_00001.jpg": (200, 150)})
+    strip = make_strip(tmp_path, ["shot_00001.jpg"])
+    assert remap_strip(strip, "50") == (1, 0)
+    assert (strip.transform.scale_x, strip.transform.scale_y) == (1.0, 1.0)
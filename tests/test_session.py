@@ -0,0 +1,54 @@
+from zeta_motion.zm_session import parse_config_listing, parse_config_output
+
+LISTING = """\
+/main/imgsettings/iso
+Label: ISO Speed
+Readonly: 0
+Type: RADIO
+Current: 400
+Choice: 0 Auto
+Choice: 1 100
+Choice: 2 400
+END
+/main/status/serialnumber
+Label: Serial Number
+Readonly: 1
+Type: TEXT
+Current: 0123456789
+END
+/main/capturesettings/aperture
+Label: Aperture
+Type: RADIO
+Current: 5.6
+Choice: 0
+Choice: 1 5.6
+END
+"""
+
+
+def test_parse_config_listing_blocks():
+    listing = parse_config_listing(LISTING)
+    assert list(listing) == ["/main/imgsettings/iso", "/main/status/serialnumber", "/main/capturesettings/aperture"]
+    assert listing["/main/imgsettings/iso"] == {
+        "label": "ISO Speed", "type": "RADIO", "readonly": False, "current": "400",
+        "choices": ["Auto", "100", "400"],
+    }
+    assert listing["/main/status/serialnumber"]["readonly"] is True
+    assert listing["/main/status/serialnumber"]["choices"] == []
+    # Una opción sin texto se conserva como cadena vacía
+    assert listing["/main/capturesettings/aperture"]["choices"] == ["", "5.6"]
+
+
+def test_parse_config_listing_ignores_noise_and_unterminated_blocks():
+    output = "*** some warning\n" + LISTING + "/main/other/cut\nLabel: Cut\nCurrent: 1\n"
+    listing = parse_config_listing(output)
+    assert "/main/other/cut" not in listing
+    assert len(listing) == 3
+    assert parse_config_listing("") == {}
+    assert parse_config_listing(None) == {}
+
+
+def test_parse_config_output():
+    block = LISTING.split("END")[0]
+    assert parse_config_output(block) == ("400", ["Auto", "100", "400"])
+    assert parse_config_output(None) == (None, [])
@@ -13,7 +13,6 @@ bl_info = {
 
 import bpy
 import sys
-import time
 import importlib
 
 # --- Linux-only check ---
@@ -24,7 +23,8 @@ if sys.platform != "linux":
 from . import (
     state, zm_camera, zm_stream, zm_ui, zm_movie,
     zm_preview, zm_convert, zm_movie_source, zm_worker, zm_settings, zm_foto,
-    zm_capture_core
+    zm_capture_core, zm_session, zm_stats, zm_hotplug, zm_rig, zm_framebus, zm_vse_live,
+    zm_live_blend, zm_watchdog, zm_record, zm_proxy_pool, zm_manifest, zm_embedded, zm_develop, zm_codec
 )
 
 modules = {
@@ -32,7 +32,13 @@ modules = {
     "zm_ui": zm_ui, "zm_movie": zm_movie, "zm_preview": zm_preview,
     "zm_convert": zm_convert, "zm_movie_source": zm_movie_source,
     "zm_worker": zm_worker, "zm_settings": zm_settings, "zm_foto": zm_foto,
-    "zm_capture_core": zm_capture_core
+    "zm_capture_core": zm_capture_core, "zm_session": zm_session,
+    "zm_stats": zm_stats, "zm_hotplug": zm_hotplug,
+    "zm_rig": zm_rig, "zm_framebus": zm_framebus,
+    "zm_vse_live": zm_vse_live, "zm_live_blend": zm_live_blend,
+    "zm_watchdog": zm_watchdog, "zm_record": zm_record,
+    "zm_proxy_pool": zm_proxy_pool, "zm_manifest": zm_manifest,
+    "zm_embedded": zm_embedded, "zm_develop": zm_develop, "zm_codec": zm_codec
 }
 
 # --- Hot reload for development ---
@@ -72,44 +78,26 @@ def _sync_blender_resolution(scene, gphoto_format_name):
         scene.render.pixel_aspect_x = 1; scene.render.pixel_aspect_y = 1
         print(f"[Zeta Motion] Render resolution set to {res_data['width']}x{res_data['height']}")
 def _update_camera_setting(self, context, param_name):
-    prop_map = {
-        "iso": "zm_iso_setting", "aperture": "zm_aperture_setting",
-        "shutterspeed": "zm_shutterspeed_setting", "imageformat": "zm_imageformat_setting",
-    }
-    new_value = getattr(context.scene, prop_map[param_name])
-    with state.state_lock:
-        state.control_state["camera"]["settings"]["desired"][param_name] = new_value
+    new_value = getattr(context.scene, zm_settings.SCENE_PROPS[param_name])
+    zm_settings.request_setting(param_name, new_value)
     if param_name == "imageformat":
         _sync_blender_resolution(context.scene, new_value)
 def _update_iso(self, context): _update_camera_setting(self, context, "iso")
 def _update_aperture(self, context): _update_camera_setting(self, context, "aperture")
 def _update_shutterspeed(self, context): _update_camera_setting(self, context, "shutterspeed")
 def _update_imageformat(self, context): _update_camera_setting(self, context, "imageformat")
-
-# --- Temporizador de Sincronización ---
-_last_sync_time = 0.0
-def _settings_sync_timer():
-    global _last_sync_time
-    now = time.time()
-    if now - _last_sync_time < 0.5: return 0.5
-    with state.state_lock:
-        desired = state.control_state["camera"]["settings"]["desired"]
-        current = state.control_state["camera"]["settings"]["current"]
-        params_to_update = { k: v for k, v in desired.items() if v is not None and v != current.get(k) }
-        if params_to_update:
-            print(f"[Zeta Motion Sync] Cambios detectados: {params_to_update}")
-            for param, value in params_to_update.items():
-                # --- CORREGIDO: Usar la nueva estructura de PARAM_PATHS ---
-                config_path = zm_settings.PARAM_PATHS.get(param) # Ya no es una lista
-                if config_path:
-                    command = f"gphoto2 --set-config '{config_path}={value}'"
-                    zm_worker.enqueue_command(command)
-                    current[param] = value
-            _last_sync_time = now
-    return 0.5
+def _update_live_blend(self, context): zm_live_blend.configure(context.scene)
+def _update_proxy_scale(self, context):
+    # Con la pirámide de proxies ya generada, cambiar de escala es solo reapuntar los strips
+    switched, missing = zm_convert.retarget_scene_strips(context.scene, context.scene.zm_proxy_scale)
+    if switched:
+        print(f"[Zeta Motion] {switched} strip(s) switched to {context.scene.zm_proxy_scale}% proxies.")
+    if missing:
+        print(f"[Zeta Motion] {missing} strip(s) have no {context.scene.zm_proxy_scale}% proxies yet. Use 'Rebuild Proxies'.")
 
 # --- Register / Unregister ---
 def register():
+    zm_stats.register()
     zm_worker.start_worker()
     if hasattr(zm_camera, "register"): zm_camera.register()
     if hasattr(zm_stream, "register"): zm_stream.register()
@@ -117,6 +105,13 @@ def register():
     if hasattr(zm_preview, "register"): zm_preview.register()
     if hasattr(zm_ui, "register"): zm_ui.register()
     if hasattr(zm_foto, "register"): zm_foto.register()
+    zm_rig.register()
+    zm_record.register()
+    zm_proxy_pool.register()
+    # Backend JPEG: elección cacheada o micro-benchmark en segundo plano
+    zm_codec.ensure_selected()
+    zm_hotplug.register()
+    zm_watchdog.register()
 
     # --- Propiedades de Escena (sin cambios) ---
     bpy.types.Scene.zm_camera_list = bpy.props.EnumProperty(name="Camera", items=lambda self, context: zm_ui.update_camera_list())
@@ -124,23 +119,36 @@ def register():
     bpy.types.Scene.zm_capture_path = bpy.props.StringProperty(name="Capture Path / Base Name", subtype='FILE_PATH', default="")
     bpy.types.Scene.zm_movie_length = bpy.props.IntProperty(name="Strip Length", default=24, min=1)
     bpy.types.Scene.zm_movie_overwrite = bpy.props.BoolProperty(name="Overwrite Existing", default=False)
-    bpy.types.Scene.zm_proxy_scale = bpy.props.EnumProperty(name="Proxy Scale", items=[('25', "25%", ""), ('50', "50%", ""), ('75', "75%", "")], default='50')
-    bpy.types.Scene.zm_live_blend_enabled = bpy.props.BoolProperty(name="Enable Live Blend", default=False)
-    bpy.types.Scene.zm_blend_factor = bpy.props.FloatProperty(name="Blend Factor", default=0.5, min=0.0, max=1.0)
+    bpy.types.Scene.zm_proxy_scale = bpy.props.EnumProperty(name="Proxy Scale", items=[('25', "25%", ""), ('50', "50%", ""), ('75', "75%", "")], default='50', update=_update_proxy_scale)
+    bpy.types.Scene.zm_proxy_levels = bpy.props.EnumProperty(name="Proxy Levels", description="Proxy sizes written from a single decode of each HD frame", items=[('25', "25%", ""), ('50', "50%", ""), ('75', "75%", "")], options={'ENUM_FLAG'}, default={'25', '50', '75'})
+    bpy.types.Scene.zm_proxy_decode = bpy.props.EnumProperty(name="Proxy Decode", description="Speed/quality trade-off when generating proxies", items=zm_convert.DECODE_MODES, default=zm_convert.DEFAULT_DECODE)
+    bpy.types.Scene.zm_proxy_layout = bpy.props.EnumProperty(name="Proxy Layout", description="Where proxies are written and how strips use them", items=zm_convert.PROXY_LAYOUTS, default=zm_convert.DEFAULT_LAYOUT)
+    bpy.types.Scene.zm_live_blend_enabled = bpy.props.BoolProperty(name="Enable Live Blend", default=False, update=_update_live_blend)
+    bpy.types.Scene.zm_blend_factor = bpy.props.FloatProperty(name="Blend Factor", default=0.5, min=0.0, max=1.0, update=_update_live_blend)
+    bpy.types.Scene.zm_blend_mode = bpy.props.EnumProperty(name="Blend Mode", items=zm_live_blend.BLEND_MODES, default='MIX', update=_update_live_blend)
+    bpy.types.Scene.zm_onion_prev = bpy.props.IntProperty(name="Previous Frames", default=1, min=0, max=12, update=_update_live_blend)
+    bpy.types.Scene.zm_onion_next = bpy.props.IntProperty(name="Next Frames", default=0, min=0, max=12, update=_update_live_blend)
+    bpy.types.Scene.zm_onion_falloff = bpy.props.FloatProperty(name="Opacity Falloff", description="Opacity multiplier applied to each layer further from the playhead", default=0.5, min=0.0, max=1.0, update=_update_live_blend)
+    bpy.types.Scene.zm_onion_use_tint = bpy.props.BoolProperty(name="Tint Layers", default=False, update=_update_live_blend)
+    bpy.types.Scene.zm_onion_tint_prev = bpy.props.FloatVectorProperty(name="Previous Tint", subtype='COLOR', size=3, min=0.0, max=1.0, default=(1.0, 0.55, 0.55), update=_update_live_blend)
+    bpy.types.Scene.zm_onion_tint_next = bpy.props.FloatVectorProperty(name="Next Tint", subtype='COLOR', size=3, min=0.0, max=1.0, default=(0.55, 1.0, 0.6), update=_update_live_blend)
+    bpy.types.Scene.zm_onion_cache_mb = bpy.props.IntProperty(name="Onion Cache (MB)", description="Memory cap for decoded onion skin frames", default=512, min=32, max=16384, update=_update_live_blend)
     bpy.types.Scene.zm_iso_setting = bpy.props.EnumProperty(name="ISO", items=get_iso_items, update=_update_iso)
     bpy.types.Scene.zm_aperture_setting = bpy.props.EnumProperty(name="Aperture", items=get_aperture_items, update=_update_aperture)
     bpy.types.Scene.zm_shutterspeed_setting = bpy.props.EnumProperty(name="Shutter Speed", items=get_shutterspeed_items, update=_update_shutterspeed)
     bpy.types.Scene.zm_imageformat_setting = bpy.props.EnumProperty(name="Resolution", items=get_imageformat_items, update=_update_imageformat)
 
-    bpy.app.timers.register(_settings_sync_timer)
     print("[Zeta Motion] Add-on initialized.")
 
 def unregister():
-    if bpy.app.timers.is_registered(_settings_sync_timer): bpy.app.timers.unregister(_settings_sync_timer)
+    zm_watchdog.unregister()
+    zm_hotplug.unregister()
     if hasattr(zm_worker, "stop_worker"): zm_worker.stop_worker()
     props_to_remove = (
         "zm_camera_list", "zm_preview_path", "zm_capture_path", "zm_movie_length",
-        "zm_movie_overwrite", "zm_proxy_scale", "zm_live_blend_enabled", "zm_blend_factor",
+        "zm_movie_overwrite", "zm_proxy_scale", "zm_proxy_levels", "zm_proxy_decode", "zm_proxy_layout", "zm_live_blend_enabled", "zm_blend_factor", "zm_blend_mode",
+        "zm_onion_prev", "zm_onion_next", "zm_onion_falloff", "zm_onion_use_tint",
+        "zm_onion_tint_prev", "zm_onion_tint_next", "zm_onion_cache_mb",
         "zm_iso_setting", "zm_aperture_setting", "zm_shutterspeed_setting", "zm_imageformat_setting",
     )
     for prop in props_to_remove:
@@ -153,6 +161,10 @@ def unregister():
     if hasattr(zm_stream, "unregister"): zm_stream.unregister()
     if hasattr(zm_camera, "unregister"): zm_camera.unregister()
     if hasattr(zm_foto, "unregister"): zm_foto.unregister()
+    zm_proxy_pool.unregister()
+    zm_record.unregister()
+    zm_rig.unregister()
+    zm_stats.unregister()
     print("[Zeta Motion] Add-on unloaded cleanly.")
 
 if __name__ == "__main__":
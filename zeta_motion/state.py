@@ -12,6 +12,8 @@ control_state = {
         "available": [],       # dtected cameras [{"model": "...", "port": "..."}]
         "active_name": None,   # camera to send commands
         "active_port": None,   # active camera port
+        "last_connected": None, # última cámara conectada (para reconexión automática)
+        "rig": [],             # cámaras conectadas [{"model", "port", "serial", "slug"}]; incluye la activa
         
         # --- NUEVO: Estructura para gestionar los ajustes de la cámara ---
         "settings": {
@@ -35,17 +37,32 @@ control_state = {
                 "aperture": None,
                 "shutterspeed": None,
                 "imageformat": None,
-            }
+            },
+            # Rutas de configuración descubiertas en la cámara (list-all-config)
+            "paths": {},
+            # Modelo / firmware de la cámara que describen estos ajustes
+            "model": None,
+            "firmware": None,
         }
     },
     "system": {
 "connected": False, # connection state
 "photo_task_active": False, # True while a foto_capture task is running
+"last_rig_capture": None, # {"cameras", "skew_ms", "ok", "failed"} del último 'capture all'
+"proxy_job": None, # progreso de la reconstrucción de proxies (zm_proxy_pool)
+    },
+
+    # Último snapshot de preview (zm_capture_core.register_snapshot)
+    "preview": {
+        "last_filename": None,
     },
 
     # Stream state: only this key is required to know if a stream is active
     "stream": {
         "method": "none",      # "none", "ffplay", "vse", "live_blend"
         "paused_method": "none", # relaunch the  running method
+        "source": "none",      # fuente del bus de frames: "none", "session", "movie"
+        "recording": False,    # grabación del liveview activa (zm_record)
+        "stats": None,         # {"status", "fps", "interval_ms", "jitter_ms", "age_ms", "restarts"} (zm_watchdog)
     },
 }
\ No newline at end of file
@@ -2,26 +2,15 @@
 # Blender 4.5+ | Linux-only
 
 import subprocess
-from . import state, zm_stream, zm_settings
+from . import state, zm_stream, zm_settings, zm_session, zm_worker, zm_rig
 
 def detect_cameras():
-    """Detect available cameras using gphoto2 and store their info."""
+    """
+    Detect available cameras using gphoto2 and store their info (blocking).
+    The UI uses zm_hotplug.request_rescan() instead.
+    """
     try:
-        result = subprocess.run(
-            ["gphoto2", "--auto-detect"],
-            capture_output=True,
-            text=True,
-            timeout=3,
-        )
-        lines = result.stdout.strip().splitlines()
-
-        cams = []
-        for line in lines[2:]:
-            if line.strip():
-                parts = line.strip().rsplit(None, 1)
-                if len(parts) == 2:
-                    model, port = parts
-                    cams.append({"model": model.strip(), "port": port.strip()})
+        cams = zm_session.auto_detect()
 
         with state.state_lock:
             state.control_state["camera"]["available"] = cams
@@ -40,8 +29,9 @@ def detect_cameras():
 
 def connect_camera(camera_dict):
     """
-    Conecta la cámara seleccionada, detiene streams activos, y lanza la consulta
-    asíncrona y serializada de todos sus ajustes.
+    Conecta la cámara seleccionada, detiene streams activos, carga las
+    capacidades cacheadas del modelo y lanza una única lectura asíncrona de
+    toda la configuración.
     """
     if not camera_dict:
         print("[Zeta Motion] No camera selected to connect.")
@@ -49,43 +39,29 @@ def connect_camera(camera_dict):
         
     print(f"[Zeta Motion] Conectando a {camera_dict['model']}...")
     zm_stream.stop_all_streams()
+    # La cámara conectada pasa a ser la principal y el rig se reinicia con ella
+    zm_rig.reset_rig(camera_dict)
+    zm_worker.close_sessions(keep_ports=[camera_dict["port"]])
 
     with state.state_lock:
         state.control_state["camera"]["active_name"] = camera_dict["model"]
         state.control_state["camera"]["active_port"] = camera_dict["port"]
+        state.control_state["camera"]["last_connected"] = dict(camera_dict)
         state.control_state["system"]["connected"] = True
     
-    print(f"[Zeta Motion] Cámara conectada. Iniciando consulta de ajustes...")
-
-    params_to_query = list(state.control_state["camera"]["settings"]["choices"].keys())
-    
-    def _query_chain_callback(param_name, current_value, choices_list):
-        """Callback que se ejecuta al recibir un resultado y lanza la siguiente consulta."""
-        print(f"↳ Recibido resultado para '{param_name}': Current='{current_value}', Choices={len(choices_list)}")
-        with state.state_lock:
-            state.control_state["camera"]["settings"]["choices"][param_name] = choices_list
-            state.control_state["camera"]["settings"]["current"][param_name] = current_value
-            state.control_state["camera"]["settings"]["desired"][param_name] = current_value
-        
-        if params_to_query:
-            next_param = params_to_query.pop(0)
-            print(f"→ Solicitando configuración para '{next_param}'...")
-            zm_settings.get_gphoto_config(next_param, _query_chain_callback)
-        else:
-            print("[Zeta Motion] Consulta de todos los ajustes finalizada.")
-
-    # Iniciar la cadena de consultas con el primer parámetro
-    if params_to_query:
-        first_param = params_to_query.pop(0)
-        print(f"→ Solicitando configuración para '{first_param}'...")
-        zm_settings.get_gphoto_config(first_param, _query_chain_callback)
+    # Rellenar los enums al instante desde la caché y revalidar en segundo plano
+    if zm_settings.apply_cached_capabilities(camera_dict["model"]):
+        print("[Zeta Motion] Cámara conectada. Revalidando ajustes en segundo plano...")
+    else:
+        print("[Zeta Motion] Cámara conectada. Iniciando consulta de ajustes...")
+    zm_settings.query_all_settings(camera_dict["model"])
 
 def get_active_camera():
     """Return the active camera dictionary or None."""
     cams = state.control_state["camera"].get("available", [])
-    active = state.control_state["camera"].get("active_name")
+    active = state.control_state["camera"].get("active_port")
     for c in cams:
-        if c["model"] == active:
+        if c["port"] == active:
             return c
     return None
 
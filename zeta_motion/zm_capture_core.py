@@ -1,23 +1,67 @@
 # zm_capture_core.py
 import bpy
-import subprocess
 import os
 import datetime
 from .state import control_state
+from . import zm_worker, zm_session, zm_settings, zm_convert, zm_embedded
+
+def companions_for_current_format():
+    """Archivos extra por disparo según el formato de imagen activo (1 en RAW+JPEG)."""
+    fmt = control_state["camera"]["settings"]["current"].get("imageformat")
+    return 1 if zm_settings.is_raw_plus_jpeg(fmt) else 0
+
+
+def ensure_jpeg(output_path, files):
+    """
+    Garantiza un JPEG visible en output_path. Si la cámara solo entregó RAW,
+    se extrae su vista previa incrustada más grande (sin decodificar el RAW);
+    el revelado completo se hace después (zm_develop).
+    Devuelve output_path o None.
+    """
+    if output_path in files:
+        return output_path
+    for path in files:
+        if zm_convert.is_raw(path):
+            extracted = zm_embedded.extract_preview(path)
+            if extracted:
+                zm_convert._atomic_write_bytes(extracted[0], output_path)
+                return output_path
+    print(f"[ZETA MOTION] No JPEG available for {output_path} (files: {files})")
+    return None
+
+
+def capture_files(output_path, camera_device=None):
+    """
+    Dispara y descarga todos los archivos de la toma (RAW+JPEG = dos) con el
+    nombre de output_path y la extensión de cada archivo de la cámara.
+    Devuelve la lista de rutas ([] si hubo error). Bloqueante.
+    """
+    try:
+        return zm_worker.get_session(camera_device).capture(
+            output_path, companions=companions_for_current_format())
+    except (zm_session.SessionError, OSError) as e:
+        print(f"[ZETA MOTION] Error al capturar imagen: {e}")
+        return []
+
 
 def capture_image(output_path, camera_device=None):
     """
-    Captura una imagen desde gphoto2 y la guarda en output_path.
+    Captura una imagen a través de la sesión persistente de la cámara y la
+    guarda en output_path: dispara y descarga el archivo anunciado por el
+    evento FILE_ADDED de la cámara. camera_device es el puerto gphoto2
+    (None = cámara activa). Es la única ruta de captura del add-on.
+    Con RAW, el RAW queda junto a output_path y output_path recibe el JPEG
+    de la cámara o, si no lo hay, su vista previa incrustada.
     Devuelve True si la captura fue exitosa, False si hubo error.
+    Bloqueante: llamar desde una tarea de zm_worker.
     """
+    files = capture_files(output_path, camera_device)
+    if not files:
+        return False
     try:
-        cmd = ["gphoto2", "--capture-image-and-download", "--filename", output_path]
-        if camera_device:
-            cmd.extend(["--camera", camera_device])
-        subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"[ZETA MOTION] Error al capturar imagen: {e.stderr.decode('utf-8').strip()}")
+        return ensure_jpeg(output_path, files) is not None
+    except OSError as e:
+        print(f"[ZETA MOTION] Error al extraer la vista previa del RAW: {e}")
         return False
 
 
@@ -33,7 +77,7 @@ def build_output_path(scene, prefix="frame"):
     """
     Genera un nombre de archivo con timestamp dentro del directorio de salida de Zeta Motion.
     """
-    directory = bpy.path.abspath(scene.zm_output_dir)
+    directory = bpy.path.abspath(getattr(scene, "zm_output_dir", "") or scene.zm_preview_path or "//")
     if not os.path.exists(directory):
         os.makedirs(directory, exist_ok=True)
 
@@ -0,0 +1,422 @@
+# zm_codec.py — Zeta Motion
+# Blender 4.5+ | Linux-only
+# Capa de códecs JPEG con backends intercambiables:
+#   - pillow:    siempre disponible.
+#   - turbojpeg: libjpeg-turbo vía PyTurboJPEG (opcional); decodifica con
+#                escalado DCT y codifica sin pasar por PIL.
+#   - ffmpeg:    subproceso por imagen. El arranque del proceso solo se
+#                amortiza en trabajos masivos (pool de proxies): rol "bulk".
+# Al arrancar, un micro-benchmark (decodificar + reducir + codificar un
+# frame) elige el backend más rápido de cada rol y la elección se guarda en
+# ~/.cache/zeta_motion/codec.json; solo se repite si cambia el entorno
+# (versiones, ffmpeg, núcleos).
+# Los parámetros de codificación van por tipo de salida (PROFILES: proxy,
+# placeholder, snapshot) y se pueden ajustar en la sección "profiles" del
+# mismo archivo o con set_profile().
+# Sin bpy: se importa también desde los procesos del pool de proxies.
+
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import threading
+import time
+
+from PIL import Image
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import turbojpeg
+except ImportError:
+    turbojpeg = None
+
+# Relative import inside the add-on; plain import in the proxy pool workers
+try:
+    from . import zm_embedded
+except ImportError:
+    import zm_embedded
+
+CACHE_VERSION = 1
+JPEG_SOI = b"\xff\xd8"
+ROLES = ("interactive", "bulk")
+DEFAULT_BACKEND = "pillow"
+FFMPEG_TIMEOUT = 30        # segundos por imagen
+BENCHMARK_SIZE = (2400, 1600)
+BENCHMARK_REPEATS = 3
+BENCHMARK_SCALE = 0.5
+
+# optimize añade una pasada de Huffman por imagen: solo compensa en lo que se guarda
+PROFILES = {
+    "proxy":       {"quality": 85, "optimize": False, "progressive": False, "subsampling": "4:2:0"},
+    "placeholder": {"quality": 75, "optimize": False, "progressive": False, "subsampling": "4:2:0"},
+    "snapshot":    {"quality": 92, "optimize": True,  "progressive": False, "subsampling": "4:2:2"},
+}
+
+_lock = threading.Lock()
+_selection = None          # {rol: nombre de backend}
+_selecting = None          # hilo del benchmark en curso
+_profiles_loaded = False   # ajustes de "profiles" del archivo ya aplicados
+
+
+def _cache_path():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "zeta_motion", "codec.json")
+
+def _is_jpeg(source):
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source[:2]) == JPEG_SOI
+    return os.path.splitext(source)[1].lower() in (".jpg", ".jpeg")
+
+def _target_size(size, scale):
+    return max(1, int(size[0] * scale)), max(1, int(size[1] * scale))
+
+
+# ----------------------------------------------------------------
+# Backends
+# ----------------------------------------------------------------
+class PillowBackend:
+    name = "pillow"
+    bulk_only = False
+
+    def available(self):
+        return True
+
+    def can_decode(self, source):
+        return True
+
+    def decode(self, source, scale=None):
+        """
+        (imagen PIL cargada, tamaño original). Con `scale`, libjpeg reduce a
+        1/2, 1/4 u 1/8 en el dominio DCT sin bajar de ese tamaño (Image.draft).
+        """
+        img = Image.open(io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source)
+        full = img.size
+        if scale and img.format == "JPEG":
+            img.draft(img.mode, _target_size(full, scale))
+        img.load()
+        return img, full
+
+    def encode(self, img, params):
+        out = io.BytesIO()
+        img.save(out, "JPEG", quality=int(params["quality"]), optimize=bool(params["optimize"]),
+                 progressive=bool(params["progressive"]), subsampling=params["subsampling"])
+        return out.getvalue()
+
+
+class TurboJPEGBackend:
+    name = "turbojpeg"
+    bulk_only = False
+    # 'optimize' no está expuesto por PyTurboJPEG: se ignora
+    SUBSAMPLING = {"4:4:4": "TJSAMP_444", "4:2:2": "TJSAMP_422", "4:2:0": "TJSAMP_420"}
+
+    def __init__(self):
+        self._jpeg = None
+        self._error = None
+
+    def available(self):
+        if turbojpeg is None or np is None:
+            return False
+        if self._jpeg is None and self._error is None:
+            try:
+                self._jpeg = turbojpeg.TurboJPEG()
+            except Exception as e:   # libturbojpeg.so no encontrada
+                self._error = e
+                print(f"[Zeta Motion][Codec] TurboJPEG unavailable: {e}")
+        return self._jpeg is not None
+
+    def can_decode(self, source):
+        return _is_jpeg(source)
+
+    def decode(self, source, scale=None):
+        if isinstance(source, (bytes, bytearray)):
+            data = source
+        else:
+            with open(source, "rb") as f:
+                data = f.read()
+        width, height, _, _ = self._jpeg.decode_header(data)
+        factor = None
+        if scale:
+            tw, th = _target_size((width, height), scale)
+            # La mayor reducción soportada que no quede por debajo del objetivo
+            for num, denom in sorted(self._jpeg.scaling_factors, key=lambda f: f[0] / f[1]):
+                if num < denom and -(-width * num // denom) >= tw and -(-height * num // denom) >= th:
+                    factor = (num, denom)
+                    break
+        pixels = self._jpeg.decode(data, pixel_format=turbojpeg.TJPF_RGB, scaling_factor=factor)
+        return Image.fromarray(pixels, "RGB"), (width, height)
+
+    def encode(self, img, params):
+        flags = turbojpeg.TJFLAG_PROGRESSIVE if params["progressive"] else 0
+        if img.mode == "L":
+            pixels = np.asarray(img)[:, :, None]
+            return self._jpeg.encode(pixels, quality=int(params["quality"]), pixel_format=turbojpeg.TJPF_GRAY,
+                                     jpeg_subsample=turbojpeg.TJSAMP_GRAY, flags=flags)
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        subsample = getattr(turbojpeg, self.SUBSAMPLING.get(params["subsampling"], "TJSAMP_420"))
+        return self._jpeg.encode(np.ascontiguousarray(np.asarray(img)), quality=int(params["quality"]),
+                                 pixel_format=turbojpeg.TJPF_RGB, jpeg_subsample=subsample, flags=flags)
+
+
+class FFmpegBackend:
+    name = "ffmpeg"
+    bulk_only = True
+    # 'progressive' no existe en el codificador mjpeg: se ignora
+    PIX_FMTS = {"4:4:4": "yuvj444p", "4:2:2": "yuvj422p", "4:2:0": "yuvj420p"}
+
+    def available(self):
+        return shutil.which("ffmpeg") is not None
+
+    def can_decode(self, source):
+        return _is_jpeg(source)
+
+    def _run(self, args, data=None):
+        stdin = {"input": data} if data is not None else {"stdin": subprocess.DEVNULL}
+        proc = subprocess.run(["ffmpeg", "-v", "error"] + args, stdout=subprocess.PIPE,
+                              stderr=subprocess.PIPE, timeout=FFMPEG_TIMEOUT, **stdin)
+        if proc.returncode != 0:
+            raise OSError(f"ffmpeg failed: {proc.stderr.decode(errors='replace').strip()}")
+        return proc.stdout
+
+    def decode(self, source, scale=None):
+        size = zm_embedded.jpeg_dimensions(source)
+        if not size:
+            raise OSError("cannot read JPEG size")
+        if isinstance(source, (bytes, bytearray)):
+            args, data = ["-f", "jpeg_pipe", "-i", "-"], bytes(source)
+        else:
+            args, data = ["-i", source], None
+        raw = self._run(args + ["-frames:v", "1", "-f", "rawvideo", "-pix_fmt", "rgb24", "-"], data)
+        return Image.frombytes("RGB", size, raw), size
+
+    def encode(self, img, params):
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        # quality 1-100 -> qscale 31-2 (menor es mejor)
+        qscale = max(2, min(31, round(31 - int(params["quality"]) * 0.29)))
+        return self._run(["-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{img.width}x{img.height}", "-i", "-",
+                          "-frames:v", "1", "-c:v", "mjpeg", "-q:v", str(qscale),
+                          "-huffman", "optimal" if params["optimize"] else "default",
+                          "-pix_fmt", self.PIX_FMTS.get(params["subsampling"], "yuvj420p"),
+                          "-f", "image2pipe", "-"], img.tobytes())
+
+
+BACKENDS = {b.name: b for b in (PillowBackend(), TurboJPEGBackend(), FFmpegBackend())}
+
+
+def available_backends(role="bulk"):
+    return [name for name, b in BACKENDS.items()
+            if b.available() and (role == "bulk" or not b.bulk_only)]
+
+def get_backend(name=None, role="interactive"):
+    """Backend `name` si está disponible; si no, el elegido para `role` (pillow en último caso)."""
+    backend = BACKENDS.get(name or selected(role))
+    if backend is None or not backend.available():
+        backend = BACKENDS[DEFAULT_BACKEND]
+    return backend
+
+
+# ----------------------------------------------------------------
+# Perfiles de codificación
+# ----------------------------------------------------------------
+def _load_profiles():
+    """Aplica una vez por proceso los ajustes de la sección "profiles" del archivo."""
+    global _profiles_loaded
+    if _profiles_loaded:
+        return
+    _profiles_loaded = True
+    for kind, params in (_load_cache().get("profiles") or {}).items():
+        try:
+            set_profile(kind, **params)
+        except (TypeError, ValueError) as e:
+            print(f"[Zeta Motion][Codec] Ignoring profile '{kind}' in {_cache_path()}: {e}")
+
+def profile(kind, **overrides):
+    """Parámetros de codificación de `kind` con `overrides` (los None no cuentan)."""
+    _load_profiles()
+    params = dict(PROFILES.get(kind, PROFILES["proxy"]))
+    params.update({k: v for k, v in overrides.items() if v is not None})
+    return params
+
+def set_profile(kind, **params):
+    """Cambia los parámetros de un tipo de salida para esta sesión."""
+    unknown = set(params) - set(PROFILES["proxy"])
+    if unknown:
+        raise ValueError(f"unknown encode parameters: {', '.join(sorted(unknown))}")
+    PROFILES.setdefault(kind, dict(PROFILES["proxy"])).update(params)
+
+
+# ----------------------------------------------------------------
+# API
+# ----------------------------------------------------------------
+def decode(source, scale=None, codec=None):
+    """
+    Decodifica un JPEG (ruta o bytes) u otra imagen. Devuelve (imagen PIL,
+    tamaño original); con `scale` la imagen puede venir ya reducida por el
+    decodificador, nunca por debajo de ese factor.
+    """
+    backend = get_backend(codec)
+    if not backend.can_decode(source):
+        backend = BACKENDS[DEFAULT_BACKEND]
+    return backend.decode(source, scale)
+
+def encode(img, kind="proxy", codec=None, **overrides):
+    """Bytes JPEG de `img` con el perfil `kind` (quality=..., etc. lo ajustan)."""
+    if img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+    return get_backend(codec).encode(img, profile(kind, **overrides))
+
+def image_size(path):
+    """(ancho, alto) sin decodificar: cabecera SOF en JPEG, PIL en el resto. None si falla."""
+    size = zm_embedded.jpeg_dimensions(path) if _is_jpeg(path) else None
+    if size:
+        return size
+    try:
+        with Image.open(path) as img:
+            return img.size
+    except Exception as e:
+        print(f"[Zeta Motion][Codec] Cannot read image size of {path}: {e}")
+        return None
+
+
+# ----------------------------------------------------------------
+# Selección por micro-benchmark (cacheada en disco)
+# ----------------------------------------------------------------
+def _environment():
+    return {
+        "pillow": Image.__version__,
+        "turbojpeg": BACKENDS["turbojpeg"].available(),
+        "ffmpeg": shutil.which("ffmpeg"),
+        "cpus": os.cpu_count(),
+        "machine": platform.machine(),
+    }
+
+def _sample_jpeg():
+    """Frame sintético (ruido + degradados) codificado con calidad de cámara."""
+    noise = Image.effect_noise(BENCHMARK_SIZE, 48)
+    gradient = Image.linear_gradient("L").resize(BENCHMARK_SIZE)
+    img = Image.merge("RGB", (noise, gradient, gradient.transpose(Image.FLIP_LEFT_RIGHT)))
+    return BACKENDS["pillow"].encode(img, profile("snapshot", quality=95, optimize=False))
+
+def benchmark(sample=None, repeats=BENCHMARK_REPEATS):
+    """
+    Mejor tiempo (ms) de cada backend disponible para decodificar `sample`
+    (ruta o bytes JPEG; por defecto uno sintético) reducido a la mitad,
+    ajustarlo y codificarlo con el perfil proxy. {nombre: ms}.
+    """
+    if isinstance(sample, (bytes, bytearray)):
+        data = sample
+    elif sample:
+        with open(sample, "rb") as f:
+            data = f.read()
+    else:
+        data = _sample_jpeg()
+    results = {}
+    for name in available_backends("bulk"):
+        backend = BACKENDS[name]
+        times = []
+        try:
+            for _ in range(max(1, repeats)):
+                t0 = time.perf_counter()
+                img, full = backend.decode(data, BENCHMARK_SCALE)
+                target = _target_size(full, BENCHMARK_SCALE)
+                if img.size != target:
+                    img = img.resize(target, Image.LANCZOS)
+                backend.encode(img, profile("proxy"))
+                times.append(time.perf_counter() - t0)
+        except Exception as e:
+            print(f"[Zeta Motion][Codec] Benchmark of '{name}' failed: {e}")
+            continue
+        results[name] = min(times) * 1000
+    return results
+
+def _choose(results):
+    selection = {}
+    for role in ROLES:
+        candidates = {n: ms for n, ms in results.items() if n in available_backends(role)}
+        selection[role] = min(candidates, key=candidates.get) if candidates else DEFAULT_BACKEND
+    return selection
+
+def _load_cache():
+    try:
+        with open(_cache_path(), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if data.get("version") == CACHE_VERSION else {}
+
+def _save_cache(data):
+    path = _cache_path()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"[Zeta Motion][Codec] Cannot save codec cache: {e}")
+
+def select(sample=None, repeats=BENCHMARK_REPEATS):
+    """Ejecuta el benchmark, elige backend por rol y lo guarda. Devuelve (selección, resultados)."""
+    global _selection
+    results = benchmark(sample, repeats)
+    selection = _choose(results)
+    data = _load_cache()
+    data.update({"version": CACHE_VERSION, "environment": _environment(), "selection": selection,
+                 "benchmark_ms": results})
+    data.setdefault("profiles", {})
+    _save_cache(data)
+    with _lock:
+        _selection = selection
+    print("[Zeta Motion][Codec] Backends: " + ", ".join(f"{n} {ms:.0f} ms" for n, ms in results.items())
+          + f" -> interactive '{selection['interactive']}', bulk '{selection['bulk']}'")
+    return selection, results
+
+def _load_selection():
+    """Selección cacheada si el entorno no ha cambiado, o None."""
+    data = _load_cache()
+    if data.get("environment") != _environment():
+        return None
+    selection = data.get("selection") or {}
+    return selection if all(role in selection for role in ROLES) else None
+
+def selected(role="interactive"):
+    """Nombre del backend elegido para `role` (pillow hasta que haya una elección)."""
+    global _selection
+    with _lock:
+        if _selection is None:
+            _selection = _load_selection() or {}
+        return _selection.get(role, DEFAULT_BACKEND)
+
+def ensure_selected(background=True):
+    """
+    Al arrancar: usa la elección cacheada o lanza el benchmark (en un hilo
+    con background=True; mientras tanto se usa pillow).
+    """
+    global _selection
+    cached = _load_selection()
+    if cached:
+        with _lock:
+            _selection = cached
+        return
+    if not background:
+        select()
+        return
+    select_async()
+
+def select_async(sample=None, repeats=BENCHMARK_REPEATS):
+    """select() en un hilo (uno a la vez). Devuelve False si ya hay un benchmark en curso."""
+    global _selecting
+    with _lock:
+        if _selecting is not None and _selecting.is_alive():
+            return False
+        _selecting = threading.Thread(target=select, args=(sample, repeats), daemon=True,
+                                      name="zm_codec_benchmark")
+        _selecting.start()
+    return True
@@ -1,16 +1,57 @@
 # zm_convert.py — Zeta Motion
 # Conversion utilities (HD -> proxy), naming helpers and swap logic.
 # Designed to be minimal-impact and callable from zm_movie and zm_ui.
+# The conversion half has no Blender dependency so it can also be imported
+# as a top-level module by the proxy process pool (zm_proxy_pool).
 
 import os
+import re
 import threading
 import tempfile
+import time
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
-import bpy
 
-# JPEG quality for proxies
-DEFAULT_QUALITY = 85
+# Relative import inside the add-on; plain import in the proxy pool workers
+try:
+    from . import zm_codec, zm_embedded, zm_manifest
+except ImportError:
+    import zm_codec
+    import zm_embedded
+    import zm_manifest
+
+# bpy is only needed for main-thread callbacks and strip swapping; pool
+# worker processes import this module outside Blender.
+try:
+    import bpy
+except ImportError:
+    bpy = None
+
+# JPEG quality for proxies (the rest of the encode settings: zm_codec.PROFILES["proxy"])
+DEFAULT_QUALITY = zm_codec.PROFILES["proxy"]["quality"]
+
+# Bounded pool for single-image conversions right after a capture
+ASYNC_WORKERS = 2
+_async_pool = None
+_async_pool_lock = threading.Lock()
+
+# Frame file types. Proxies are always JPEG; an HD frame can be the camera
+# JPEG, a RAW file or the TIFF developed from it (zm_develop).
+JPEG_EXTS = ('.jpg', '.jpeg')
+DEVELOPED_EXTS = ('.tif', '.tiff')
+RAW_EXTS = ('.cr2', '.cr3', '.crw', '.nef', '.nrw', '.arw', '.srf', '.sr2',
+            '.dng', '.orf', '.rw2', '.raf', '.pef')
+# Best HD source first when several files share a frame index
+HD_SOURCE_EXTS = DEVELOPED_EXTS + JPEG_EXTS + RAW_EXTS
+
+# HD frames: base_00001.jpg / .cr2 / .tif or base_HD_00001.jpg (never base_50_00001.jpg)
+HD_FRAME_RE = re.compile(
+    r"^(?P<base>.+?)(?:_HD)?_(?P<index>\d+)(?P<ext>\.(?:%s))$" % "|".join(e[1:] for e in HD_SOURCE_EXTS),
+    re.IGNORECASE)
+PROXY_TOKENS = ('25', '50', '75')
+# Proxy frames: base_50_00001.jpg
+PROXY_FRAME_RE = re.compile(r"^(?P<base>.+)_(?P<scale>25|50|75)_(?P<index>\d+)(?P<ext>\.jpe?g)$", re.IGNORECASE)
 
 # Map scale string to float
 SCALE_MAP = {
@@ -19,6 +60,31 @@ SCALE_MAP = {
     '75': 0.75,
 }
 
+# Proxy decode modes (per scene: zm_proxy_decode)
+# QUALITY: full decode + LANCZOS. FAST: libjpeg decodes straight to 1/2, 1/4
+# or 1/8 in the DCT domain (Image.draft) and only a small resize is left.
+DECODE_MODES = [
+    ('FAST', "Fast", "Let the JPEG decoder downscale (1/2, 1/4) and finish with a small resize"),
+    ('QUALITY', "Quality", "Decode at full resolution and downscale with Lanczos"),
+]
+DEFAULT_DECODE = 'FAST'
+# Scales where DCT scaling pays off (75% needs a full decode anyway)
+DRAFT_SCALES = ('25', '50')
+
+# Embedded previews smaller than this fraction of the proxy are not worth showing
+MIN_EMBEDDED_RATIO = 0.25
+
+# Where proxies are written (per scene: zm_proxy_layout)
+# SIBLING: base_50_00001.jpg next to the HD frame; strips are switched by name.
+# BLENDER: Blender's own per-strip layout, BL_proxy/images/50/base_00001.jpg_proxy.jpg;
+# the strip keeps its HD files and the preview size picks the proxy.
+PROXY_LAYOUTS = [
+    ('SIBLING', "Next to HD", "Write base_50_00001.jpg files next to the HD frames and switch strips between them"),
+    ('BLENDER', "Blender Proxies", "Write Blender's BL_proxy files and let the preview size choose the resolution"),
+]
+DEFAULT_LAYOUT = 'SIBLING'
+BL_PROXY_DIR = "BL_proxy"
+
 # Helper: produce proxy filename in same dir
 # Example: /path/mipeli_HD_00001.jpg -> /path/mipeli_25_00001.jpg
 
@@ -57,13 +123,98 @@ def get_hd_name(filepath):
         return os.path.join(dirn, f"{name}_HD{ext}")
 
 
-def _atomic_save(img: Image.Image, dest_path: str, quality:int=DEFAULT_QUALITY):
-    # save to temp then atomically replace
-    dirn = os.path.dirname(dest_path)
-    fd, tmp = tempfile.mkstemp(suffix=".jpg", dir=dirn)
-    os.close(fd)
+def is_raw(path):
+    return os.path.splitext(path)[1].lower() in RAW_EXTS
+
+
+def _read_source(hd_path):
+    """
+    What to decode for an HD frame: its path, or for RAW files the JPEG bytes
+    of their largest embedded preview, which stands in until the frame is
+    developed.
+    """
+    if is_raw(hd_path):
+        extracted = zm_embedded.extract_preview(hd_path)
+        if not extracted:
+            raise OSError(f"no embedded preview in {hd_path}")
+        return extracted[0]
+    return hd_path
+
+
+def blender_proxy_path_for(hd_path, scale_label):
+    """
+    Blender's per-strip proxy path for an HD frame:
+    <dir>/BL_proxy/images/{scale}/{filename}_proxy.jpg, where filename is the
+    JPEG the strip lists (RAW and developed frames are shown through it).
+    """
+    dirn, base = os.path.split(hd_path)
+    name, ext = os.path.splitext(base)
+    if ext.lower() not in JPEG_EXTS:
+        base = name + '.jpg'
+    return os.path.join(dirn, BL_PROXY_DIR, "images", str(scale_label), f"{base}_proxy.jpg")
+
+
+def proxy_path_for(hd_path, scale_label, layout=DEFAULT_LAYOUT):
+    """Proxy path for an HD frame: base_{scale}_{index}.jpg next to it, or Blender's (layout='BLENDER')."""
+    if layout == 'BLENDER':
+        return blender_proxy_path_for(hd_path, scale_label)
+    base = os.path.basename(hd_path)
+    name, ext = os.path.splitext(base)
+    tokens = name.split('_')
+    idx = '00001'
+    if tokens and tokens[-1].isdigit():
+        idx = tokens[-1]
+        core_tokens = tokens[:-1]
+        if core_tokens and core_tokens[-1] == 'HD':
+            core_tokens = core_tokens[:-1]
+        core = '_'.join(core_tokens)
+    else:
+        core = name
+    if ext.lower() not in JPEG_EXTS:
+        ext = '.jpg'
+    return os.path.join(os.path.dirname(hd_path), f"{core}_{scale_label}_{idx}{ext}")
+
+
+def find_hd_frames(directory, base_name=None):
+    """
+    Sorted list of HD frame paths in `directory` (optionally only `base_name`).
+    Proxies (base_25_/50_/75_) and placeholders excluded by name are skipped.
+    One path per frame index: developed TIFF, then JPEG, then RAW.
+    """
+    frames = {}
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return frames
+    for f in names:
+        m = HD_FRAME_RE.match(f)
+        if not m:
+            continue
+        base = m.group("base")
+        if base.rsplit('_', 1)[-1] in PROXY_TOKENS:
+            continue
+        if base_name and base != base_name:
+            continue
+        key = (base, int(m.group("index")))
+        rank = HD_SOURCE_EXTS.index(m.group("ext").lower())
+        if key not in frames or rank < frames[key][0]:
+            frames[key] = (rank, os.path.join(directory, f))
+    return [frames[key][1] for key in sorted(frames)]
+
+
+def _atomic_save(img: Image.Image, dest_path: str, quality:int=DEFAULT_QUALITY, codec=None):
+    # encode with the proxy profile, then write to temp and atomically replace
+    _atomic_write_bytes(zm_codec.encode(img, "proxy", codec, quality=quality), dest_path)
+
+
+def _atomic_write_bytes(data, dest_path):
+    """Write raw bytes to dest_path through a temp file + os.replace."""
+    dirn = os.path.dirname(dest_path) or "."
+    os.makedirs(dirn, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".zm_tmp_", suffix=".jpg", dir=dirn)
     try:
-        img.save(tmp, "JPEG", quality=int(quality), optimize=True)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
         os.replace(tmp, dest_path)
     finally:
         if os.path.exists(tmp):
@@ -73,9 +224,64 @@ def _atomic_save(img: Image.Image, dest_path: str, quality:int=DEFAULT_QUALITY):
                 pass
 
 
-def convert_image(hd_path, scale_label, quality=DEFAULT_QUALITY):
+def proxy_size_for(hd_path, scale_label):
+    """Final proxy size (w, h) from the HD header alone, or None."""
+    dims = zm_embedded.jpeg_dimensions(hd_path)
+    if not dims:
+        return None
+    scale = SCALE_MAP.get(str(scale_label), 0.5)
+    return max(1, int(dims[0] * scale)), max(1, int(dims[1] * scale))
+
+
+def write_embedded_proxy(hd_path, scale_label, layout=DEFAULT_LAYOUT):
+    """
+    Provisional proxy in milliseconds: the camera's embedded preview is
+    copied byte for byte to the proxy path (no decode, no re-encode).
+    Not recorded in the manifest, so the full-quality conversion still runs
+    and replaces it. Returns (proxy_path or None, final proxy size or None).
+    """
+    target = proxy_size_for(hd_path, scale_label)
+    proxy_path = proxy_path_for(hd_path, scale_label, layout)
+    try:
+        extracted = zm_embedded.extract_preview(hd_path, target)
+        if not extracted:
+            return None, target
+        data, size = extracted
+        if target and size[0] < target[0] * MIN_EMBEDDED_RATIO:
+            return None, target
+        _atomic_write_bytes(data, proxy_path)
+    except OSError as e:
+        print(f"[Zeta Motion][Convert] Embedded preview failed for {hd_path}: {e}")
+        return None, target
+    print(f"[Zeta Motion][Convert] Provisional proxy from embedded preview: {proxy_path} ({size[0]}x{size[1]})")
+    return proxy_path, target
+
+
+def _decode_scaled(hd_path, scale_label, decode, codec=None):
+    """
+    Decode hd_path downscaled to scale_label. Returns (image, decoded_size, full_size).
+    In FAST mode the decoder itself produces the largest 1/2^n reduction that
+    is still >= the target, so the full-size frame is never materialised.
+    """
+    scale = SCALE_MAP.get(str(scale_label), 0.5)
+    draft = decode == 'FAST' and str(scale_label) in DRAFT_SCALES
+    img, full = zm_codec.decode(_read_source(hd_path), scale if draft else None, codec)
+    decoded_size = img.size
+    if img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+    target = (max(1, int(full[0] * scale)), max(1, int(full[1] * scale)))
+    if img.size != target:
+        img = img.resize(target, Image.LANCZOS, reducing_gap=2.0)
+    return img, decoded_size, full
+
+
+def convert_image(hd_path, scale_label, quality=DEFAULT_QUALITY, decode=DEFAULT_DECODE, layout=DEFAULT_LAYOUT,
+                  codec=None):
     """
     Convert hd_path into a proxy at scale_label ('25','50','75').
+    decode: 'FAST' (DCT-domain downscale for 25/50) or 'QUALITY' (full decode).
+    layout: 'SIBLING' or 'BLENDER' (see PROXY_LAYOUTS).
+    codec: zm_codec backend name (default: the one selected for interactive use).
     Returns proxy_path on success, None on failure.
     This function is safe to call from a background thread.
     """
@@ -83,49 +289,127 @@ def convert_image(hd_path, scale_label, quality=DEFAULT_QUALITY):
         print(f"[Zeta Motion][Convert] HD not found: {hd_path}")
         return None
 
-    scale = SCALE_MAP.get(str(scale_label), 0.5)
     try:
-        with Image.open(hd_path) as img:
-            w, h = img.size
-            tw = max(1, int(w * scale))
-            th = max(1, int(h * scale))
-
-            # copy and thumbnail to be memory-friendly
-            img_copy = img.copy()
-            img_copy.thumbnail((tw, th), Image.LANCZOS)
-
-            if img_copy.mode not in ("RGB", "L"):
-                img_copy = img_copy.convert("RGB")
-
-            # build proxy filename: base_{scale}_{index}.jpg
-            # We'll try to preserve the trailing index token if present
-            base = os.path.basename(hd_path)
-            name, ext = os.path.splitext(base)
-            tokens = name.split('_')
-            idx = '00001'
-            if tokens and tokens[-1].isdigit():
-                idx = tokens[-1]
-                core = '_'.join(tokens[:-1])
-            else:
-                core = name
-
-            proxy_name = f"{core}_{scale_label}_{idx}{ext}"
-            proxy_path = os.path.join(os.path.dirname(hd_path), proxy_name)
-
-            _atomic_save(img_copy, proxy_path, quality=quality)
-            print(f"[Zeta Motion][Convert] Proxy created: {proxy_path} ({tw}x{th})")
-            return proxy_path
+        img, _, _ = _decode_scaled(hd_path, scale_label, decode, codec)
+        tw, th = img.size
+
+        # build proxy filename: base_{scale}_{index}.jpg (or BL_proxy/...)
+        proxy_path = proxy_path_for(hd_path, scale_label, layout)
+
+        _atomic_save(img, proxy_path, quality=quality, codec=codec)
+        print(f"[Zeta Motion][Convert] Proxy created: {proxy_path} ({tw}x{th})")
+        return proxy_path
     except Exception as e:
         print(f"[Zeta Motion][Convert] Failed to convert {hd_path}: {e}")
         return None
 
 
-def convert_image_async(hd_path, scale_label, quality=DEFAULT_QUALITY, callback=None):
-    """Start conversion in a background thread. callback(proxy_path) is invoked in main thread via bpy.app.timers.register.
+def convert_pyramid(hd_path, scale_labels=PROXY_TOKENS, quality=DEFAULT_QUALITY, decode=DEFAULT_DECODE,
+                    layout=DEFAULT_LAYOUT, codec=None):
+    """
+    Decode hd_path once and write every proxy level in scale_labels.
+    The largest level comes from the decoder (DCT-scaled in FAST mode), and
+    each smaller level is resized from the previous one, not from the HD.
+    codec: zm_codec backend name (the proxy pool passes the bulk choice).
+    Returns {scale_label: proxy_path or None}.
+    """
+    levels = sorted({str(s) for s in scale_labels}, key=lambda s: SCALE_MAP.get(s, 0.5), reverse=True)
+    results = {s: None for s in levels}
+    if not levels:
+        return results
+    if not os.path.exists(hd_path):
+        print(f"[Zeta Motion][Convert] HD not found: {hd_path}")
+        return results
+
+    try:
+        level, _, (w, h) = _decode_scaled(hd_path, levels[0], decode, codec)
+        for scale_label in levels:
+            scale = SCALE_MAP.get(scale_label, 0.5)
+            size = (max(1, int(w * scale)), max(1, int(h * scale)))
+            if level.size != size:
+                level = level.resize(size, Image.LANCZOS)
+            proxy_path = proxy_path_for(hd_path, scale_label, layout)
+            _atomic_save(level, proxy_path, quality=quality, codec=codec)
+            results[scale_label] = proxy_path
+        print(f"[Zeta Motion][Convert] Proxies created for {os.path.basename(hd_path)}: {', '.join(levels)}")
+    except Exception as e:
+        print(f"[Zeta Motion][Convert] Failed to convert {hd_path}: {e}")
+    return results
+
+
+def encode_settings(quality=DEFAULT_QUALITY, decode=DEFAULT_DECODE, codec=None):
+    """
+    Settings recorded in the manifest next to each proxy: the whole proxy
+    encode profile, the decode mode and the JPEG backend that writes it
+    (codec=None: the one selected for interactive use).
+    """
+    settings = zm_codec.profile("proxy", quality=int(quality))
+    settings.update(decode=decode, codec=zm_codec.get_backend(codec).name)
+    return settings
+
+
+def manifest_level(scale_label, layout=DEFAULT_LAYOUT):
+    """Manifest key of a proxy level: '50' next to the HD, 'BL_50' in BL_proxy (both are tracked)."""
+    return f"BL_{scale_label}" if layout == 'BLENDER' else str(scale_label)
+
+
+def stale_levels(hd_path, scale_labels, quality=DEFAULT_QUALITY, decode=DEFAULT_DECODE, layout=DEFAULT_LAYOUT,
+                 codec=None):
+    """Proxy levels of hd_path that are missing or out of date according to the manifest."""
+    manifest = zm_manifest.for_directory(os.path.dirname(hd_path))
+    keys = {manifest_level(s, layout): str(s) for s in scale_labels}
+    stale = manifest.stale_levels(hd_path, list(keys), encode_settings(quality, decode, codec),
+                                  lambda path, key: proxy_path_for(path, keys[key], layout))
+    return [keys[key] for key in stale]
+
+
+def record_proxies(hd_path, results, quality=DEFAULT_QUALITY, decode=DEFAULT_DECODE, save=True,
+                   layout=DEFAULT_LAYOUT, codec=None):
+    """Record convert_pyramid results for hd_path in its directory manifest."""
+    manifest = zm_manifest.for_directory(os.path.dirname(hd_path))
+    manifest.record(hd_path, {manifest_level(s, layout): p for s, p in results.items()},
+                    encode_settings(quality, decode, codec))
+    if save:
+        manifest.save()
+    return manifest
+
+
+def update_proxies(hd_path, scale_labels, quality=DEFAULT_QUALITY, decode=DEFAULT_DECODE, force=False,
+                   layout=DEFAULT_LAYOUT, codec=None):
+    """
+    Manifest-aware conversion: only the stale levels are regenerated (all of
+    them with force=True) and the manifest is updated.
+    Returns {scale_label: proxy_path or None} for every requested level.
+    """
+    levels = [str(s) for s in scale_labels]
+    stale = levels if force else stale_levels(hd_path, levels, quality, decode, layout, codec)
+    results = {s: proxy_path_for(hd_path, s, layout) for s in levels if s not in stale}
+    if stale:
+        converted = convert_pyramid(hd_path, stale, quality, decode, layout, codec)
+        record_proxies(hd_path, converted, quality, decode, layout=layout, codec=codec)
+        results.update(converted)
+    return results
+
+
+def _get_async_pool():
+    global _async_pool
+    with _async_pool_lock:
+        if _async_pool is None:
+            _async_pool = ThreadPoolExecutor(max_workers=ASYNC_WORKERS, thread_name_prefix="zm_convert")
+        return _async_pool
+
+
+def convert_image_async(hd_path, scale_label, quality=DEFAULT_QUALITY, callback=None, decode=DEFAULT_DECODE,
+                        levels=None, layout=DEFAULT_LAYOUT):
+    """Start conversion on a small bounded thread pool. callback(proxy_path) is invoked in main thread via bpy.app.timers.register.
     callback will be called with a single argument: proxy_path (or None).
+    levels: extra proxy levels to write in the same decode (see convert_pyramid).
+    Levels that the manifest reports as up to date are not regenerated.
+    Returns the Future of the conversion.
     """
     def _worker():
-        proxy = convert_image(hd_path, scale_label, quality)
+        wanted = set(levels or ()) | {str(scale_label)}
+        proxy = update_proxies(hd_path, wanted, quality, decode, layout=layout).get(str(scale_label))
         if callback:
             # schedule callback on main thread
             def _cb():
@@ -139,14 +423,198 @@ def convert_image_async(hd_path, scale_label, quality=DEFAULT_QUALITY, callback=
             except Exception as e:
                 print(f"[Zeta Motion][Convert] Failed scheduling callback: {e}")
 
-    t = threading.Thread(target=_worker, daemon=True)
-    t.start()
-    return t
+    return _get_async_pool().submit(_worker)
+
 
+def benchmark_decode(hd_path, scale_label='50', repeats=3, quality=DEFAULT_QUALITY, codec=None):
+    """
+    Time FAST vs QUALITY proxy generation (decode + resize + JPEG encode in
+    memory) for one HD frame. Returns {mode: {"best_ms", "mean_ms",
+    "decoded", "decoded_mpx", "size"}}; "decoded" is the size the decoder
+    actually produced, i.e. the pixel buffer each mode had to touch.
+    """
+    results = {}
+    for decode, _, _ in DECODE_MODES:
+        times = []
+        for _ in range(max(1, repeats)):
+            t0 = time.perf_counter()
+            out, decoded, _ = _decode_scaled(hd_path, scale_label, decode, codec)
+            zm_codec.encode(out, "proxy", codec, quality=quality)
+            times.append(time.perf_counter() - t0)
+        results[decode] = {
+            "best_ms": min(times) * 1000,
+            "mean_ms": sum(times) / len(times) * 1000,
+            "decoded": decoded,
+            "decoded_mpx": decoded[0] * decoded[1] / 1e6,
+            "size": out.size,
+        }
+    return results
+
+
+# ----------------------------------------------------------------
+# HD <-> proxy name index (one listdir per directory, cached by mtime)
+# ----------------------------------------------------------------
+HD_LEVEL = 'HD'
+# Blender can load these as HD frames (RAW cannot); developed TIFF first
+HD_DISPLAY_EXTS = DEVELOPED_EXTS + JPEG_EXTS
+
+_name_indexes = {}
+_name_indexes_lock = threading.Lock()
+
+
+class NameIndex:
+    """
+    For one directory: frame key (base, index) -> {level: filename} with
+    levels 'HD', '25', '50', '75', plus filename -> key for every known file.
+    """
+
+    def __init__(self, names):
+        self.frames = {}
+        self.keys = {}
+        for f in names:
+            m = PROXY_FRAME_RE.match(f)
+            if m:
+                key = (m.group('base'), int(m.group('index')))
+                self.frames.setdefault(key, {})[m.group('scale')] = f
+                self.keys[f] = key
+                continue
+            m = HD_FRAME_RE.match(f)
+            if not m or m.group('ext').lower() not in HD_DISPLAY_EXTS:
+                continue
+            key = (m.group('base'), int(m.group('index')))
+            levels = self.frames.setdefault(key, {})
+            current = levels.get(HD_LEVEL)
+            ext = m.group('ext').lower()
+            if current is None or HD_DISPLAY_EXTS.index(ext) < HD_DISPLAY_EXTS.index(os.path.splitext(current)[1].lower()):
+                levels[HD_LEVEL] = f
+            self.keys[f] = key
+
+    def counterpart(self, filename, level):
+        """Filename of the same frame at `level`; None if unknown frame, False if that level is missing."""
+        key = self.keys.get(filename)
+        if key is None:
+            return None
+        return self.frames[key].get(level, False)
+
+
+def name_index(directory):
+    """Cached NameIndex of directory, rebuilt when the directory listing changes."""
+    directory = os.path.abspath(directory)
+    try:
+        mtime = os.stat(directory).st_mtime_ns
+    except OSError:
+        return NameIndex(())
+    with _name_indexes_lock:
+        cached = _name_indexes.get(directory)
+        if cached and cached[0] == mtime:
+            return cached[1]
+    index = NameIndex(os.listdir(directory))
+    with _name_indexes_lock:
+        _name_indexes[directory] = (mtime, index)
+    return index
+
+
+def remap_strip(strip, level):
+    """
+    Point every frame of an image strip at `level` ('HD', '25', '50', '75')
+    by rewriting elements[].filename in place: the strip, its length and
+    all its properties are untouched. Frames the index does not know
+    (placeholders) are left as they are. Nothing changes if any known frame
+    lacks that level. Returns (changed, missing). Must be called in main thread.
+
+    With fit_method 'ORIGINAL' the strip is drawn at the pixel size of its
+    images, so transform.scale_x/scale_y are compensated by old/new size to
+    keep the same framing (the swap is refused if the sizes cannot be read).
+    """
+    if getattr(strip, 'type', None) != 'IMAGE' or not len(strip.elements):
+        return 0, 0
+    directory = bpy.path.abspath(strip.directory)
+    index = name_index(directory)
+    targets = []
+    missing = 0
+    for elem in strip.elements:
+        name = index.counterpart(elem.filename, level)
+        if name is False:
+            missing += 1
+        elif name and name != elem.filename:
+            targets.append((elem, name))
+    if missing:
+        return 0, missing
+    if targets and getattr(strip, 'fit_method', None) == 'ORIGINAL':
+        elem, name = targets[0]
+        old_size = zm_codec.image_size(os.path.join(directory, elem.filename))
+        new_size = zm_codec.image_size(os.path.join(directory, name))
+        if not old_size or not new_size:
+            print(f"[Zeta Motion][Swap] '{strip.name}': cannot read frame sizes to keep its scale; not swapped")
+            return 0, 0
+        transform = strip.transform
+        transform.scale_x *= old_size[0] / new_size[0]
+        transform.scale_y *= old_size[1] / new_size[1]
+    for elem, name in targets:
+        elem.filename = name
+    return len(targets), 0
+
+
+def is_proxy_strip(strip):
+    return (getattr(strip, 'type', None) == 'IMAGE' and len(strip.elements) > 0
+            and PROXY_FRAME_RE.match(strip.elements[0].filename) is not None)
+
+
+def retarget_scene_strips(scene, scale_label):
+    """Switch every proxy strip of the scene to scale_label. Returns (switched, missing)."""
+    seq = getattr(scene, 'sequence_editor', None)
+    switched = missing = 0
+    if not seq:
+        return switched, missing
+    for strip in seq.sequences_all:
+        if not is_proxy_strip(strip):
+            continue
+        changed, lacking = remap_strip(strip, str(scale_label))
+        if changed:
+            switched += 1
+        elif lacking:
+            missing += 1
+    return switched, missing
+
+
+def enable_blender_proxies(strip, scale_labels=PROXY_TOKENS):
+    """
+    Turn on Blender's own proxies for an image strip at scale_labels (the
+    files come from the 'BLENDER' layout). The strip keeps pointing at its
+    HD frames; each preview picks the proxy from its preview size, and
+    frames without a proxy file fall back to the HD image.
+    Returns True if the strip was set up. Must be called in main thread.
+    """
+    if getattr(strip, 'type', None) != 'IMAGE':
+        return False
+    seq = strip.id_data.sequence_editor
+    if seq and seq.proxy_storage != 'PER_STRIP':
+        print(f"[Zeta Motion][Proxy] Proxy storage is '{seq.proxy_storage}'; Blender will not find the "
+              f"proxies of '{strip.name}' next to its frames")
+    strip.use_proxy = True
+    proxy = strip.proxy
+    proxy.use_proxy_custom_directory = False
+    proxy.use_proxy_custom_file = False
+    # Blender's 'Rebuild Proxy' must not overwrite the files written here
+    proxy.use_overwrite = False
+    wanted = {str(s) for s in scale_labels}
+    for label in PROXY_TOKENS:
+        setattr(proxy, f"build_{label}", label in wanted)
+    proxy.build_100 = False
+    strip.invalidate_cache('RAW')
+    return True
+
+
+def blender_proxy_strips(scene, directory=None):
+    """Image strips of the scene with Blender proxies on (optionally only those reading `directory`)."""
+    seq = getattr(scene, 'sequence_editor', None)
+    if not seq:
+        return []
+    directory = os.path.normpath(directory) if directory else None
+    return [s for s in seq.sequences_all
+            if s.type == 'IMAGE' and s.use_proxy
+            and (directory is None or os.path.normpath(bpy.path.abspath(s.directory)) == directory)]
 
-# ----------------------------
-# Swap helper: recreate strip pointing to proxy or HD
-# ----------------------------
 
 def find_strip_by_base(scene, base_name):
     seq = getattr(scene, 'sequence_editor', None)
@@ -160,106 +628,27 @@ def find_strip_by_base(scene, base_name):
 
 def swap_strip_resolution(context, strip_name=None, use_proxy=True, scale_label=None):
     """
-    Swap the resolution target of the strip identified by strip_name (or scene.zm_preview_strip_name like logic).
-    If use_proxy is True, try to point the recreated strip to proxy; otherwise to HD.
+    Swap the strip identified by strip_name (default: the active strip)
+    between its HD frames and its proxies (scale_label, default
+    scene.zm_proxy_scale), in place for every frame (see remap_strip).
+    Returns the strip, or None if it could not be swapped.
     This function must be called in main thread.
-    Returns new_strip or None.
     """
     scene = context.scene
-
-    # If no strip_name provided, try to use stored name for movie strips: use a heuristic
-    if not strip_name:
-        print("[Zeta Motion][Swap] strip_name not provided")
-        return None
-
     seq = getattr(scene, 'sequence_editor', None)
     if not seq:
         print("[Zeta Motion][Swap] No sequence editor")
         return None
 
-    # find old strip
-    old = None
-    for s in seq.sequences_all:
-        if s.name == strip_name:
-            old = s
-            break
-    if not old:
-        print(f"[Zeta Motion][Swap] strip '{strip_name}' not found")
-        return None
-
-    # determine base_name from strip elements; use filename without scale tokens
-    try:
-        elem_fn = old.elements[0].filename
-    except Exception:
-        print("[Zeta Motion][Swap] cannot read element filename")
-        return None
-
-    # construct counterparts
-    dirn = os.path.dirname(bpy.path.abspath(old.filepath)) if getattr(old, 'filepath', None) else os.path.dirname(bpy.path.abspath(scene.zm_capture_path))
-    # try to infer core name and index
-    name, ext = os.path.splitext(elem_fn)
-    tokens = name.split('_')
-    idx = tokens[-1] if tokens[-1].isdigit() else '00001'
-    # core assumption: tokens before index compose the base
-    core = '_'.join(tokens[:-1]) if tokens[-1].isdigit() else tokens[0]
-
-    hd_candidate = os.path.join(dirn, f"{core}_HD_{idx}{ext}")
-    proxy_candidate = None
-    if scale_label:
-        proxy_candidate = os.path.join(dirn, f"{core}_{scale_label}_{idx}{ext}")
-    else:
-        # try detect any proxy in folder 25/50/75
-        for sfx in ('25','50','75'):
-            p = os.path.join(dirn, f"{core}_{sfx}_{idx}{ext}")
-            if os.path.exists(p):
-                proxy_candidate = p
-                break
-
-    target_path = proxy_candidate if use_proxy and proxy_candidate and os.path.exists(proxy_candidate) else hd_candidate
-    if not os.path.exists(target_path):
-        print(f"[Zeta Motion][Swap] target not found: {target_path}")
+    strip = find_strip_by_base(scene, strip_name) if strip_name else seq.active_strip
+    if strip is None or strip.type != 'IMAGE':
+        print(f"[Zeta Motion][Swap] image strip '{strip_name or 'active'}' not found")
         return None
 
-    # snapshot props
-    props = None
-    try:
-        import zm_properties
-        props = zm_properties.store_strip_properties(old)
-    except Exception:
-        props = None
-
-    channel = getattr(old, 'channel', 1)
-    frame_start = getattr(old, 'frame_start', scene.frame_current)
-    frame_duration = getattr(old, 'frame_final_duration', 1)
-
-    # destroy old
-    try:
-        seq.sequences.remove(old)
-    except Exception as e:
-        print(f"[Zeta Motion][Swap] failed to remove old strip: {e}")
-
-    # create new strip using existing helper: new_image with filepath set
-    try:
-        new_strip = scene.sequence_editor.sequences.new_image(
-            name=core,
-            filepath=target_path,
-            channel=channel,
-            frame_start=frame_start,
-        )
-        # set duration
-        try:
-            new_strip.frame_final_duration = frame_duration
-        except Exception:
-            pass
-        # apply props if available
-        if props:
-            try:
-                import zm_properties
-                zm_properties.apply_strip_properties(new_strip, props)
-            except Exception:
-                pass
-        print(f"[Zeta Motion][Swap] Recreated strip '{new_strip.name}' -> {target_path}")
-        return new_strip
-    except Exception as e:
-        print(f"[Zeta Motion][Swap] failed to create new strip: {e}")
+    level = str(scale_label or getattr(scene, 'zm_proxy_scale', '50')) if use_proxy else HD_LEVEL
+    changed, missing = remap_strip(strip, level)
+    if missing:
+        print(f"[Zeta Motion][Swap] '{strip.name}': {missing} frame(s) have no {level} version")
         return None
+    print(f"[Zeta Motion][Swap] '{strip.name}' -> {level} ({changed} frames)")
+    return strip
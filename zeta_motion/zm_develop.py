@@ -0,0 +1,153 @@
+# zm_develop.py — Zeta Motion
+# Blender 4.5+ | Linux-only
+# Revelado diferido de RAW a un intermedio de alta calidad.
+# Al disparar en RAW el strip usa enseguida la vista previa incrustada
+# (zm_capture_core.ensure_jpeg); más tarde cada RAW se revela con rawpy a
+# un TIFF RGB de 16 bits sin pérdida (base_00001.tif) junto al RAW, que
+# pasa a ser la fuente HD preferida, y sus proxies se regeneran a partir de él.
+# Se ejecuta en el pool de procesos de zm_proxy_pool: sin bpy.
+
+import os
+import struct
+import tempfile
+import zlib
+
+import numpy as np
+
+try:
+    import rawpy
+except ImportError:
+    rawpy = None
+
+# Relative import inside the add-on; plain import in the proxy pool workers
+try:
+    from . import zm_convert
+except ImportError:
+    import zm_convert
+
+DEVELOPED_EXT = ".tif"
+DEVELOP_LEVEL = "dev"      # pseudo-nivel del manifiesto para el revelado del RAW
+# Cambiar estos parámetros invalida los revelados anteriores (manifiesto)
+DEVELOP_PARAMS = {
+    "use_camera_wb": True,
+    "no_auto_bright": False,
+    "output_bps": 16,
+}
+TIFF_ROWS_PER_STRIP = 64
+TIFF_DEFLATE_LEVEL = 6
+
+
+def available():
+    return rawpy is not None
+
+def develop_settings():
+    """Ajustes anotados en el manifiesto junto a cada revelado."""
+    return {"develop": ",".join(f"{k}={v}" for k, v in sorted(DEVELOP_PARAMS.items()))}
+
+def developed_path_for(raw_path, level=DEVELOP_LEVEL):
+    """base_00001.cr2 -> base_00001.tif (firma compatible con proxy_path_for)."""
+    return os.path.splitext(raw_path)[0] + DEVELOPED_EXT
+
+def write_tiff16(path, rgb):
+    """
+    Escribe un array uint16 (alto, ancho, 3) como TIFF RGB de 16 bits con
+    deflate y predictor horizontal (PIL no sabe guardar RGB de 16 bits).
+    """
+    height, width, _ = rgb.shape
+    # Predictor 2: cada muestra guarda la diferencia con la de su izquierda
+    diff = np.ascontiguousarray(rgb, dtype="<u2").copy()
+    diff[:, 1:] -= rgb[:, :-1].astype("<u2")
+    strips = [zlib.compress(diff[y:y + TIFF_ROWS_PER_STRIP].tobytes(), TIFF_DEFLATE_LEVEL)
+              for y in range(0, height, TIFF_ROWS_PER_STRIP)]
+    count = len(strips)
+    # Cabecera + IFD (11 entradas) + valores fuera de línea + datos
+    ifd_at = 8
+    extra_at = ifd_at + 2 + 11 * 12 + 4
+    bps_at = extra_at
+    offsets_at = bps_at + 6
+    counts_at = offsets_at + 4 * count
+    data_at = counts_at + 4 * count
+    offsets = []
+    pos = data_at
+    for strip in strips:
+        offsets.append(pos)
+        pos += len(strip)
+
+    def entry(tag, typ, n, value):
+        # Un SHORT va en línea; un LONG o el desplazamiento a los valores, en 4 bytes
+        inline = struct.pack("<HH", value, 0) if typ == 3 and n == 1 else struct.pack("<I", value)
+        return struct.pack("<HHI", tag, typ, n) + inline
+
+    def array(tag, values, at):
+        # Con una sola strip el valor va en la propia entrada
+        return entry(tag, 4, len(values), values[0] if len(values) == 1 else at)
+
+    entries = [
+        entry(256, 4, 1, width), entry(257, 4, 1, height),
+        entry(258, 3, 3, bps_at),                              # BitsPerSample 16,16,16
+        entry(259, 3, 1, 8),                                   # deflate
+        entry(262, 3, 1, 2),                                   # RGB
+        array(273, offsets, offsets_at),
+        entry(277, 3, 1, 3), entry(278, 4, 1, TIFF_ROWS_PER_STRIP),
+        array(279, [len(strip) for strip in strips], counts_at),
+        entry(284, 3, 1, 1),                                   # chunky
+        entry(317, 3, 1, 2),                                   # predictor horizontal
+    ]
+    with open(path, "wb") as f:
+        f.write(b"II" + struct.pack("<HI", 42, ifd_at))
+        f.write(struct.pack("<H", len(entries)) + b"".join(entries) + struct.pack("<I", 0))
+        f.write(struct.pack("<3H", 16, 16, 16))
+        f.write(struct.pack(f"<{count}I", *offsets))
+        f.write(struct.pack(f"<{count}I", *(len(strip) for strip in strips)))
+        for strip in strips:
+            f.write(strip)
+
+def develop(raw_path):
+    """Revela raw_path a TIFF (escritura atómica). Devuelve la ruta del TIFF."""
+    if rawpy is None:
+        raise RuntimeError("rawpy is not installed")
+    dest = developed_path_for(raw_path)
+    with rawpy.imread(raw_path) as raw:
+        rgb = raw.postprocess(**DEVELOP_PARAMS)
+    fd, tmp = tempfile.mkstemp(prefix=".zm_tmp_", suffix=DEVELOPED_EXT, dir=os.path.dirname(dest) or ".")
+    os.close(fd)
+    try:
+        write_tiff16(tmp, rgb)
+        os.replace(tmp, dest)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return dest
+
+def develop_frame(raw_path, levels, quality=zm_convert.DEFAULT_QUALITY, decode=zm_convert.DEFAULT_DECODE,
+                  layout=zm_convert.DEFAULT_LAYOUT, codec=None):
+    """
+    Tarea del pool: revela el RAW y regenera sus proxies desde el TIFF.
+    Devuelve {"dev": ruta del TIFF, nivel: ruta del proxy...} (None si falla).
+    """
+    results = {DEVELOP_LEVEL: None}
+    try:
+        results[DEVELOP_LEVEL] = develop(raw_path)
+    except Exception as e:
+        print(f"[Zeta Motion][Develop] Failed to develop {raw_path}: {e}")
+        return results
+    results.update(zm_convert.convert_pyramid(results[DEVELOP_LEVEL], levels, quality, decode, layout, codec))
+    print(f"[Zeta Motion][Develop] Developed {os.path.basename(raw_path)}")
+    return results
+
+def find_raw_frames(directory, base_name=None):
+    """RAWs de la secuencia (uno por índice de frame), ordenados."""
+    frames = []
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return frames
+    for f in names:
+        m = zm_convert.HD_FRAME_RE.match(f)
+        if not m or m.group("ext").lower() not in zm_convert.RAW_EXTS:
+            continue
+        if base_name and m.group("base") != base_name:
+            continue
+        frames.append((m.group("base"), int(m.group("index")), os.path.join(directory, f)))
+    frames.sort()
+    return [path for _, _, path in frames]
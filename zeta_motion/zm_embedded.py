@@ -0,0 +1,266 @@
+# zm_embedded.py — Zeta Motion
+# Blender 4.5+ | Linux-only
+# Extracción de la vista previa JPEG que la cámara incrusta en sus archivos,
+# leyendo solo rangos de bytes (cabeceras, IFDs, cajas) y sin decodificar la
+# imagen principal:
+#   - JPEG: miniatura EXIF (IFD1) y vistas previas MPF (APP2, Multi-Picture).
+#   - RAW basados en TIFF (CR2, NEF, ARW, DNG...): JPEGs referenciados desde
+#     IFD0, la cadena de IFDs y las SubIFDs.
+#   - CR3 (ISO BMFF): caja PRVW dentro del uuid de vista previa de Canon.
+# Sin bpy ni PIL.
+
+import io
+import os
+import struct
+
+SOI = b"\xff\xd8"
+# Marcadores SOF que PIL sabe decodificar (baseline, extended, progressive)
+DECODABLE_SOF = (0xC0, 0xC1, 0xC2)
+SOF_MARKERS = tuple(m for m in range(0xC0, 0xD0) if m not in (0xC4, 0xC8, 0xCC))
+MAX_IFDS = 64
+CR3_PREVIEW_UUID = bytes.fromhex("eaf42b5e1c984b88b9fbb7dc406e4d16")
+
+TAG_COMPRESSION = 0x0103
+TAG_STRIP_OFFSETS = 0x0111
+TAG_STRIP_BYTES = 0x0117
+TAG_SUBIFDS = 0x014A
+TAG_JPEG_OFFSET = 0x0201
+TAG_JPEG_LENGTH = 0x0202
+TAG_MP_ENTRY = 0xB002
+TYPE_SIZES = {1: 1, 2: 1, 3: 2, 4: 4, 7: 1, 9: 4, 13: 4}
+
+
+# ----------------------------------------------------------------
+# JPEG: recorrido de segmentos (solo cabeceras)
+# ----------------------------------------------------------------
+def _scan_jpeg(f, start=0):
+    """
+    Recorre los segmentos de un JPEG que empieza en `start` hasta SOS.
+    Devuelve {"sof": (marcador, ancho, alto), "exif": base TIFF, "mpf": base TIFF}
+    (claves ausentes si no están) o None si no empieza por SOI.
+    """
+    f.seek(start)
+    if f.read(2) != SOI:
+        return None
+    info = {}
+    pos = start + 2
+    while True:
+        f.seek(pos)
+        head = f.read(4)
+        if len(head) < 4 or head[0] != 0xFF:
+            break
+        marker = head[1]
+        if marker == 0xFF:          # relleno
+            pos += 1
+            continue
+        if marker in (0xD9, 0xDA):  # EOI / SOS: fin de cabeceras
+            break
+        length = struct.unpack(">H", head[2:])[0]
+        if marker in SOF_MARKERS and "sof" not in info:
+            sof = f.read(5)
+            if len(sof) == 5:
+                height, width = struct.unpack(">HH", sof[1:5])
+                info["sof"] = (marker, width, height)
+        elif marker == 0xE1:
+            if f.read(6) == b"Exif\0\0":
+                info.setdefault("exif", pos + 10)
+        elif marker == 0xE2:
+            if f.read(4) == b"MPF\0":
+                info.setdefault("mpf", pos + 8)
+        pos += 2 + length
+    return info
+
+def jpeg_dimensions(source):
+    """(ancho, alto) de un JPEG (ruta o bytes) leyendo solo su cabecera SOF, o None."""
+    try:
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            info = _scan_jpeg(io.BytesIO(source))
+        else:
+            with open(source, "rb") as f:
+                info = _scan_jpeg(f)
+    except (OSError, struct.error):
+        return None
+    if not info or "sof" not in info:
+        return None
+    return info["sof"][1:]
+
+
+# ----------------------------------------------------------------
+# TIFF: IFDs (EXIF, MPF y RAW)
+# ----------------------------------------------------------------
+def _tiff_header(f, base):
+    f.seek(base)
+    head = f.read(8)
+    if len(head) < 8 or head[:2] not in (b"II", b"MM"):
+        return None, None
+    order = "<" if head[:2] == b"II" else ">"
+    magic, first = struct.unpack(order + "HI", head[2:])
+    if magic not in (42, 0x4F52, 0x5352, 0x55):   # TIFF, ORF, RW2
+        return None, None
+    return order, first
+
+def _values(f, base, order, typ, count, raw):
+    size = TYPE_SIZES.get(typ)
+    if size is None or typ not in (3, 4, 13) or count > 4096:
+        return []
+    fmt = order + ("H" if typ == 3 else "I") * count
+    if size * count <= 4:
+        data = raw[:size * count]
+    else:
+        f.seek(base + struct.unpack(order + "I", raw)[0])
+        data = f.read(size * count)
+    if len(data) < size * count:
+        return []
+    return list(struct.unpack(fmt, data))
+
+def _read_ifd(f, base, order, offset):
+    """({tag: (tipo, cuenta, 4 bytes)}, offset del siguiente IFD)."""
+    f.seek(base + offset)
+    raw = f.read(2)
+    if len(raw) < 2:
+        return {}, 0
+    count = struct.unpack(order + "H", raw)[0]
+    data = f.read(count * 12 + 4)
+    if len(data) < count * 12 + 4:
+        return {}, 0
+    tags = {}
+    for i in range(count):
+        tag, typ, cnt = struct.unpack(order + "HHI", data[i * 12:i * 12 + 8])
+        tags[tag] = (typ, cnt, data[i * 12 + 8:i * 12 + 12])
+    return tags, struct.unpack(order + "I", data[-4:])[0]
+
+def _tiff_candidates(f, base, order, first):
+    """(offset absoluto, longitud) de cada JPEG referenciado en los IFDs."""
+    found = []
+    queue = [first]
+    seen = set()
+    while queue and len(seen) < MAX_IFDS:
+        offset = queue.pop(0)
+        if not offset or offset in seen:
+            continue
+        seen.add(offset)
+        tags, next_offset = _read_ifd(f, base, order, offset)
+        value = lambda tag: _values(f, base, order, *tags[tag]) if tag in tags else []
+        jpeg_off, jpeg_len = value(TAG_JPEG_OFFSET), value(TAG_JPEG_LENGTH)
+        if jpeg_off and jpeg_len:
+            found.append((base + jpeg_off[0], jpeg_len[0]))
+        compression = value(TAG_COMPRESSION)
+        strips, strip_bytes = value(TAG_STRIP_OFFSETS), value(TAG_STRIP_BYTES)
+        if compression and compression[0] in (6, 7) and len(strips) == 1 and len(strip_bytes) == 1:
+            found.append((base + strips[0], strip_bytes[0]))
+        queue.extend(value(TAG_SUBIFDS))
+        queue.append(next_offset)
+    return found
+
+def _mpf_candidates(f, base):
+    order, first = _tiff_header(f, base)
+    if order is None:
+        return []
+    tags, _ = _read_ifd(f, base, order, first)
+    if TAG_MP_ENTRY not in tags:
+        return []
+    typ, count, raw = tags[TAG_MP_ENTRY]
+    f.seek(base + struct.unpack(order + "I", raw)[0])
+    data = f.read(count)
+    found = []
+    for i in range(len(data) // 16):
+        _, size, offset, _, _ = struct.unpack(order + "IIIHH", data[i * 16:(i + 1) * 16])
+        if offset:   # la entrada 0 (offset 0) es la imagen principal
+            found.append((base + offset, size))
+    return found
+
+
+# ----------------------------------------------------------------
+# CR3: caja PRVW
+# ----------------------------------------------------------------
+def _cr3_candidates(f, file_size):
+    found = []
+    pos = 0
+    while pos + 8 <= file_size:
+        f.seek(pos)
+        head = f.read(8)
+        size, kind = struct.unpack(">I4s", head)
+        header = 8
+        if size == 1:
+            size = struct.unpack(">Q", f.read(8))[0]
+            header = 16
+        elif size == 0:
+            size = file_size - pos
+        if size < header:
+            break
+        if kind == b"uuid" and f.read(16) == CR3_PREVIEW_UUID:
+            # uuid(16) + 8 bytes de versión, luego la caja PRVW
+            block = f.read(64)
+            idx = block.find(b"PRVW")
+            if idx >= 0:
+                # PRVW: ?32, ?16, ancho16, alto16, ?16, tamaño32, JPEG
+                jpeg_len = struct.unpack(">I", block[idx + 16:idx + 20])[0]
+                found.append((pos + header + 16 + idx + 20, jpeg_len))
+            break
+        pos += size
+    return found
+
+
+# ----------------------------------------------------------------
+# API
+# ----------------------------------------------------------------
+def _candidates(f, file_size):
+    f.seek(0)
+    head = f.read(12)
+    if head[:2] == SOI:
+        info = _scan_jpeg(f) or {}
+        found = []
+        if "exif" in info:
+            order, first = _tiff_header(f, info["exif"])
+            if order:
+                found += _tiff_candidates(f, info["exif"], order, first)
+        if "mpf" in info:
+            found += _mpf_candidates(f, info["mpf"])
+        return found
+    if head[4:8] == b"ftyp":
+        return _cr3_candidates(f, file_size)
+    order, first = _tiff_header(f, 0)
+    return _tiff_candidates(f, 0, order, first) if order else []
+
+def find_previews(path):
+    """
+    Vistas previas incrustadas decodificables: [(ancho, alto, offset, longitud)],
+    de mayor a menor. Solo se leen cabeceras.
+    """
+    previews = []
+    try:
+        file_size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            for offset, length in _candidates(f, file_size):
+                if length <= 0 or offset + length > file_size:
+                    continue
+                info = _scan_jpeg(f, offset)
+                if not info or "sof" not in info or info["sof"][0] not in DECODABLE_SOF:
+                    continue   # p. ej. JPEG sin pérdida de los datos RAW
+                _, width, height = info["sof"]
+                previews.append((width, height, offset, length))
+    except (OSError, struct.error) as e:
+        print(f"[Zeta Motion] Cannot parse embedded previews of {path}: {e}")
+        return []
+    previews.sort(key=lambda p: p[0] * p[1], reverse=True)
+    return previews
+
+def extract_preview(path, min_size=None):
+    """
+    Bytes JPEG de la vista previa incrustada y su tamaño: la más pequeña que
+    cubra `min_size` (ancho, alto) o, si ninguna llega, la mayor.
+    Devuelve (bytes, (ancho, alto)) o None.
+    """
+    previews = find_previews(path)
+    if not previews:
+        return None
+    chosen = previews[0]
+    if min_size:
+        covering = [p for p in previews if p[0] >= min_size[0] and p[1] >= min_size[1]]
+        if covering:
+            chosen = covering[-1]
+    width, height, offset, length = chosen
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read(length)
+    return data, (width, height)
@@ -2,13 +2,16 @@ import bpy
 import os
 import re
 import shutil
-from . import zm_movie_source, zm_worker
+from . import zm_movie_source, zm_worker, zm_manifest, zm_convert
 from .zm_capture_core import capture_image, build_output_path, register_snapshot
 
 # =========================================================
 # HELPERS
 # =========================================================
 
+# Frame de la secuencia con cualquier extensión (JPEG, RAW, TIFF revelado)
+FRAME_RE = re.compile(r"(.+?)_(\d+)(\.\w+)$")
+
 def get_active_photo_details(context):
     strip = zm_movie_source._find_active_strip(context)
     if not strip or not strip.elements:
@@ -20,7 +23,7 @@ def get_active_photo_details(context):
     element = strip.elements[frame_idx]
     proxy_path = bpy.path.abspath(element.filename)
     directory = os.path.dirname(proxy_path)
-    base_name_match = re.match(r"(.+?)_(\d+)\.jpg$", os.path.basename(proxy_path))
+    base_name_match = FRAME_RE.match(os.path.basename(proxy_path))
     if not base_name_match:
         return None
 
@@ -28,7 +31,7 @@ def get_active_photo_details(context):
     index_str = base_name_match.group(2)
 
     hd_path = None
-    hd_candidate = os.path.join(directory, f"{base_name}_HD_{index_str}.jpg")
+    hd_candidate = os.path.join(directory, f"{base_name}_HD_{index_str}{base_name_match.group(3)}")
     if os.path.exists(hd_candidate):
         hd_path = hd_candidate
 
@@ -42,7 +45,8 @@ def get_active_photo_details(context):
 
 
 def get_sequence_files(directory, base_name):
-    pattern = re.compile(rf"{base_name}_(\d+)\.jpg$")
+    """Archivos del frame (todas las extensiones: JPEG, RAW, TIFF), por índice."""
+    pattern = re.compile(rf"{re.escape(base_name)}_(\d+)\.\w+$")
     matches = []
     for f in os.listdir(directory):
         if m := pattern.match(f):
@@ -55,12 +59,37 @@ def get_sequence_files(directory, base_name):
 # OPERACIONES DE ARCHIVOS
 # =========================================================
 
+def _companions(photo_path):
+    """RAW de la misma toma que photo_path (mismo nombre, otra extensión)."""
+    root = os.path.splitext(photo_path)[0]
+    return [root + ext for ext in zm_convert.RAW_EXTS if os.path.exists(root + ext)]
+
+
+def _copy_with_companions(new_photo_path, target_path):
+    """Copia la foto y su RAW (si lo hay) con el nombre de target_path."""
+    shutil.copy2(new_photo_path, target_path)
+    target_root = os.path.splitext(target_path)[0]
+    copied = [target_path]
+    for raw in _companions(new_photo_path):
+        dest = target_root + os.path.splitext(raw)[1]
+        shutil.copy2(raw, dest)
+        copied.append(dest)
+    # El revelado anterior de este frame ya no corresponde
+    for ext in zm_convert.DEVELOPED_EXTS:
+        if os.path.exists(target_root + ext):
+            os.remove(target_root + ext)
+    return copied
+
+
 def _replace_photo(new_photo_path, active_details):
-    shutil.copy2(new_photo_path, active_details["proxy_path"])
+    copied = _copy_with_companions(new_photo_path, active_details["proxy_path"])
     if active_details["hd_path"]:
-        hd_candidate = new_photo_path.replace(".jpg", "_HD.jpg")
+        root, ext = os.path.splitext(new_photo_path)
+        hd_candidate = f"{root}_HD{ext}"
         if os.path.exists(hd_candidate):
             shutil.copy2(hd_candidate, active_details["hd_path"])
+    # Solo este frame necesita proxies nuevos
+    zm_manifest.mark_dirty(active_details["hd_path"] or active_details["proxy_path"], *copied[1:])
 
 
 def _insert_photo(new_photo_path, active_details):
@@ -69,14 +98,20 @@ def _insert_photo(new_photo_path, active_details):
     files = get_sequence_files(directory, base)
 
     current_idx = int(active_details["index_str"])
-    for idx, path in sorted([(int(re.search(r"_(\d+)\.jpg$", f).group(1)), f) for f in files], reverse=True):
-        if idx >= current_idx:
+    width = len(active_details["index_str"])
+    touched = []
+    for idx, path in sorted([(int(FRAME_RE.search(f).group(2)), f) for f in files], reverse=True):
+        if idx > current_idx:
             new_idx = idx + 1
-            new_name = os.path.join(directory, f"{base}_{new_idx:04d}.jpg")
+            ext = os.path.splitext(path)[1]
+            new_name = os.path.join(directory, f"{base}_{new_idx:0{width}d}{ext}")
             os.rename(path, new_name)
+            touched.append(new_name)
 
-    new_target = os.path.join(directory, f"{base}_{current_idx + 1:04d}.jpg")
-    shutil.copy2(new_photo_path, new_target)
+    new_target = os.path.join(directory, f"{base}_{current_idx + 1:0{width}d}{os.path.splitext(new_photo_path)[1]}")
+    copied = _copy_with_companions(new_photo_path, new_target)
+    # El frame nuevo y los desplazados: sus proxies corresponden a otro contenido
+    zm_manifest.mark_dirty(*copied, *touched)
 
 
 def _exclude_photo(active_details):
@@ -90,13 +125,23 @@ def _exclude_photo(active_details):
     if active_details["hd_path"] and os.path.exists(active_details["hd_path"]):
         os.rename(active_details["hd_path"], active_details["hd_path"] + ".excluded")
 
+    # El RAW y el revelado del frame excluido también salen de la secuencia
+    root = os.path.splitext(proxy_path)[0]
+    for ext in zm_convert.RAW_EXTS + zm_convert.DEVELOPED_EXTS:
+        if os.path.exists(root + ext):
+            os.rename(root + ext, root + ext + ".excluded")
+
+    width = len(active_details["index_str"])
     files = get_sequence_files(directory, base)
+    touched = []
     for f in files:
-        m = re.search(r"_(\d+)\.jpg$", f)
-        if m and int(m.group(1)) > idx:
-            new_idx = int(m.group(1)) - 1
-            new_name = os.path.join(directory, f"{base}_{new_idx:04d}.jpg")
+        m = FRAME_RE.search(f)
+        if m and int(m.group(2)) > idx:
+            new_idx = int(m.group(2)) - 1
+            new_name = os.path.join(directory, f"{base}_{new_idx:0{width}d}{m.group(3)}")
             os.rename(f, new_name)
+            touched.append(new_name)
+    zm_manifest.mark_dirty(*touched)
 
 
 # =========================================================
@@ -121,13 +166,16 @@ def refresh_movie_strip(context, strip_name, directory):
 
     base_name = None
     for f in os.listdir(directory):
-        if f.endswith(".jpg"):
+        if f.lower().endswith(zm_convert.JPEG_EXTS):
             base_name = f.split("_")[0]
             break
     if not base_name:
         return
 
-    image_files = get_sequence_files(directory, base_name)
+    # El strip solo muestra JPEG: los RAW y revelados quedan para los proxies
+    image_files = [p for p in get_sequence_files(directory, base_name) if p.lower().endswith(zm_convert.JPEG_EXTS)]
+    if not image_files:
+        return
     new_strip = seq.sequences.new_image(
         strip_name,
         image_files[0],
@@ -136,7 +184,7 @@ def refresh_movie_strip(context, strip_name, directory):
     )
 
     for img in image_files[1:]:
-        new_strip.elements.append(img)
+        new_strip.elements.append(os.path.basename(img))
 
     new_strip.blend_type = props["blend_type"]
     new_strip.transform.offset_x, new_strip.transform.offset_y = props["transform"]
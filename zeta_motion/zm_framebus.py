@@ -0,0 +1,307 @@
+# zm_framebus.py — Zeta Motion
+# Blender 4.5+ | Linux-only
+# Bus de frames del liveview dentro del proceso de Blender.
+# Una sola fuente (la sesión de cámara o un `gphoto2 --capture-movie`)
+# publica frames JPEG en un buffer circular acotado; cada consumidor
+# (ffplay, VSE, live blend, grabación...) corre en su propio hilo y recibe
+# siempre el frame más reciente: un consumidor lento salta frames en vez
+# de acumular retraso.
+
+import os
+import signal
+import subprocess
+import threading
+import time
+from collections import deque
+
+from . import zm_stats
+
+SOI = b"\xff\xd8"            # Start Of Image
+EOI = b"\xff\xd9"            # End Of Image
+RING_SIZE = 8                # frames que conserva el bus
+MAX_PENDING = 8 * 1024 * 1024  # basura sin SOI/EOI que se tolera antes de descartar
+READ_CHUNK = 64 * 1024
+FPS_WINDOW = 30              # frames usados para medir fps
+
+
+class Frame:
+    __slots__ = ("seq", "timestamp", "data")
+
+    def __init__(self, seq, timestamp, data):
+        self.seq = seq
+        self.timestamp = timestamp   # time.monotonic() de llegada
+        self.data = data             # bytes JPEG
+
+
+# ----------------------------------------------------------------
+# Separador MJPEG
+# ----------------------------------------------------------------
+class MjpegSplitter:
+    """Corta un flujo de bytes MJPEG en JPEGs completos usando los marcadores SOI/EOI."""
+
+    def __init__(self):
+        self._buf = bytearray()
+
+    def feed(self, chunk):
+        """Añade bytes y devuelve la lista de frames completos encontrados."""
+        buf = self._buf
+        buf += chunk
+        frames = []
+        while True:
+            start = buf.find(SOI)
+            if start < 0:
+                # Conservar un posible 0xFF final (SOI partido entre lecturas)
+                del buf[:max(0, len(buf) - 1)]
+                break
+            end = buf.find(EOI, start + 2)
+            if end < 0:
+                del buf[:start]
+                if len(buf) > MAX_PENDING:
+                    buf.clear()
+                break
+            frames.append(bytes(buf[start:end + 2]))
+            del buf[:end + 2]
+        return frames
+
+
+# ----------------------------------------------------------------
+# Bus
+# ----------------------------------------------------------------
+class FrameBus:
+    def __init__(self, size=RING_SIZE):
+        self._ring = deque(maxlen=size)
+        self._cond = threading.Condition()
+        self._seq = 0
+        self._arrivals = deque(maxlen=FPS_WINDOW)
+        self._consumers = {}
+
+    def publish(self, data, timestamp=None):
+        """Publica un frame JPEG (llamado desde el hilo de la fuente)."""
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        with self._cond:
+            self._seq += 1
+            self._ring.append(Frame(self._seq, timestamp, data))
+            self._arrivals.append(timestamp)
+            self._cond.notify_all()
+
+    def latest(self):
+        with self._cond:
+            return self._ring[-1] if self._ring else None
+
+    def _has_after(self, after_seq):
+        return bool(self._ring) and self._ring[-1].seq > after_seq
+
+    def wait_next(self, after_seq, timeout=None):
+        """Espera un frame con seq > after_seq y devuelve el más reciente (o None)."""
+        with self._cond:
+            # Tras clear() el seq sigue avanzado pero el buffer está vacío: se espera al siguiente frame
+            if not self._cond.wait_for(lambda: self._has_after(after_seq), timeout):
+                return None
+            return self._ring[-1]
+
+    def wait_since(self, after_seq, timeout=None):
+        """Espera y devuelve todos los frames del buffer con seq > after_seq (lista, quizá vacía)."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._has_after(after_seq), timeout):
+                return []
+            return [f for f in self._ring if f.seq > after_seq]
+
+    def fps(self):
+        with self._cond:
+            if len(self._arrivals) < 2:
+                return 0.0
+            span = self._arrivals[-1] - self._arrivals[0]
+            return (len(self._arrivals) - 1) / span if span > 0 else 0.0
+
+    def intervals(self):
+        """Intervalos (s) entre los últimos frames recibidos."""
+        with self._cond:
+            arrivals = list(self._arrivals)
+        return [b - a for a, b in zip(arrivals, arrivals[1:])]
+
+    def last_arrival(self):
+        with self._cond:
+            return self._arrivals[-1] if self._arrivals else None
+
+    def clear(self):
+        with self._cond:
+            self._ring.clear()
+            self._arrivals.clear()
+
+    # --- Consumidores ---
+    def subscribe(self, name, callback, every_frame=False):
+        """
+        Registra callback(frame) en su propio hilo. Si ya existe un consumidor
+        con ese nombre, se reemplaza. Devuelve el consumidor.
+        Con every_frame=True recibe todos los frames que sigan en el buffer
+        (grabación) en lugar de saltar al más reciente.
+        """
+        self.unsubscribe(name)
+        consumer = _Consumer(self, name, callback, every_frame)
+        self._consumers[name] = consumer
+        consumer.start()
+        return consumer
+
+    def unsubscribe(self, name):
+        consumer = self._consumers.pop(name, None)
+        if consumer:
+            consumer.stop()
+        return consumer is not None
+
+    def unsubscribe_all(self):
+        for name in list(self._consumers):
+            self.unsubscribe(name)
+
+    def consumers(self):
+        return list(self._consumers)
+
+    def has_consumer(self, name):
+        return name in self._consumers
+
+
+class _Consumer:
+    def __init__(self, bus, name, callback, every_frame=False):
+        self.bus = bus
+        self.name = name
+        self.callback = callback
+        self.every_frame = every_frame
+        self.frames = 0
+        self.dropped = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True, name=f"zm_bus:{self.name}")
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1)
+
+    def _run(self):
+        latest = self.bus.latest()
+        last_seq = latest.seq if latest else 0
+        while not self._stop.is_set():
+            try:
+                last_seq = self._step(last_seq)
+            except Exception as e:
+                # Un frame o un callback con errores no debe matar al consumidor
+                print(f"[Zeta Motion] Frame consumer '{self.name}' error: {e}")
+                zm_stats.count("errors", f"bus:{self.name}")
+                time.sleep(0.05)
+
+    def _step(self, last_seq):
+        """Espera y entrega los frames siguientes. Devuelve el último seq procesado."""
+        if self.every_frame:
+            frames = self.bus.wait_since(last_seq, timeout=0.5)
+        else:
+            frame = self.bus.wait_next(last_seq, timeout=0.5)
+            frames = [frame] if frame else []
+        if not frames or self._stop.is_set():
+            return last_seq
+        if last_seq and frames[0].seq > last_seq + 1:
+            skipped = frames[0].seq - last_seq - 1
+            self.dropped += skipped
+            zm_stats.count("dropped", f"bus:{self.name}", skipped)
+        for frame in frames:
+            last_seq = frame.seq
+            try:
+                self.callback(frame)
+            except Exception as e:
+                print(f"[Zeta Motion] Frame consumer '{self.name}' callback failed: {e}")
+                zm_stats.count("errors", f"bus:{self.name}")
+                continue
+            self.frames += 1
+            zm_stats.record(f"bus:{self.name}", "age", time.monotonic() - frame.timestamp)
+        return last_seq
+
+
+# ----------------------------------------------------------------
+# Fuentes
+# ----------------------------------------------------------------
+class SessionSource:
+    """Frames del visor bombeados por la sesión de cámara (admite capturas sin cortar)."""
+
+    name = "session"
+    exclusive = False   # la sesión intercala capturas
+
+    def __init__(self, session, bus):
+        self.session = session
+        self.bus = bus
+
+    def start(self):
+        self.session.start_liveview(self.bus.publish)
+
+    def stop(self):
+        self.session.stop_liveview()
+
+    def is_alive(self):
+        return self.session.liveview_active
+
+
+class MovieSource:
+    """
+    Un único `gphoto2 --capture-movie --stdout` leído por un hilo que corta
+    el flujo en JPEGs. Más fps, pero ocupa el dispositivo: hay que pararlo
+    para disparar.
+    """
+
+    name = "movie"
+    exclusive = True
+
+    def __init__(self, port, bus):
+        self.port = port
+        self.bus = bus
+        self.proc = None
+        self._thread = None
+
+    def start(self):
+        cmd = ["gphoto2"]
+        if self.port:
+            cmd += ["--port", self.port]
+        cmd += ["--set-config", "viewfinder=1", "--capture-movie", "--stdout"]
+        self.proc = subprocess.Popen(
+            cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, preexec_fn=os.setsid,
+        )
+        self._thread = threading.Thread(target=self._read_loop, args=(self.proc,), daemon=True,
+                                        name=f"zm_movie_reader:{self.port}")
+        self._thread.start()
+
+    def _read_loop(self, proc):
+        splitter = MjpegSplitter()
+        fd = proc.stdout.fileno()
+        while True:
+            try:
+                chunk = os.read(fd, READ_CHUNK)
+            except OSError:
+                break
+            if not chunk:
+                break
+            for data in splitter.feed(chunk):
+                self.bus.publish(data)
+        print(f"[Zeta Motion] Movie stream on {self.port or 'auto'} ended.")
+
+    def stop(self):
+        proc, self.proc = self.proc, None
+        if proc is None:
+            return
+        if proc.poll() is None:
+            try:
+                os.killpg(os.getpgid(proc.pid), signal.SIGTERM)
+            except Exception as e:
+                print(f"[Zeta Motion] Error stopping movie stream: {e}")
+            try:
+                proc.wait(timeout=3)
+            except subprocess.TimeoutExpired:
+                try:
+                    os.killpg(os.getpgid(proc.pid), signal.SIGKILL)
+                except Exception:
+                    pass
+        if self._thread:
+            self._thread.join(timeout=1)
+        if proc.stdout:
+            proc.stdout.close()
+
+    def is_alive(self):
+        return self.proc is not None and self.proc.poll() is None
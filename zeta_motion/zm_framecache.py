@@ -0,0 +1,78 @@
+# zm_framecache.py — Zeta Motion
+# Blender 4.5+ | Linux-only
+# Caché LRU de frames decodificados (arrays NumPy) con tope de memoria.
+# Las claves incluyen ruta + mtime: si un frame se vuelve a capturar en la
+# misma ruta, la entrada vieja simplemente deja de usarse y sale por LRU.
+
+import os
+import threading
+from collections import OrderedDict
+
+DEFAULT_LIMIT_MB = 512
+
+
+def file_identity(path):
+    """(ruta, mtime_ns) o None si el archivo no existe. Base de las claves de la caché."""
+    try:
+        return (path, os.stat(path).st_mtime_ns)
+    except OSError:
+        return None
+
+
+class FrameCache:
+    def __init__(self, limit_mb=DEFAULT_LIMIT_MB):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.limit = int(limit_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            array = self._entries.get(key)
+            if array is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return array
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def put(self, key, array):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.nbytes
+            self._entries[key] = array
+            self._bytes += array.nbytes
+            self._evict()
+
+    def set_limit(self, limit_mb):
+        with self._lock:
+            self.limit = int(limit_mb * 1024 * 1024)
+            self._evict()
+
+    def _evict(self):
+        # Siempre se conserva la entrada más reciente aunque supere el tope
+        while self._bytes > self.limit and len(self._entries) > 1:
+            _, array = self._entries.popitem(last=False)
+            self._bytes -= array.nbytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "mb": self._bytes / (1024 * 1024),
+                "limit_mb": self.limit / (1024 * 1024),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,223 @@
+# zm_hotplug.py — Zeta Motion
+# Blender 4.5+ | Linux-only
+# Monitor de conexión/desconexión de cámaras en segundo plano.
+# - Usa udev (netlink) vía pyudev si está instalado.
+# - Si no, compara periódicamente /sys/bus/usb/devices (muy barato).
+# Mantiene control_state["camera"]["available"] al día, suelta la cámara
+# activa si se desenchufa y reconecta automáticamente una cámara conocida.
+
+import bpy
+import os
+import threading
+import time
+
+from . import state, zm_session, zm_worker, zm_rig
+
+# pyudev es opcional.
+try:
+    import pyudev
+except ImportError:
+    pyudev = None
+
+USB_SYSFS = "/sys/bus/usb/devices"
+POLL_INTERVAL = 2.0     # segundos entre sondeos sin udev
+SETTLE_DELAY = 0.8      # la cámara tarda en estar lista tras enchufarse
+
+_thread = None
+_stop = threading.Event()
+_rescan = threading.Event()
+
+
+# ----------------------------------------------------------------
+# Utilidades de sysfs
+# ----------------------------------------------------------------
+def _read_attr(dev_dir, name):
+    try:
+        with open(os.path.join(dev_dir, name), "r") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+def _usb_signature():
+    """Firma barata del bus USB: conjunto de (bus, dev, vendor, product)."""
+    try:
+        entries = os.listdir(USB_SYSFS)
+    except OSError:
+        return frozenset()
+    sig = set()
+    for name in entries:
+        if ":" in name:   # interfaces, no dispositivos
+            continue
+        dev_dir = os.path.join(USB_SYSFS, name)
+        sig.add((_read_attr(dev_dir, "busnum"), _read_attr(dev_dir, "devnum"),
+                 _read_attr(dev_dir, "idVendor"), _read_attr(dev_dir, "idProduct")))
+    return frozenset(sig)
+
+def _serial_for_port(port):
+    """Número de serie USB del puerto gphoto2 'usb:BBB,DDD' (o None)."""
+    if not port or not port.startswith("usb:"):
+        return None
+    try:
+        bus, dev = (int(x) for x in port[4:].split(","))
+    except ValueError:
+        return None
+    try:
+        entries = os.listdir(USB_SYSFS)
+    except OSError:
+        return None
+    for name in entries:
+        if ":" in name:
+            continue
+        dev_dir = os.path.join(USB_SYSFS, name)
+        if _read_attr(dev_dir, "busnum") == str(bus) and _read_attr(dev_dir, "devnum") == str(dev):
+            return _read_attr(dev_dir, "serial")
+    return None
+
+def _same_camera(known, cam):
+    """Identifica una cámara conocida por serie; si no hay serie, por modelo y puerto."""
+    if known.get("serial") and cam.get("serial"):
+        return known["serial"] == cam["serial"]
+    return known.get("model") == cam.get("model") and known.get("port") == cam.get("port")
+
+
+# ----------------------------------------------------------------
+# Aplicación de cambios (hilo principal)
+# ----------------------------------------------------------------
+def _apply_scan(cams):
+    from . import zm_camera, zm_stream
+
+    cam_state = state.control_state["camera"]
+    with state.state_lock:
+        previous = cam_state["available"]
+        cam_state["available"] = cams
+        active_port = cam_state["active_port"]
+        connected = state.control_state["system"]["connected"]
+
+    if cams != previous:
+        print(f"[Zeta Motion] Cameras detected: {cams}")
+
+    # Cámaras del rig desenchufadas
+    present = {c["port"] for c in cams}
+    for cam in zm_rig.rig_cameras():
+        if cam["port"] not in present and cam["port"] != active_port:
+            print(f"[Zeta Motion] Rig camera {cam['slug']} on {cam['port']} was unplugged.")
+            zm_rig.drop_camera(cam["port"])
+
+    # Cámara activa desenchufada: soltarla limpiamente
+    if connected and active_port and not any(c["port"] == active_port for c in cams):
+        print(f"[Zeta Motion] Camera on {active_port} was unplugged. Disconnecting.")
+        zm_stream.stop_all_streams()
+        zm_rig.drop_camera(active_port)
+        zm_worker.close_sessions(keep_ports=[c["port"] for c in zm_rig.rig_cameras()])
+        with state.state_lock:
+            cam_state["active_name"] = None
+            cam_state["active_port"] = None
+            state.control_state["system"]["connected"] = False
+        connected = False
+
+    # Reconexión automática de la última cámara usada (el puerto cambia al reenchufar)
+    known = cam_state.get("last_connected")
+    if not connected and known:
+        match = next((c for c in cams if _same_camera(known, c)), None)
+        if match is None and not known.get("serial"):
+            same_model = [c for c in cams if c["model"] == known.get("model")]
+            match = same_model[0] if len(same_model) == 1 else None
+        if match:
+            print(f"[Zeta Motion] Known camera {match['model']} is back on {match['port']}. Reconnecting...")
+            zm_camera.connect_camera(match)
+
+    _tag_redraw()
+    return None
+
+def _tag_redraw():
+    wm = getattr(bpy.context, "window_manager", None)
+    if not wm:
+        return
+    for window in wm.windows:
+        for area in window.screen.areas:
+            if area.type == 'SEQUENCE_EDITOR':
+                area.tag_redraw()
+
+def _scan():
+    try:
+        cams = zm_session.auto_detect()
+    except Exception as e:
+        print(f"[Zeta Motion] Error detecting cameras: {e}")
+        return
+    for cam in cams:
+        cam["serial"] = _serial_for_port(cam["port"])
+    bpy.app.timers.register(lambda: _apply_scan(cams))
+
+
+# ----------------------------------------------------------------
+# Hilo monitor
+# ----------------------------------------------------------------
+def _udev_loop():
+    context = pyudev.Context()
+    monitor = pyudev.Monitor.from_netlink(context)
+    monitor.filter_by("usb", device_type="usb_device")
+    monitor.start()
+    _scan()
+    while not _stop.is_set():
+        if _rescan.is_set():
+            _rescan.clear()
+            _scan()
+        device = monitor.poll(timeout=0.5)
+        if device is None:
+            continue
+        # Agrupar ráfagas de eventos y dar tiempo a la cámara
+        time.sleep(SETTLE_DELAY)
+        while monitor.poll(timeout=0) is not None:
+            pass
+        _scan()
+
+def _poll_loop():
+    last = _usb_signature()
+    _scan()
+    while not _stop.is_set():
+        _rescan.wait(POLL_INTERVAL)
+        if _stop.is_set():
+            break
+        sig = _usb_signature()
+        if sig != last or _rescan.is_set():
+            _rescan.clear()
+            if sig != last:
+                time.sleep(SETTLE_DELAY)
+                sig = _usb_signature()
+            last = sig
+            _scan()
+
+def _run():
+    if pyudev is not None:
+        try:
+            _udev_loop()
+            return
+        except Exception as e:
+            print(f"[Zeta Motion] udev monitor unavailable ({e}); falling back to polling.")
+    _poll_loop()
+
+def request_rescan():
+    """Pide una detección inmediata sin bloquear la UI."""
+    _rescan.set()
+
+def start_monitor():
+    global _thread
+    if _thread is not None and _thread.is_alive():
+        return
+    _stop.clear()
+    _thread = threading.Thread(target=_run, daemon=True)
+    _thread.start()
+    print(f"[Zeta Motion] Camera hotplug monitor started ({'udev' if pyudev else 'polling'}).")
+
+def stop_monitor():
+    _stop.set()
+    _rescan.set()
+
+
+def register():
+    start_monitor()
+    print("[Zeta Motion] zm_hotplug registered.")
+
+def unregister():
+    stop_monitor()
+    print("[Zeta Motion] zm_hotplug unregistered.")
@@ -0,0 +1,257 @@
+# zm_live_blend.py — Zeta Motion
+# Blender 4.5+ | Linux-only
+# Live Blend (onion skin) calculado dentro del proceso con NumPy.
+# N capas anteriores y M posteriores al playhead del VSE (zm_movie_source),
+# con caída de opacidad y tinte por capa, compuestas al vuelo sobre los
+# frames del bus sin relanzar ningún pipeline de cámara. Las referencias se
+# decodifican una vez a resolución de liveview y viven en una caché LRU.
+
+import bpy
+import os
+import subprocess
+import signal
+import threading
+import time
+
+import numpy as np
+from PIL import Image
+
+from . import zm_framecache, zm_movie_source, zm_stats, zm_vse_live
+
+CONSUMER_NAME = "live_blend"
+REFERENCE_POLL = 0.1      # segundos entre comprobaciones del frame bajo el playhead
+
+BLEND_MODES = [
+    ('MIX', "Mix", "Cross-fade between the live frame and the reference"),
+    ('OVERLAY', "Overlay", "Overlay the live frame on the reference"),
+    ('DIFFERENCE', "Difference", "Highlight what moved since the reference"),
+    ('SCREEN', "Screen", "Lighten: keep the brightest of both frames"),
+    ('MULTIPLY', "Multiply", "Darken: keep the darkest of both frames"),
+]
+
+_lock = threading.Lock()
+_settings = {
+    "enabled": False,
+    "factor": 0.5,
+    "mode": 'MIX',
+    "prev": 1,             # capas anteriores (la primera es el frame bajo el playhead)
+    "next": 0,             # capas posteriores
+    "falloff": 0.5,        # cada capa más lejana multiplica su opacidad por esto
+    "use_tint": False,
+    "tint_prev": (1.0, 0.55, 0.55),
+    "tint_next": (0.55, 1.0, 0.6),
+}
+# Capas deseadas: [(offset, (ruta, mtime_ns))], la más lejana primero
+_layers = []
+_live_size = None          # (ancho, alto) del liveview decodificado
+_cache = zm_framecache.FrameCache()
+_load_event = threading.Event()
+_loader = None
+_tracking = False
+_output = {"proc": None, "size": None, "scale": 0.5}
+
+
+# ----------------------------------------------------------------
+# Fusión (hilos de los consumidores)
+# ----------------------------------------------------------------
+def _blend(live, ref, mode):
+    if mode == 'OVERLAY':
+        return np.where(live < 0.5, 2.0 * live * ref, 1.0 - 2.0 * (1.0 - live) * (1.0 - ref))
+    if mode == 'DIFFERENCE':
+        return np.abs(live - ref)
+    if mode == 'SCREEN':
+        return 1.0 - (1.0 - live) * (1.0 - ref)
+    if mode == 'MULTIPLY':
+        return live * ref
+    return ref
+
+def _distance(offset):
+    """Distancia de la capa al liveview: el frame bajo el playhead es la 1."""
+    return 1 - offset if offset <= 0 else offset
+
+def _layer_opacity(distance):
+    return _settings["factor"] * _settings["falloff"] ** (distance - 1)
+
+def _layer_tint(offset):
+    if not _settings["use_tint"]:
+        return None
+    return np.array(_settings["tint_prev"] if offset <= 0 else _settings["tint_next"], dtype=np.float32)
+
+def apply(pixels):
+    """
+    Compone las capas de onion skin sobre un frame float32 RGBA (de abajo
+    arriba) y lo devuelve. Las capas aún no decodificadas se omiten.
+    """
+    global _live_size
+    size = (pixels.shape[1], pixels.shape[0])
+    if size != _live_size:
+        _live_size = size
+        _load_event.set()   # las capas se decodifican al tamaño del liveview
+    if not _settings["enabled"] or _settings["factor"] <= 0.0:
+        return pixels
+    t0 = time.monotonic()
+    live = pixels[..., :3]
+    mode = _settings["mode"]
+    for offset, ident in _layers:
+        ref = _cache.get(ident + size)
+        if ref is None:
+            continue
+        ref = ref * (1.0 / 255.0)
+        tint = _layer_tint(offset)
+        if tint is not None:
+            ref *= tint
+        live += (_blend(live, ref, mode) - live) * _layer_opacity(_distance(offset))
+    zm_stats.record("live_blend", "blend", time.monotonic() - t0)
+    return pixels
+
+def is_enabled():
+    return _settings["enabled"]
+
+
+# ----------------------------------------------------------------
+# Capas de referencia (siguen al playhead) y su decodificación
+# ----------------------------------------------------------------
+def _decode_reference(path, size):
+    """JPEG -> uint8 RGB de abajo arriba al tamaño del liveview."""
+    image = Image.open(path)
+    # libjpeg decodifica directamente a 1/2, 1/4 u 1/8 del tamaño completo
+    image.draft("RGB", size)
+    image = image.convert("RGB")
+    if image.size != size:
+        image = image.resize(size, Image.BILINEAR)
+    return np.ascontiguousarray(np.asarray(image)[::-1])
+
+def _loader_loop():
+    while True:
+        _load_event.wait()
+        _load_event.clear()
+        size = _live_size
+        if size is None:
+            continue
+        # Más cercanas primero: son las más visibles
+        for offset, ident in sorted(_layers, key=lambda layer: _distance(layer[0])):
+            key = ident + size
+            if key in _cache:
+                continue
+            t0 = time.monotonic()
+            try:
+                _cache.put(key, _decode_reference(key[0], size))
+            except Exception as e:
+                print(f"[Zeta Motion] Live Blend: cannot load reference {key[0]}: {e}")
+                continue
+            zm_stats.record("live_blend", "decode_reference", time.monotonic() - t0)
+            if _load_event.is_set():
+                break   # el playhead se movió: recalcular prioridades
+
+def _ensure_loader():
+    global _loader
+    if _loader is None or not _loader.is_alive():
+        _loader = threading.Thread(target=_loader_loop, daemon=True, name="zm_onion_loader")
+        _loader.start()
+
+def _wanted_offsets():
+    prev = [-k for k in range(_settings["prev"])]          # 0, -1, -2...
+    nxt = [k for k in range(1, _settings["next"] + 1)]     # 1, 2...
+    return prev + nxt
+
+def set_layers(paths):
+    """
+    Fija las capas a partir de {offset: ruta}. Las claves llevan el mtime,
+    así un frame re-capturado en la misma ruta se vuelve a decodificar.
+    """
+    global _layers
+    layers = []
+    for offset, path in paths.items():
+        ident = zm_framecache.file_identity(path)
+        if ident:
+            layers.append((offset, ident))
+    # La más lejana primero: las cercanas quedan por encima
+    layers.sort(key=lambda layer: -_distance(layer[0]))
+    if layers != _layers:
+        _layers = layers
+        _ensure_loader()
+        _load_event.set()
+
+def set_reference(path):
+    """Referencia única (frame bajo el playhead)."""
+    set_layers({0: path} if path else {})
+
+def _track_playhead():
+    if not _tracking:
+        return None
+    try:
+        set_layers(zm_movie_source.get_frame_paths(bpy.context, _wanted_offsets()))
+    except Exception as e:
+        print(f"[Zeta Motion] Live Blend: reference lookup failed: {e}")
+    return REFERENCE_POLL
+
+def configure(scene):
+    """Lee opacidad, modo, capas y activación de la escena (llamado desde los 'update')."""
+    global _tracking
+    _settings.update(
+        enabled=scene.zm_live_blend_enabled,
+        factor=scene.zm_blend_factor,
+        mode=scene.zm_blend_mode,
+        prev=scene.zm_onion_prev,
+        next=scene.zm_onion_next,
+        falloff=scene.zm_onion_falloff,
+        use_tint=scene.zm_onion_use_tint,
+        tint_prev=tuple(scene.zm_onion_tint_prev),
+        tint_next=tuple(scene.zm_onion_tint_next),
+    )
+    _cache.set_limit(scene.zm_onion_cache_mb)
+    if _settings["enabled"] and not _tracking:
+        _tracking = True
+        bpy.app.timers.register(_track_playhead, first_interval=0.0)
+    elif not _settings["enabled"]:
+        _tracking = False
+
+def stop_tracking():
+    global _tracking
+    _tracking = False
+
+def cache_stats():
+    return _cache.stats()
+
+
+# ----------------------------------------------------------------
+# Ventana de Live Blend (ffplay con vídeo crudo, sin recomprimir)
+# ----------------------------------------------------------------
+def _open_window(width, height):
+    return subprocess.Popen(
+        ["ffplay", "-loglevel", "error", "-fflags", "nobuffer",
+         "-window_title", "Zeta Live Blend",
+         "-f", "rawvideo", "-pixel_format", "rgb24", "-video_size", f"{width}x{height}", "-"],
+        stdin=subprocess.PIPE, preexec_fn=os.setsid,
+    )
+
+def _on_frame(frame):
+    pixels = apply(zm_vse_live.decode_frame(frame.data, _output["scale"]))
+    height, width = pixels.shape[:2]
+    proc = _output["proc"]
+    if proc is None or _output["size"] != (width, height):
+        close_window()
+        proc = _output["proc"] = _open_window(width, height)
+        _output["size"] = (width, height)
+    rgb = (np.clip(pixels[::-1, :, :3], 0.0, 1.0) * 255.0).astype(np.uint8)
+    proc.stdin.write(rgb.tobytes())
+    proc.stdin.flush()
+
+def close_window():
+    proc = _output["proc"]
+    _output.update(proc=None, size=None)
+    if proc and proc.poll() is None:
+        try:
+            os.killpg(os.getpgid(proc.pid), signal.SIGTERM)
+        except Exception as e:
+            print(f"[Zeta Motion] Error closing Live Blend window: {e}")
+
+def start(bus, scene, scale=0.5):
+    """Suscribe la ventana de Live Blend al bus."""
+    configure(scene)
+    _output["scale"] = scale
+    bus.subscribe(CONSUMER_NAME, _on_frame)
+
+def stop(bus):
+    bus.unsubscribe(CONSUMER_NAME)
+    close_window()
@@ -0,0 +1,171 @@
+# zm_manifest.py — Zeta Motion
+# Blender 4.5+ | Linux-only
+# Manifiesto de proxies por carpeta (.zm_manifest.json).
+# Para cada frame HD guarda su huella (tamaño, mtime y un hash rápido de
+# los primeros y últimos 64 KB) y los proxies generados a partir de él con
+# sus ajustes de codificación. zm_convert lo consulta para saltarse el
+# trabajo ya hecho; zm_foto marca como 'dirty' los frames que toca.
+# Sin bpy: se importa también desde los procesos del pool de proxies.
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+MANIFEST_NAME = ".zm_manifest.json"
+VERSION = 1
+HASH_CHUNK = 64 * 1024
+
+
+def fingerprint(path):
+    """{"size", "mtime_ns", "hash"} del archivo, o None si no existe."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "hash": fast_hash(path, st.st_size)}
+
+def fast_hash(path, size=None):
+    """blake2b del tamaño + primeros y últimos 64 KB. Basta para distinguir tomas."""
+    if size is None:
+        size = os.path.getsize(path)
+    h = hashlib.blake2b(str(size).encode(), digest_size=16)
+    with open(path, "rb") as f:
+        h.update(f.read(HASH_CHUNK))
+        if size > 2 * HASH_CHUNK:
+            f.seek(-HASH_CHUNK, os.SEEK_END)
+            h.update(f.read(HASH_CHUNK))
+    return h.hexdigest()
+
+
+class Manifest:
+    def __init__(self, directory):
+        self.directory = directory
+        self.path = os.path.join(directory, MANIFEST_NAME)
+        self.frames = {}
+        self._lock = threading.RLock()
+        self._dirty_file = False
+        self.load()
+
+    def load(self):
+        with self._lock:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self.frames = data.get("frames", {}) if data.get("version") == VERSION else {}
+            except (OSError, ValueError):
+                self.frames = {}
+
+    def save(self):
+        """Escritura atómica (tmp + os.replace). Solo si hubo cambios."""
+        with self._lock:
+            if not self._dirty_file:
+                return
+            payload = json.dumps({"version": VERSION, "frames": self.frames}, indent=1, sort_keys=True)
+            self._dirty_file = False
+        try:
+            fd, tmp = tempfile.mkstemp(prefix=".zm_manifest_", suffix=".tmp", dir=self.directory)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"[Zeta Motion] Cannot save proxy manifest {self.path}: {e}")
+
+    # --- Consultas ---
+    def _current_fingerprint(self, entry, hd_path):
+        """Huella actual del HD, reutilizando el hash guardado si tamaño y mtime coinciden."""
+        try:
+            st = os.stat(hd_path)
+        except OSError:
+            return None
+        if entry and entry.get("size") == st.st_size and entry.get("mtime_ns") == st.st_mtime_ns:
+            return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "hash": entry.get("hash")}
+        return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "hash": fast_hash(hd_path, st.st_size)}
+
+    def stale_levels(self, hd_path, levels, settings, proxy_path_for):
+        """
+        Niveles de `levels` cuyo proxy falta, es de otro contenido HD o se
+        generó con otros ajustes. `proxy_path_for(hd_path, level)` da la ruta.
+        """
+        name = os.path.basename(hd_path)
+        with self._lock:
+            entry = self.frames.get(name)
+            if not entry or entry.get("dirty"):
+                return list(levels)
+            current = self._current_fingerprint(entry, hd_path)
+            if current is None or current["hash"] != entry.get("hash"):
+                return list(levels)
+            if current["mtime_ns"] != entry.get("mtime_ns"):
+                # Mismo contenido (copiado o tocado): solo se actualiza la huella
+                entry.update(current)
+                self._dirty_file = True
+            stale = []
+            for level in levels:
+                proxy = entry.get("proxies", {}).get(str(level))
+                if (not proxy or any(proxy.get(k) != v for k, v in settings.items())
+                        or not os.path.exists(proxy_path_for(hd_path, level))):
+                    stale.append(level)
+            return stale
+
+    def dirty_frames(self):
+        with self._lock:
+            return sorted(name for name, entry in self.frames.items() if entry.get("dirty"))
+
+    # --- Cambios ---
+    def record(self, hd_path, proxies, settings, fp=None):
+        """Anota los proxies generados ({nivel: ruta o None}) para hd_path."""
+        name = os.path.basename(hd_path)
+        fp = fp or fingerprint(hd_path)
+        if fp is None:
+            return
+        with self._lock:
+            entry = self.frames.get(name)
+            if not entry or entry.get("dirty") or entry.get("hash") != fp["hash"]:
+                entry = {"proxies": {}}
+            entry.update(fp)
+            entry["dirty"] = False
+            for level, path in proxies.items():
+                if path:
+                    entry["proxies"][str(level)] = dict(settings, file=os.path.basename(path))
+                else:
+                    entry["proxies"].pop(str(level), None)
+            self.frames[name] = entry
+            self._dirty_file = True
+
+    def mark_dirty(self, path):
+        """El frame se re-capturó o cambió de posición: sus proxies ya no valen."""
+        name = os.path.basename(path)
+        with self._lock:
+            entry = self.frames.setdefault(name, {"proxies": {}})
+            entry["dirty"] = True
+            self._dirty_file = True
+
+    def forget(self, path):
+        with self._lock:
+            if self.frames.pop(os.path.basename(path), None) is not None:
+                self._dirty_file = True
+
+
+_manifests = {}
+_manifests_lock = threading.Lock()
+
+def for_directory(directory):
+    """Manifiesto (compartido en el proceso) de la carpeta."""
+    directory = os.path.abspath(directory)
+    with _manifests_lock:
+        manifest = _manifests.get(directory)
+        if manifest is None:
+            manifest = _manifests[directory] = Manifest(directory)
+        return manifest
+
+def mark_dirty(*paths):
+    """Marca frames como 'dirty' y guarda sus manifiestos."""
+    touched = set()
+    for path in paths:
+        if path:
+            manifest = for_directory(os.path.dirname(path))
+            manifest.mark_dirty(path)
+            touched.add(manifest)
+    for manifest in touched:
+        manifest.save()
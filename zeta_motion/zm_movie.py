@@ -4,9 +4,6 @@
 # - capture_single_photo(): Captures a single photo via gphoto2 asynchronously (for zm_foto).
 
 import bpy
-import time
-import subprocess
-import threading
 import os
 
 # Pillow es una dependencia externa. Se asume que está instalada.
@@ -21,7 +18,10 @@ import tempfile
 from . import state
 from . import zm_stream
 from . import zm_convert   # <-- NEW
+from . import zm_embedded
+from . import zm_codec
 from . import zm_worker
+from .zm_capture_core import capture_image
 
 # --- Estado global para la comunicación entre el operador y el temporizador ---
 timer_state = {
@@ -32,6 +32,10 @@ timer_state = {
     "directory": None,
     # new key to store proxy path when ready
     "proxy_path": None,
+    # tamaño final del proxy (de la cabecera HD) mientras se usa la vista previa incrustada
+    "proxy_size": None,
+    # 'SIBLING' o 'BLENDER' (zm_convert.PROXY_LAYOUTS)
+    "proxy_layout": zm_convert.DEFAULT_LAYOUT,
 }
 
 # -----------------------------------------------------------------------------
@@ -43,12 +47,11 @@ def _get_image_resolution(image_path):
     if not Image:
         print("❌ Error: La librería Pillow no está instalada. No se pueden generar placeholders.")
         return None
-    try:
-        with Image.open(image_path) as img:
-            return img.size  # Retorna (ancho, alto)
-    except Exception as e:
-        print(f"❌ Error al leer la resolución de la imagen de referencia: {e}")
-        return None
+    # Solo la cabecera (SOF) en JPEG: sin decodificar la imagen
+    size = zm_codec.image_size(image_path)
+    if size is None:
+        print(f"❌ Error al leer la resolución de la imagen de referencia: {image_path}")
+    return size  # Retorna (ancho, alto)
 
 def _generate_placeholders(directory, base_name, length, resolution, overwrite):
     """Genera imágenes JPEG en blanco como placeholders para la secuencia."""
@@ -60,6 +63,13 @@ def _generate_placeholders(directory, base_name, length, resolution, overwrite):
     
     print(f"[Zeta Motion] Generando {length - 1} placeholders con resolución {width}x{height}...")
 
+    # Todos los placeholders son iguales: se codifica una sola vez (perfil 'placeholder')
+    try:
+        data = zm_codec.encode(Image.new('RGB', (width, height), color), "placeholder")
+    except Exception as e:
+        print(f"❌ Error al codificar el placeholder: {e}")
+        return
+
     # Creamos placeholders desde el frame 2 hasta el final
     for i in range(2, length + 1):
         filename = f"{base_name}_{i:05d}.jpg"
@@ -70,13 +80,23 @@ def _generate_placeholders(directory, base_name, length, resolution, overwrite):
             continue
 
         try:
-            placeholder_img = Image.new('RGB', (width, height), color)
-            placeholder_img.save(filepath, 'JPEG', quality=95)
+            with open(filepath, "wb") as f:
+                f.write(data)
         except Exception as e:
             print(f"❌ Error al crear el placeholder {filepath}: {e}")
     print("[Zeta Motion] Placeholders generados.")
 
 
+def sequence_target(scene):
+    """(directory, base_name) de la secuencia a partir de scene.zm_capture_path."""
+    capture_path_full = bpy.path.abspath(scene.zm_capture_path)
+    directory = os.path.dirname(capture_path_full)
+    base_name = os.path.basename(capture_path_full)
+    if not base_name or "." in base_name:
+        base_name = "zm_movie"; directory = capture_path_full
+    return directory, base_name
+
+
 def _find_available_vse_channel(scene):
     """Encuentra el canal de video más bajo disponible en el VSE."""
     if not scene.sequence_editor:
@@ -117,14 +137,9 @@ def capture_single_photo(dest_path=None, callback=None, tag="foto_capture"):
         tmp_file.close()
 
     def _task():
-        try:
-            cmd = ["gphoto2", "--capture-image-and-download", "--filename", dest_path]
-            result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-            if result.returncode != 0:
-                raise RuntimeError(f"gphoto2 capture failed: {result.stderr.strip()}")
-            return dest_path
-        except Exception as e:
-            raise RuntimeError(f"Failed to capture photo: {e}")
+        if not capture_image(dest_path):
+            raise RuntimeError("Failed to capture photo")
+        return dest_path
 
     def _on_done(result):
         if callback:
@@ -136,8 +151,12 @@ def capture_single_photo(dest_path=None, callback=None, tag="foto_capture"):
     zm_worker.enqueue(_task, tag=tag, callback=_on_done)
 
 # --- INICIO DE LA SOLUCIÓN IMPLEMENTADA ---
-def _create_vse_strip(context, directory, base_name, length):
-    """Crea un strip de secuencia de imágenes (no imagen única) en el VSE."""
+def _create_vse_strip(context, directory, base_name, length, use_sibling_proxies=True):
+    """
+    Crea un strip de secuencia de imágenes (no imagen única) en el VSE.
+    Sin use_sibling_proxies el strip lista solo los frames HD (proxies de Blender).
+    Devuelve el strip o None.
+    """
     scene = context.scene
 
     # Asegurar que el editor de secuencias esté disponible
@@ -148,7 +167,7 @@ def _create_vse_strip(context, directory, base_name, length):
     for s in scene.sequence_editor.sequences:
         if s.name == base_name:
             print(f"[Zeta Motion] ⚠️  El strip '{base_name}' ya existe en el VSE. No se creará uno nuevo.")
-            return
+            return None
 
     # Buscar canal libre
     channel = _find_available_vse_channel(scene)
@@ -161,8 +180,8 @@ def _create_vse_strip(context, directory, base_name, length):
 
     image_files = []
     # primero, intenta encontrar proxies en orden de presets (25/50/75)
-    for patt in proxy_patterns:
-        pf = [f for f in files if f.startswith(patt) and f.lower().endswith(".jpg")]
+    for patt in (proxy_patterns if use_sibling_proxies else ()):
+        pf = [f for f in files if f.startswith(patt) and f.lower().endswith(zm_convert.JPEG_EXTS)]
         if pf:
             image_files = sorted(pf)
             print(f"[Zeta Motion] Using proxy pattern '{patt}' with {len(image_files)} frames.")
@@ -170,13 +189,14 @@ def _create_vse_strip(context, directory, base_name, length):
 
     # si no hay proxies, caemos al patrón original base_name_*
     if not image_files:
-        image_files = [f for f in files if f.startswith(base_name + "_") and f.lower().endswith(".jpg")]
+        image_files = [f for f in files if f.startswith(base_name + "_") and f.lower().endswith(zm_convert.JPEG_EXTS)
+                       and (use_sibling_proxies or not zm_convert.PROXY_FRAME_RE.match(f))]
         if image_files:
             image_files = sorted(image_files)
 
     if not image_files:
         print(f"❌ No se encontraron imágenes con prefijo '{base_name}_' ni proxies en {directory}")
-        return
+        return None
 
 
     # Crear strip base con el primer frame
@@ -190,7 +210,7 @@ def _create_vse_strip(context, directory, base_name, length):
         )
     except Exception as e:
         print(f"❌ Error al crear el strip base: {e}")
-        return
+        return None
 
     # Añadir el resto de los frames a la secuencia
     added_count = 1
@@ -220,6 +240,7 @@ def _create_vse_strip(context, directory, base_name, length):
     scene.frame_current = frame_start
 
     print(f"[Zeta Motion] 🎬 Secuencia '{base_name}' añadida al VSE ({added_count} frames).")
+    return strip
 # --- FIN DE LA SOLUCIÓN IMPLEMENTADA ---
 
 # -----------------------------------------------------------------------------
@@ -247,13 +268,21 @@ def _timer_callback():
             print("⌛ Esperando proxy...")
             return 0.5
 
-        resolution = _get_image_resolution(proxy_path)
+        # El proxy puede ser aún la vista previa incrustada: medir con el tamaño final
+        resolution = timer_state.get("proxy_size") or _get_image_resolution(proxy_path)
 
 
         
+        blender_proxies = timer_state.get("proxy_layout") == 'BLENDER'
+        if blender_proxies:
+            # El strip lista los frames HD: placeholders con nombre y tamaño HD
+            resolution = zm_embedded.jpeg_dimensions(target_path) or _get_image_resolution(target_path)
+
         if resolution:
             # Derivar el nombre base directamente del proxy para nomenclatura correcta
             proxy_base = os.path.splitext(os.path.basename(proxy_path))[0]
+            if blender_proxies:
+                proxy_base = timer_state["base_name"]
             
             _generate_placeholders(
                 directory=timer_state["directory"],
@@ -263,12 +292,16 @@ def _timer_callback():
                 overwrite=scene.zm_movie_overwrite
             )
             
-            _create_vse_strip(
+            strip = _create_vse_strip(
                 context=context,
                 directory=timer_state["directory"],
                 base_name=timer_state["base_name"],
-                length=scene.zm_movie_length
+                length=scene.zm_movie_length,
+                use_sibling_proxies=not blender_proxies
             )
+            if strip and blender_proxies:
+                levels = set(getattr(scene, "zm_proxy_levels", ())) | {scene.zm_proxy_scale}
+                zm_convert.enable_blender_proxies(strip, levels)
 
         _resume_paused_stream(context)
         
@@ -279,74 +312,64 @@ def _timer_callback():
         timer_state["is_running"] = False
         # clear proxy path for next run
         timer_state["proxy_path"] = None
+        timer_state["proxy_size"] = None
         return None
     
     return 0.5
 
+def _refresh_strips_using(path):
+    """Invalida la caché de los strips que muestran `path` (reemplazado en disco)."""
+    scene = bpy.context.scene
+    seq = getattr(scene, "sequence_editor", None)
+    if not seq:
+        return
+    directory, filename = os.path.split(os.path.normpath(path))
+    for strip in seq.sequences_all:
+        if strip.type != 'IMAGE' or os.path.normpath(bpy.path.abspath(strip.directory)) != directory:
+            continue
+        if any(elem.filename == filename for elem in strip.elements):
+            strip.invalidate_cache('RAW')
+
 # -----------------------------------------------------------------------------
 # Lógica de Captura (parcialmente modificada para lanzar conversión asíncrona)
 # -----------------------------------------------------------------------------
-def _find_camera_image_folder():
-    """Encuentra dinámicamente la carpeta completa de imágenes en la cámara."""
-    print("[Zeta Motion Capture] Buscando carpeta de imágenes en la cámara...")
-    try:
-        result = subprocess.run(["gphoto2", "--list-folders"], capture_output=True, text=True, check=True, timeout=10)
-        for line in result.stdout.splitlines():
-            if "store" in line and "DCIM" in line:
-                folder = line.strip().split()[-1]
-                print(f"[Zeta Motion Capture] Carpeta completa encontrada: {folder}")
-                return folder
-        print("❌ Error: No se encontró una ruta absoluta que contenga 'DCIM'.")
-        return None
-    except Exception as e:
-        print(f"❌ Error al listar carpetas de la cámara: {e}")
-        return None
-
 def _capture_task(save_path):
-    """Tarea de captura ejecutada en un hilo para no bloquear Blender."""
+    """Tarea de captura ejecutada en el worker para no bloquear Blender."""
     try:
-        print("[Zeta Motion Capture] 1/4 - Disparando obturador...")
-        subprocess.run(["gphoto2", "--set-config", "eosremoterelease=5"], check=True, timeout=5)
-        time.sleep(2)
-
-        print("[Zeta Motion Capture] 2/4 - Listando archivos en la cámara...")
-        result = subprocess.run(["gphoto2", "--list-files"], capture_output=True, text=True, check=True, timeout=10)
-        lines = [l for l in result.stdout.splitlines() if l.strip().startswith("#")]
-        if not lines:
-            print("❌ Error: No se encontraron archivos en la cámara."); return
-        last_file_num = lines[-1].split()[0].replace("#", "").strip()
-        print(f"[Zeta Motion Capture] Último archivo detectado: #{last_file_num}")
-
-        print("[Zeta Motion Capture] 3/4 - Detectando ruta de la imagen...")
-        folder_path = _find_camera_image_folder()
-        if not folder_path: return
-        
-        folder_path = folder_path.strip(" .'\"")
-        if not folder_path.startswith("/store_"): folder_path = "/store_00020001/DCIM"
-
-        print(f"[Zeta Motion Capture] 4/4 - Descargando archivo a: {save_path}")
-        subprocess.run(
-            ["gphoto2", "--folder", folder_path, "--get-file", last_file_num, "--filename", save_path],
-            check=True, timeout=20
-        )
-        if not os.path.exists(save_path):
-            print(f"❌ Error: El comando de descarga finalizó, pero el archivo no se encontró.")
+        print(f"[Zeta Motion Capture] Disparando y descargando a: {save_path}")
+        if not capture_image(save_path) or not os.path.exists(save_path):
+            print(f"❌ Error: La captura finalizó, pero el archivo no se encontró.")
             return
 
         # --- START: generate proxy asynchronously ---
         try:
             sc = timer_state.get("context").scene if timer_state.get("context") else None
             scale_pref = getattr(sc, "zm_proxy_scale", "50") if sc else "50"
+            decode_pref = getattr(sc, "zm_proxy_decode", zm_convert.DEFAULT_DECODE) if sc else zm_convert.DEFAULT_DECODE
+            levels_pref = set(getattr(sc, "zm_proxy_levels", ())) if sc else set()
+            layout_pref = getattr(sc, "zm_proxy_layout", zm_convert.DEFAULT_LAYOUT) if sc else zm_convert.DEFAULT_LAYOUT
+
+            # Proxy provisional inmediato con la vista previa incrustada por la cámara
+            provisional, proxy_size = zm_convert.write_embedded_proxy(save_path, scale_pref, layout_pref)
+            if provisional:
+                timer_state["proxy_size"] = proxy_size
+                timer_state["proxy_path"] = provisional
 
             def _on_proxy_ready(proxy_path):
                 if proxy_path and os.path.exists(proxy_path):
                     timer_state["proxy_path"] = proxy_path
                     print(f"[Zeta Motion] Proxy ready: {proxy_path}")
+                    if provisional:
+                        # Con proxies de Blender el strip lista el frame HD, no el proxy
+                        _refresh_strips_using(save_path if layout_pref == 'BLENDER' else proxy_path)
+                elif provisional:
+                    print("[Zeta Motion] Proxy creation failed, keeping the embedded preview")
                 else:
                     timer_state["proxy_path"] = None
                     print("[Zeta Motion] Proxy creation failed or missing")
 
-            zm_convert.convert_image_async(save_path, scale_pref, callback=_on_proxy_ready)
+            zm_convert.convert_image_async(save_path, scale_pref, callback=_on_proxy_ready, decode=decode_pref,
+                                            levels=levels_pref, layout=layout_pref)
         except Exception as e:
             print(f"[Zeta Motion] Warning: proxy creation failed to start: {e}")
         # --- END: generate proxy asynchronously ---
@@ -355,15 +378,14 @@ def _capture_task(save_path):
         print(f"❌ Error durante la captura en segundo plano: {e}")
 
 # -----------------------------------------------------------------------------
-# Funciones Auxiliares de Pausa y Reanudación (sin cambios)
+# Funciones Auxiliares de Pausa y Reanudación
 # -----------------------------------------------------------------------------
+# Solo la fuente "movie" (gphoto2 --capture-movie) ocupa el dispositivo y hay
+# que pararla para disparar; los consumidores del bus siguen suscritos.
+# Con la fuente "session" la captura se intercala con el liveview.
 def _pause_active_stream():
-    current_method = state.control_state["stream"]["method"]
-    if current_method != "none":
-        print(f"[Zeta Motion] Stream activo detectado: '{current_method}'. Pausando...")
-        state.control_state["stream"]["paused_method"] = current_method
-        zm_stream.stop_all_streams()
-        time.sleep(1.5)
+    if zm_stream.pause_feed():
+        state.control_state["stream"]["paused_method"] = state.control_state["stream"]["source"]
         print("[Zeta Motion] Stream pausado.")
         return True
     return False
@@ -372,8 +394,7 @@ def _resume_paused_stream(context):
     paused_method = state.control_state["stream"]["paused_method"]
     if paused_method != "none":
         print(f"[Zeta Motion] Reanudando stream pausado: '{paused_method}'...")
-        if paused_method == "ffplay": zm_stream.start_live_view(context)
-        elif paused_method == "vse": zm_stream.start_vse_preview(context)
+        zm_stream.resume_feed()
         state.control_state["stream"]["paused_method"] = "none"
         print("[Zeta Motion] Stream reanudado.")
 
@@ -392,11 +413,7 @@ class ZM_OT_CreateMovieSequence(bpy.types.Operator):
             self.report({'WARNING'}, "Un proceso de creación de secuencia ya está en curso.")
             return {'CANCELLED'}
             
-        capture_path_full = bpy.path.abspath(scene.zm_capture_path)
-        directory = os.path.dirname(capture_path_full)
-        base_name = os.path.basename(capture_path_full)
-        if not base_name or "." in base_name:
-            base_name = "zm_movie"; directory = capture_path_full
+        directory, base_name = sequence_target(scene)
         if not os.path.isdir(directory):
             self.report({'ERROR'}, f"El directorio de captura no existe: {directory}")
             return {'CANCELLED'}
@@ -412,9 +429,7 @@ class ZM_OT_CreateMovieSequence(bpy.types.Operator):
         _pause_active_stream()
 
         self.report({'INFO'}, f"Capturando {first_frame_filename} en segundo plano...")
-        capture_thread = threading.Thread(target=_capture_task, args=(first_frame_path,))
-        capture_thread.daemon = True
-        capture_thread.start()
+        zm_worker.enqueue(lambda: _capture_task(first_frame_path), tag="movie_capture")
 
         timer_state.update({
             "is_running": True,
@@ -423,6 +438,8 @@ class ZM_OT_CreateMovieSequence(bpy.types.Operator):
             "base_name": base_name,
             "directory": directory,
             "proxy_path": None,
+            "proxy_size": None,
+            "proxy_layout": scene.zm_proxy_layout,
         })
         bpy.app.timers.register(_timer_callback, first_interval=0.5)
 
@@ -74,7 +74,6 @@ def _resolve_proxy_path(strip, frame_index):
         candidate_name = f"{base_name}_{suffix}_{numeric_index}{ext}"
         candidate_path = os.path.join(directory, candidate_name)
         if os.path.exists(candidate_path):
-            print(f"[Zeta Motion] Proxy/HD found for blend: {candidate_path}")
             return candidate_path
 
     # Si no se encuentra ningún proxy o HD, devolver la ruta original que está en el strip
@@ -84,23 +83,42 @@ def _resolve_proxy_path(strip, frame_index):
 
     return None
 
-def get_active_frame_path(context):
-    """
-    Función principal. Devuelve la ruta absoluta al archivo de imagen bajo el
-    playhead en el VSE, o None si no se cumplen las condiciones.
-    """
-    scene = context.scene
-    
+def _active_image_index(scene):
+    """(strip, índice del frame bajo el playhead) o (None, None)."""
     strip = _find_active_strip(scene)
     if not strip:
-        return None
-
-    # Calcular el índice del frame dentro de la secuencia de imágenes
+        return None, None
     frame_relative = scene.frame_current - strip.frame_start
     image_index = int(frame_relative + strip.frame_offset_start)
-    
-    # Verificar que el índice sea válido
     if not (0 <= image_index < len(strip.elements)):
+        return None, None
+    return strip, image_index
+
+def get_frame_paths(context, offsets):
+    """
+    Rutas de los frames a `offsets` (p. ej. -2, -1, 1) del frame bajo el
+    playhead, dentro del mismo strip. Devuelve {offset: ruta}; los offsets
+    fuera del strip o sin archivo se omiten.
+    """
+    strip, image_index = _active_image_index(context.scene)
+    if strip is None:
+        return {}
+    paths = {}
+    for offset in offsets:
+        index = image_index + offset
+        if 0 <= index < len(strip.elements):
+            path = _resolve_proxy_path(strip, index)
+            if path:
+                paths[offset] = path
+    return paths
+
+def get_active_frame_path(context):
+    """
+    Función principal. Devuelve la ruta absoluta al archivo de imagen bajo el
+    playhead en el VSE, o None si no se cumplen las condiciones.
+    """
+    strip, image_index = _active_image_index(context.scene)
+    if strip is None:
         return None
 
     # Resolver la mejor ruta (proxy o HD)
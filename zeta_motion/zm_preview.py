@@ -4,8 +4,10 @@
 
 import bpy
 import os
+import time
 from . import state
 from . import zm_properties
+from . import zm_stats, zm_stream, zm_worker
 from .zm_capture_core import capture_image, register_snapshot, build_output_path
 
 # ------------------------------------------------------------
@@ -13,24 +15,113 @@ from .zm_capture_core import capture_image, register_snapshot, build_output_path
 # ------------------------------------------------------------
 PREVIEW_STRIP_NAME = "ZM_Preview"
 PREVIEW_CHANNEL = 20  # Canal reservado para preview
+SNAPSHOT_NAMES = ("zm_snapshot_a.jpg", "zm_snapshot_b.jpg")
+LIVE_FRAME_MAX_AGE = 1.0  # segundos: frames más viejos no cuentan como "liveview activo"
+_snapshot_slot = [0]
 
 
 class ZM_OT_CapturePreview(bpy.types.Operator):
     bl_idname = "zm.capture_preview"
     bl_label = "Capture Preview"
-    bl_description = "Captura una imagen de preview y la actualiza en el VSE"
+    bl_description = "Actualiza el preview del VSE con el último frame del liveview (o una foto a resolución completa)"
+
+    full_resolution: bpy.props.BoolProperty(
+        name="Full Resolution",
+        description="Dispara y descarga una foto completa en lugar de usar el frame del liveview",
+        default=False,
+    )
 
     def execute(self, context):
         scene = context.scene
-        output_path = build_output_path(scene, prefix="preview")
+        t0 = time.monotonic()
+
+        if self.full_resolution:
+            output_path = build_output_path(scene, prefix="preview")
+
+            def _on_captured(ok):
+                if not ok:
+                    print("❌ [Zeta Motion] Fallo al capturar la imagen de preview.")
+                    return
+                register_snapshot(bpy.context.scene, output_path)
+                update_preview_strip(bpy.context, output_path)
+                zm_stats.record("preview", "full_capture", time.monotonic() - t0)
+
+            zm_worker.enqueue(lambda: capture_image(output_path), tag="preview_capture",
+                              callback=_on_captured)
+            self.report({'INFO'}, "Capturando preview a resolución completa...")
+            return {'FINISHED'}
+
+        # Frame reciente del stream activo: instantáneo, sin tocar la cámara
+        frame = zm_stream.bus.latest()
+        if frame and time.monotonic() - frame.timestamp < LIVE_FRAME_MAX_AGE:
+            path = write_snapshot(snapshot_dir(scene), frame.data)
+            update_preview_strip(context, path)
+            elapsed = time.monotonic() - t0
+            zm_stats.record("preview", "snapshot", elapsed)
+            self.report({'INFO'}, f"Preview actualizado desde el liveview ({elapsed * 1000:.0f} ms).")
+            return {'FINISHED'}
+
+        # Sin stream: pedir un único frame del visor a la sesión (en el worker)
+        if not state.control_state["system"]["connected"]:
+            self.report({'ERROR'}, "No hay cámara conectada.")
+            return {'CANCELLED'}
+
+        directory = snapshot_dir(scene)
+
+        def _grab():
+            return write_snapshot(directory, zm_worker.get_session().capture_preview())
+
+        def _on_grabbed(path):
+            if path:
+                update_preview_strip(bpy.context, path)
+                zm_stats.record("preview", "snapshot_oneshot", time.monotonic() - t0)
+
+        zm_worker.enqueue(_grab, tag="preview_capture", callback=_on_grabbed)
+        return {'FINISHED'}
 
-        if capture_image(output_path):
-            register_snapshot(scene, output_path)
-            refresh_preview_strip(context)
-        else:
-            self.report({'ERROR'}, "Fallo al capturar la imagen de preview.")
 
-        return {'FINISHED'}
+# ------------------------------------------------------------
+# SNAPSHOT DESDE EL LIVEVIEW
+# ------------------------------------------------------------
+def snapshot_dir(scene):
+    directory = bpy.path.abspath(getattr(scene, "zm_preview_path", "") or "")
+    if directory and os.path.isfile(directory):
+        directory = os.path.dirname(directory)
+    if not directory or not os.path.isdir(directory):
+        directory = bpy.app.tempdir or os.path.join(os.path.expanduser("~"), ".cache", "zeta_motion")
+        os.makedirs(directory, exist_ok=True)
+    return directory
+
+def write_snapshot(directory, data):
+    """
+    Escribe el JPEG de forma atómica (archivo temporal + os.replace).
+    Alterna entre dos nombres para que el strip cambie de archivo y el VSE
+    descarte su caché sin recrear el strip. Devuelve la ruta escrita.
+    """
+    _snapshot_slot[0] ^= 1
+    path = os.path.join(directory, SNAPSHOT_NAMES[_snapshot_slot[0]])
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return path
+
+def update_preview_strip(context, path):
+    """Apunta el preview strip a `path` sin destruirlo (lo crea si no existe)."""
+    scene = context.scene
+    strip = find_existing_preview_strip(scene)
+    if strip is None:
+        if hasattr(scene, "zm_preview_snapshot"):
+            scene.zm_preview_snapshot = path
+        return _create_image_strip(scene, path, props_data=zm_properties.cached_data.get("preview"))
+    directory = os.path.dirname(path) + os.sep
+    if bpy.path.abspath(strip.directory) != directory:
+        strip.directory = directory
+    # Cambiar el nombre del elemento invalida la caché del VSE solo para este strip
+    strip.elements[0].filename = os.path.basename(path)
+    if hasattr(scene, "zm_preview_snapshot"):
+        scene.zm_preview_snapshot = path
+    return strip
 
 
 # ------------------------------------------------------------
@@ -291,6 +382,12 @@ def register():
         name="Preview Strip Name",
         description="Identificador del strip de preview activo"
     )
+    # último snapshot mostrado en el preview strip
+    bpy.types.Scene.zm_preview_snapshot = bpy.props.StringProperty(
+        name="Preview Snapshot",
+        subtype='FILE_PATH',
+        description="Ruta del último snapshot de preview"
+    )
     for cls in classes:
         bpy.utils.register_class(cls)
     print("[Zeta Motion] zm_preview registered.")
@@ -298,9 +395,10 @@ def register():
 def unregister():
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
-    if hasattr(bpy.types.Scene, "zm_preview_strip_name"):
-        try:
-            delattr(bpy.types.Scene, "zm_preview_strip_name")
-        except Exception:
-            pass
+    for prop in ("zm_preview_strip_name", "zm_preview_snapshot"):
+        if hasattr(bpy.types.Scene, prop):
+            try:
+                delattr(bpy.types.Scene, prop)
+            except Exception:
+                pass
     print("[Zeta Motion] zm_preview unregistered.")
@@ -0,0 +1,391 @@
+# zm_proxy_pool.py — Zeta Motion
+# Blender 4.5+ | Linux-only
+# Reconstrucción de proxies de una secuencia completa en un pool de procesos.
+# Pillow en hilos no escala por el GIL; aquí cada proxy se genera con
+# zm_convert.convert_pyramid en un proceso aparte (contexto 'spawn', sin bpy):
+# una sola decodificación por frame HD escribe todos los niveles de proxy.
+# Se mantienen como mucho 2 tareas por proceso en vuelo, así cancelar es
+# inmediato y no se encolan miles de futures. Cada proxy se escribe de forma
+# atómica (tmp + os.replace): cancelar nunca deja archivos a medias.
+# Solo este proceso escribe el manifiesto (zm_manifest): los procesos hijos
+# devuelven sus resultados y el hilo gestor los anota.
+# El mismo pool revela los RAW en diferido (zm_develop, DevelopJob).
+# Los procesos codifican con el backend elegido para el rol "bulk" (zm_codec).
+# Con zm_proxy_layout = 'BLENDER' los proxies van a BL_proxy/ y el strip de
+# la secuencia activa los proxies propios de Blender (strip.proxy).
+
+import bpy
+import importlib
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from . import state, zm_codec, zm_convert, zm_develop, zm_manifest, zm_movie, zm_stats
+
+ADDON_DIR = os.path.dirname(os.path.abspath(__file__))
+IN_FLIGHT_PER_WORKER = 2
+MANIFEST_SAVE_EVERY = 50   # frames anotados entre guardados del manifiesto
+PROGRESS_POLL = 0.5        # segundos entre refrescos de la UI
+
+
+def default_workers():
+    # Un núcleo libre para Blender y la cámara
+    return max(1, (os.cpu_count() or 2) - 1)
+
+def _pool_function(module, name):
+    """
+    Función importada como módulo de primer nivel ('zm_convert'), no como
+    parte del paquete del add-on: los procesos hijos la reimportan por
+    nombre sin cargar __init__ ni bpy.
+    """
+    if ADDON_DIR not in sys.path:
+        sys.path.append(ADDON_DIR)
+    return getattr(importlib.import_module(module), name)
+
+
+class ProxyJob:
+    FUNCTION = ("zm_convert", "convert_pyramid")
+    LABEL = "Proxy frames"
+
+    def __init__(self, tasks, quality=zm_convert.DEFAULT_QUALITY, workers=None,
+                 decode=zm_convert.DEFAULT_DECODE, layout=zm_convert.DEFAULT_LAYOUT):
+        # Una tarea por frame HD: (ruta, niveles a generar)
+        self.tasks = list(tasks)
+        self.quality = quality
+        self.decode = decode
+        self.layout = layout
+        self.codec = zm_codec.selected("bulk")
+        self.directories = {os.path.dirname(task[0]) for task in self.tasks}
+        self.workers = workers or default_workers()
+        self.total = len(self.tasks)
+        self.done = 0
+        self.failed = 0
+        self.started_at = None
+        self.finished_at = None
+        self.cancelled = False
+        self._cancel = threading.Event()
+        self._thread = None
+        self._manifests = set()
+
+    # --- Hilo gestor ---
+    def _record(self, path, results):
+        """Anota los resultados en el manifiesto. Devuelve los manifiestos tocados."""
+        return [zm_convert.record_proxies(path, results, self.quality, self.decode, save=False,
+                                          layout=self.layout, codec=self.codec)]
+
+    def _collect(self, future, path):
+        try:
+            results = future.result()
+            ok = bool(results) and all(results.values())
+        except Exception as e:
+            print(f"[Zeta Motion] Proxy worker failed: {e}")
+            results, ok = None, False
+        if results:
+            manifests = self._record(path, results)
+            self._manifests.update(manifests)
+            if (self.done + self.failed) % MANIFEST_SAVE_EVERY == 0:
+                for manifest in manifests:
+                    manifest.save()
+        if ok:
+            self.done += 1
+        else:
+            self.failed += 1
+
+    def _run(self):
+        self.started_at = time.monotonic()
+        try:
+            convert = _pool_function(*self.FUNCTION)
+            ctx = multiprocessing.get_context("spawn")
+            pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=ctx)
+        except Exception as e:
+            print(f"❌ [Zeta Motion] Cannot start proxy pool: {e}")
+            self.failed = self.total - self.done
+            self.finished_at = time.monotonic()
+            return
+        tasks = iter(self.tasks)
+        pending = {}
+        try:
+            while not self._cancel.is_set():
+                while len(pending) < self.workers * IN_FLIGHT_PER_WORKER:
+                    task = next(tasks, None)
+                    if task is None:
+                        break
+                    pending[pool.submit(convert, task[0], task[1], self.quality, self.decode,
+                                        self.layout, self.codec)] = task[0]
+                if not pending:
+                    break
+                finished, _ = wait(pending, timeout=PROGRESS_POLL, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    self._collect(future, pending.pop(future))
+        finally:
+            # Las tareas en curso terminan (y se guardan completas); el resto no empieza
+            self.cancelled = self._cancel.is_set()
+            pool.shutdown(wait=True, cancel_futures=True)
+            for future, path in pending.items():
+                if future.done() and not future.cancelled():
+                    self._collect(future, path)
+            for manifest in self._manifests:
+                manifest.save()
+            self.finished_at = time.monotonic()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True, name="zm_proxy_pool")
+        self._thread.start()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def join(self, timeout=None):
+        if self._thread:
+            self._thread.join(timeout)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def progress(self):
+        processed = self.done + self.failed
+        end = self.finished_at or time.monotonic()
+        elapsed = end - self.started_at if self.started_at else 0.0
+        eta = None
+        if self.running and processed and not self._cancel.is_set():
+            eta = elapsed / processed * (self.total - processed)
+        return {
+            "running": self.running,
+            "total": self.total,
+            "done": self.done,
+            "failed": self.failed,
+            "elapsed_s": elapsed,
+            "eta_s": eta,
+            "cancelled": self.cancelled or self._cancel.is_set(),
+            "workers": self.workers,
+            "label": self.LABEL,
+        }
+
+
+class DevelopJob(ProxyJob):
+    """Revelado de RAW + proxies desde el TIFF revelado (zm_develop.develop_frame)."""
+    FUNCTION = ("zm_develop", "develop_frame")
+    LABEL = "Developing RAW"
+
+    def _record(self, path, results):
+        developed = results.get(zm_develop.DEVELOP_LEVEL)
+        raw_manifest = zm_manifest.for_directory(os.path.dirname(path))
+        raw_manifest.record(path, {zm_develop.DEVELOP_LEVEL: developed}, zm_develop.develop_settings())
+        if not developed:
+            return [raw_manifest]
+        proxies = {level: p for level, p in results.items() if level != zm_develop.DEVELOP_LEVEL}
+        return [raw_manifest, zm_convert.record_proxies(developed, proxies, self.quality, self.decode, save=False,
+                                                        layout=self.layout, codec=self.codec)]
+
+
+_job = None
+
+
+def _publish():
+    with state.state_lock:
+        state.control_state["system"]["proxy_job"] = _job.progress() if _job else None
+
+def _progress_timer():
+    _publish()
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'SEQUENCE_EDITOR':
+                area.tag_redraw()
+    if _job is None or _job.running:
+        return PROGRESS_POLL if _job else None
+    if _job.layout == 'BLENDER':
+        # Blender cachea la ausencia de proxy: recargar los strips de la carpeta
+        for directory in _job.directories:
+            for strip in zm_convert.blender_proxy_strips(bpy.context.scene, directory):
+                strip.invalidate_cache('RAW')
+    info = _job.progress()
+    verb = "cancelled" if info["cancelled"] else "finished"
+    print(f"[Zeta Motion] Proxy job ({info['label']}) {verb}: {info['done']}/{info['total']} frames in "
+          f"{info['elapsed_s']:.1f}s" + (f", {info['failed']} failed" if info["failed"] else "") + ".")
+    return None
+
+def is_running():
+    return _job is not None and _job.running
+
+def job_status():
+    return _job.progress() if _job else None
+
+def rebuild_proxies(directory, base_name=None, scale_labels=("50",), quality=zm_convert.DEFAULT_QUALITY,
+                    force=False, workers=None, decode=zm_convert.DEFAULT_DECODE, layout=zm_convert.DEFAULT_LAYOUT):
+    """
+    Regenera los proxies (niveles de `scale_labels`) de los frames HD de
+    `directory` (de `base_name` si se indica) en segundo plano. Salvo con
+    force=True, solo los niveles que el manifiesto da por desactualizados.
+    Devuelve el ProxyJob, o None si ya hay uno en marcha o no hay nada que hacer.
+    """
+    global _job
+    if is_running():
+        return None
+    levels = tuple(sorted({str(scale) for scale in scale_labels}))
+    codec = zm_codec.selected("bulk")
+    tasks = []
+    for path in zm_convert.find_hd_frames(directory, base_name):
+        stale = levels if force else tuple(zm_convert.stale_levels(path, levels, quality, decode, layout, codec))
+        if stale:
+            tasks.append((path, stale))
+    if not tasks:
+        return None
+    job = ProxyJob(tasks, quality=quality, workers=workers, decode=decode, layout=layout)
+    _job = job
+    job.start()
+    print(f"[Zeta Motion] Rebuilding proxies of {job.total} frames with {job.workers} processes ({job.codec})...")
+    bpy.app.timers.register(_progress_timer, first_interval=PROGRESS_POLL)
+    return job
+
+def develop_raw(directory, base_name=None, scale_labels=("50",), quality=zm_convert.DEFAULT_QUALITY,
+                force=False, workers=None, decode=zm_convert.DEFAULT_DECODE, layout=zm_convert.DEFAULT_LAYOUT):
+    """
+    Revela en segundo plano los RAW de la secuencia que no tienen revelado
+    al día (manifiesto: contenido y ajustes de revelado) y regenera sus
+    proxies. Devuelve el DevelopJob, o None si no hay nada que hacer.
+    """
+    global _job
+    if is_running() or not zm_develop.available():
+        return None
+    levels = tuple(sorted({str(scale) for scale in scale_labels}))
+    settings = zm_develop.develop_settings()
+    tasks = []
+    for path in zm_develop.find_raw_frames(directory, base_name):
+        manifest = zm_manifest.for_directory(os.path.dirname(path))
+        if force or manifest.stale_levels(path, [zm_develop.DEVELOP_LEVEL], settings, zm_develop.developed_path_for):
+            tasks.append((path, levels))
+    if not tasks:
+        return None
+    job = DevelopJob(tasks, quality=quality, workers=workers, decode=decode, layout=layout)
+    _job = job
+    job.start()
+    print(f"[Zeta Motion] Developing {job.total} RAW frames with {job.workers} processes ({job.codec})...")
+    bpy.app.timers.register(_progress_timer, first_interval=PROGRESS_POLL)
+    return job
+
+def cancel_rebuild(wait=False):
+    if _job is None:
+        return
+    _job.cancel()
+    if wait:
+        _job.join()
+
+
+# ----------------------------------------------------------------
+# OPERADORES
+# ----------------------------------------------------------------
+def _enable_blender_proxies(scene, base_name, levels):
+    """Con el layout 'BLENDER', activa los proxies de Blender en el strip de la secuencia."""
+    if scene.zm_proxy_layout != 'BLENDER':
+        return
+    strip = zm_convert.find_strip_by_base(scene, base_name)
+    if strip is not None:
+        zm_convert.enable_blender_proxies(strip, levels)
+
+class ZM_OT_RebuildProxies(bpy.types.Operator):
+    bl_idname = "zm.rebuild_proxies"
+    bl_label = "Rebuild Proxies"
+    bl_description = "Regenerate every proxy level of the whole sequence using all cores"
+
+    force: bpy.props.BoolProperty(name="Rebuild All", description="Also regenerate proxies the manifest reports as up to date", default=False)
+
+    def execute(self, context):
+        scene = context.scene
+        if is_running():
+            self.report({'WARNING'}, "A proxy job is already running.")
+            return {'CANCELLED'}
+        directory, base_name = zm_movie.sequence_target(scene)
+        levels = set(scene.zm_proxy_levels) | {scene.zm_proxy_scale}
+        job = rebuild_proxies(directory, base_name, levels, force=self.force,
+                              decode=scene.zm_proxy_decode, layout=scene.zm_proxy_layout)
+        _enable_blender_proxies(scene, base_name, levels)
+        if job is None:
+            self.report({'INFO'}, "All proxies are up to date.")
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"Rebuilding proxies of {job.total} frames...")
+        return {'FINISHED'}
+
+class ZM_OT_BenchmarkProxyDecode(bpy.types.Operator):
+    bl_idname = "zm.benchmark_proxy_decode"
+    bl_label = "Benchmark Proxy Decode"
+    bl_description = "Time the Fast and Quality proxy paths on the first frame of the sequence and re-select the fastest JPEG codec"
+
+    repeats: bpy.props.IntProperty(name="Repeats", default=3, min=1, max=20)
+
+    def execute(self, context):
+        scene = context.scene
+        frames = zm_convert.find_hd_frames(*zm_movie.sequence_target(scene))
+        if not frames:
+            self.report({'WARNING'}, "No HD frames found to benchmark.")
+            return {'CANCELLED'}
+        results = zm_convert.benchmark_decode(frames[0], scene.zm_proxy_scale, repeats=self.repeats)
+        print(f"[Zeta Motion] Proxy decode benchmark ({os.path.basename(frames[0])}, {scene.zm_proxy_scale}%):")
+        for mode, r in results.items():
+            zm_stats.record("convert", f"benchmark_{mode.lower()}", r["best_ms"] / 1000)
+            print(f"    {mode:8s} best {r['best_ms']:7.1f} ms  mean {r['mean_ms']:7.1f} ms  "
+                  f"decoded {r['decoded'][0]}x{r['decoded'][1]} ({r['decoded_mpx']:.1f} MPx) -> {r['size'][0]}x{r['size'][1]}")
+        fast, full = results['FAST']["best_ms"], results['QUALITY']["best_ms"]
+        message = f"Fast {fast:.0f} ms vs Quality {full:.0f} ms ({full / max(fast, 1e-3):.1f}x)"
+        # Con un frame real de la cámara, elegir de nuevo el backend JPEG (en un hilo; se guarda en disco)
+        if not frames[0].lower().endswith(zm_convert.DEVELOPED_EXTS):
+            if zm_codec.select_async(zm_convert._read_source(frames[0]), self.repeats):
+                message += "; re-selecting the JPEG codec in the background (see console)"
+        self.report({'INFO'}, message)
+        return {'FINISHED'}
+
+class ZM_OT_DevelopRaw(bpy.types.Operator):
+    bl_idname = "zm.develop_raw"
+    bl_label = "Develop RAW"
+    bl_description = "Develop the RAW frames of the sequence to lossless TIFF in the background and rebuild their proxies"
+
+    force: bpy.props.BoolProperty(name="Develop All", description="Also develop frames the manifest reports as up to date", default=False)
+
+    def execute(self, context):
+        scene = context.scene
+        if not zm_develop.available():
+            self.report({'ERROR'}, "RAW development needs the 'rawpy' Python package.")
+            return {'CANCELLED'}
+        if is_running():
+            self.report({'WARNING'}, "A proxy job is already running.")
+            return {'CANCELLED'}
+        directory, base_name = zm_movie.sequence_target(scene)
+        levels = set(scene.zm_proxy_levels) | {scene.zm_proxy_scale}
+        job = develop_raw(directory, base_name, levels, force=self.force, decode=scene.zm_proxy_decode,
+                          layout=scene.zm_proxy_layout)
+        _enable_blender_proxies(scene, base_name, levels)
+        if job is None:
+            self.report({'INFO'}, "All RAW frames are developed.")
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"Developing {job.total} RAW frames...")
+        return {'FINISHED'}
+
+class ZM_OT_CancelProxyRebuild(bpy.types.Operator):
+    bl_idname = "zm.cancel_proxy_rebuild"
+    bl_label = "Cancel Proxy Rebuild"
+
+    def execute(self, context):
+        cancel_rebuild()
+        return {'FINISHED'}
+
+
+classes = (
+    ZM_OT_RebuildProxies,
+    ZM_OT_CancelProxyRebuild,
+    ZM_OT_BenchmarkProxyDecode,
+    ZM_OT_DevelopRaw,
+)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+    print("[Zeta Motion] zm_proxy_pool registered.")
+
+def unregister():
+    cancel_rebuild(wait=True)
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
+    print("[Zeta Motion] zm_proxy_pool unregistered.")
@@ -0,0 +1,265 @@
+# zm_record.py — Zeta Motion
+# Blender 4.5+ | Linux-only
+# Grabación del liveview como animática de referencia.
+# Los JPEG del bus de frames se copian tal cual a un contenedor Matroska
+# (ffmpeg -c:v copy, sin recomprimir) y cada frame se anota en un índice
+# CSV al lado (tiempo relativo, hora, tamaño). Los archivos rotan por
+# tamaño o por duración. Un hilo escritor con cola propia desacopla el
+# disco del resto de consumidores: grabar no frena la visualización.
+
+import bpy
+import os
+import queue
+import shutil
+import subprocess
+import threading
+import time
+
+from . import state, zm_stats
+
+CONSUMER_NAME = "record"
+QUEUE_FRAMES = 240           # frames en espera antes de empezar a descartar
+INDEX_HEADER = "frame,pts_s,wall_time,bytes,offset\n"
+
+
+class _Segment:
+    """Un archivo de grabación y su índice."""
+
+    def __init__(self, path_base, use_ffmpeg):
+        self.index_path = path_base + ".idx.csv"
+        self.frames = 0
+        self.bytes = 0
+        self.first_ts = None
+        self.proc = None
+        if use_ffmpeg:
+            self.path = path_base + ".mkv"
+            self.proc = subprocess.Popen(
+                ["ffmpeg", "-loglevel", "error", "-y",
+                 "-use_wallclock_as_timestamps", "1", "-f", "mjpeg", "-i", "-",
+                 "-c:v", "copy", "-f", "matroska", self.path],
+                stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+            )
+            self._out = self.proc.stdin
+        else:
+            # Sin ffmpeg: MJPEG crudo (JPEGs concatenados); el índice guarda los offsets
+            self.path = path_base + ".mjpeg"
+            self._out = open(self.path, "wb")
+        self._index = open(self.index_path, "w", encoding="utf-8")
+        self._index.write(INDEX_HEADER)
+
+    def write(self, frame):
+        if self.first_ts is None:
+            self.first_ts = frame.timestamp
+        self._out.write(frame.data)
+        self._index.write(f"{self.frames},{frame.timestamp - self.first_ts:.6f},"
+                          f"{time.time():.6f},{len(frame.data)},{self.bytes}\n")
+        self.frames += 1
+        self.bytes += len(frame.data)
+
+    def duration(self, timestamp):
+        return 0.0 if self.first_ts is None else timestamp - self.first_ts
+
+    def close(self):
+        try:
+            self._out.close()
+        except OSError:
+            pass
+        if self.proc:
+            try:
+                self.proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+        self._index.close()
+
+
+class Recorder:
+    def __init__(self, directory, base_name, max_mb=2048, max_minutes=10):
+        self.directory = directory
+        self.base_name = base_name
+        self.max_bytes = max_mb * 1024 * 1024 if max_mb else None
+        self.max_seconds = max_minutes * 60 if max_minutes else None
+        self.use_ffmpeg = shutil.which("ffmpeg") is not None
+        self.segment = None
+        self.segments = []
+        self.frames = 0
+        self.dropped = 0
+        self.error = None            # OSError que detuvo el hilo escritor
+        self._queue = queue.Queue(maxsize=QUEUE_FRAMES)
+        self._thread = None
+        self._stamp = time.strftime("%Y%m%d_%H%M%S")
+
+    # --- Hilo del consumidor del bus: solo encola ---
+    def _enqueue(self, frame):
+        if self.error is not None:
+            return
+        try:
+            self._queue.put_nowait(frame)
+        except queue.Full:
+            self.dropped += 1
+            zm_stats.count("dropped", "record")
+
+    # --- Hilo escritor ---
+    def _needs_rotation(self, frame):
+        seg = self.segment
+        if seg is None:
+            return True
+        if self.max_bytes and seg.bytes + len(frame.data) > self.max_bytes and seg.frames:
+            return True
+        return bool(self.max_seconds and seg.duration(frame.timestamp) >= self.max_seconds)
+
+    def _open_segment(self):
+        if self.segment:
+            self.segment.close()
+        path_base = os.path.join(self.directory,
+                                 f"{self.base_name}_{self._stamp}_{len(self.segments) + 1:03d}")
+        self.segment = _Segment(path_base, self.use_ffmpeg)
+        self.segments.append(self.segment.path)
+        print(f"[Zeta Motion] Recording to {self.segment.path}")
+
+    def _run(self):
+        while True:
+            frame = self._queue.get()
+            if frame is None:
+                break
+            try:
+                if self._needs_rotation(frame):
+                    self._open_segment()
+                t0 = time.monotonic()
+                self.segment.write(frame)
+                zm_stats.record("record", "write", time.monotonic() - t0)
+                self.frames += 1
+            except OSError as e:
+                print(f"❌ [Zeta Motion] Recording stopped: {e}")
+                self.error = e
+                break
+        if self.segment:
+            self.segment.close()
+            self.segment = None
+        if self.error is not None:
+            # Desuscribir y limpiar el estado desde el hilo principal
+            bpy.app.timers.register(lambda: _on_writer_failed(self), first_interval=0.0)
+
+    def start(self, bus):
+        os.makedirs(self.directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, daemon=True, name="zm_recorder")
+        self._thread.start()
+        bus.subscribe(CONSUMER_NAME, self._enqueue, every_frame=True)
+
+    def stop(self, bus):
+        bus.unsubscribe(CONSUMER_NAME)
+        # Si el escritor ya terminó por un error, la cola puede estar llena
+        while self._thread and self._thread.is_alive():
+            try:
+                self._queue.put(None, timeout=0.5)
+                break
+            except queue.Full:
+                pass
+        if self._thread:
+            self._thread.join(timeout=15)
+
+    def status(self):
+        return {
+            "path": self.segment.path if self.segment else (self.segments[-1] if self.segments else None),
+            "segments": len(self.segments),
+            "frames": self.frames,
+            "dropped": self.dropped,
+        }
+
+
+_recorder = None
+
+def is_recording():
+    return _recorder is not None
+
+def start_recording(context):
+    global _recorder
+    from . import zm_stream
+    if _recorder is not None:
+        return True
+    scene = context.scene
+    if not zm_stream.ensure_feed(context):
+        return False
+    directory = bpy.path.abspath(scene.zm_record_path or "//recordings/")
+    _recorder = Recorder(directory, "zm_liveview",
+                         max_mb=scene.zm_record_max_mb, max_minutes=scene.zm_record_max_minutes)
+    _recorder.start(zm_stream.bus)
+    with state.state_lock:
+        state.control_state["stream"]["recording"] = True
+    return True
+
+def stop_recording():
+    global _recorder
+    from . import zm_stream
+    recorder, _recorder = _recorder, None
+    if recorder is None:
+        return None
+    recorder.stop(zm_stream.bus)
+    with state.state_lock:
+        state.control_state["stream"]["recording"] = False
+    status = recorder.status()
+    print(f"[Zeta Motion] Recording stopped: {status['frames']} frames in {status['segments']} file(s)"
+          + (f", {status['dropped']} dropped" if status['dropped'] else "") + ".")
+    # Sin otros consumidores no tiene sentido mantener la cámara en liveview
+    if not zm_stream.bus.consumers():
+        zm_stream.stop_feed()
+    return status
+
+def _on_writer_failed(recorder):
+    """Timer: el hilo escritor murió (disco lleno, permisos...); parar la grabación."""
+    if _recorder is recorder:
+        stop_recording()
+    return None
+
+def recording_status():
+    return _recorder.status() if _recorder else None
+
+
+# ----------------------------------------------------------------
+# OPERADORES
+# ----------------------------------------------------------------
+class ZM_OT_StartRecording(bpy.types.Operator):
+    bl_idname = "zm.start_recording"
+    bl_label = "Record Live View"
+    bl_description = "Record the live view stream to disk without re-encoding"
+
+    def execute(self, context):
+        if not start_recording(context):
+            self.report({'WARNING'}, "No active camera stream to record.")
+            return {'CANCELLED'}
+        return {'FINISHED'}
+
+class ZM_OT_StopRecording(bpy.types.Operator):
+    bl_idname = "zm.stop_recording"
+    bl_label = "Stop Recording"
+
+    def execute(self, context):
+        status = stop_recording()
+        if status:
+            self.report({'INFO'}, f"Recorded {status['frames']} frames.")
+        return {'FINISHED'}
+
+
+classes = (
+    ZM_OT_StartRecording,
+    ZM_OT_StopRecording,
+)
+
+def register():
+    bpy.types.Scene.zm_record_path = bpy.props.StringProperty(name="Recording Folder", subtype='DIR_PATH', default="//recordings/")
+    bpy.types.Scene.zm_record_max_mb = bpy.props.IntProperty(name="Max File Size (MB)", description="Start a new file past this size (0 = no limit)", default=2048, min=0)
+    bpy.types.Scene.zm_record_max_minutes = bpy.props.IntProperty(name="Max File Length (min)", description="Start a new file past this duration (0 = no limit)", default=10, min=0)
+    for cls in classes:
+        bpy.utils.register_class(cls)
+    print("[Zeta Motion] zm_record registered.")
+
+def unregister():
+    stop_recording()
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
+    for prop in ("zm_record_path", "zm_record_max_mb", "zm_record_max_minutes"):
+        if hasattr(bpy.types.Scene, prop):
+            try:
+                delattr(bpy.types.Scene, prop)
+            except Exception:
+                pass
+    print("[Zeta Motion] zm_record unregistered.")
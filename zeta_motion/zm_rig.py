@@ -0,0 +1,206 @@
+# zm_rig.py — Zeta Motion
+# Blender 4.5+ | Linux-only
+# Rigs multi-cámara: varias cámaras conectadas a la vez, cada una con su
+# propio carril serializado en zm_worker (corren en paralelo), y un disparo
+# "capture all" sincronizado que informa del desfase entre cuerpos.
+# Cada cámara guarda sus frames en su propia secuencia / strip del VSE.
+
+import bpy
+import os
+import re
+import threading
+
+from . import state, zm_worker, zm_capture_core, zm_movie
+
+# ----------------------------------------------------------------
+# Gestión del rig
+# ----------------------------------------------------------------
+def rig_cameras():
+    with state.state_lock:
+        return [dict(c) for c in state.control_state["camera"]["rig"]]
+
+def _next_slug(rig):
+    used = {c.get("slug") for c in rig}
+    n = 1
+    while f"cam{n}" in used:
+        n += 1
+    return f"cam{n}"
+
+def add_to_rig(camera_dict):
+    """Añade la cámara al rig (sin cambiar la cámara activa). Devuelve su entrada."""
+    with state.state_lock:
+        rig = state.control_state["camera"]["rig"]
+        for cam in rig:
+            if cam["port"] == camera_dict["port"]:
+                return cam
+        entry = dict(camera_dict)
+        entry["slug"] = _next_slug(rig)
+        rig.append(entry)
+    print(f"[Zeta Motion] {entry['model']} ({entry['port']}) added to rig as '{entry['slug']}'.")
+    return entry
+
+def drop_camera(port):
+    """Quita la cámara del rig, cierra su sesión y detiene su carril."""
+    with state.state_lock:
+        rig = state.control_state["camera"]["rig"]
+        state.control_state["camera"]["rig"] = [c for c in rig if c["port"] != port]
+    keep = [c["port"] for c in rig_cameras()]
+    zm_worker.close_sessions(keep_ports=keep + [state.control_state["camera"].get("active_port")])
+    zm_worker.remove_lane(zm_worker.camera_lane(port))
+
+def reset_rig(camera_dict=None):
+    """Deja el rig solo con `camera_dict` (o vacío)."""
+    for cam in rig_cameras():
+        if not camera_dict or cam["port"] != camera_dict["port"]:
+            zm_worker.remove_lane(zm_worker.camera_lane(cam["port"]))
+    with state.state_lock:
+        state.control_state["camera"]["rig"] = []
+    if camera_dict:
+        add_to_rig(camera_dict)
+
+# ----------------------------------------------------------------
+# Capture all
+# ----------------------------------------------------------------
+def _next_index(directory, prefix):
+    pattern = re.compile(rf"{re.escape(prefix)}_(\d+)\.\w+$", re.IGNORECASE)
+    indices = [int(m.group(1)) for f in os.listdir(directory) if (m := pattern.match(f))]
+    return max(indices, default=0) + 1
+
+def _append_to_strip(scene, strip_name, filepath):
+    """Añade el frame al strip de la cámara (lo crea si no existe)."""
+    if not scene.sequence_editor:
+        scene.sequence_editor_create()
+    seq = scene.sequence_editor
+    strip = seq.sequences_all.get(strip_name)
+    if strip is None:
+        from .zm_movie import _find_available_vse_channel
+        strip = seq.sequences.new_image(
+            name=strip_name,
+            filepath=filepath,
+            channel=_find_available_vse_channel(scene),
+            frame_start=scene.frame_current,
+        )
+        return strip
+    strip.elements.append(os.path.basename(filepath))
+    strip.frame_final_duration = len(strip.elements)
+    return strip
+
+def capture_all(context):
+    """
+    Dispara todas las cámaras del rig a la vez. Cada disparo corre en el
+    carril de su cámara y espera en una barrera común para salir juntos.
+    Devuelve la lista de TaskHandle (vacía si no hay rig).
+    """
+    cams = rig_cameras()
+    if not cams:
+        print("[Zeta Motion] Capture all: no cameras in rig.")
+        return []
+
+    scene = context.scene
+    directory, base_name = zm_movie.sequence_target(scene)
+    os.makedirs(directory, exist_ok=True)
+    barrier = threading.Barrier(len(cams))
+    jobs = []
+
+    for cam in cams:
+        prefix = f"{base_name}_{cam['slug']}"
+        path = os.path.join(directory, f"{prefix}_{_next_index(directory, prefix):05d}.jpg")
+
+        def _task(cam=cam, path=path):
+            session = zm_worker.get_session(cam["port"])
+            files = session.capture(path, barrier=barrier,
+                                    companions=zm_capture_core.companions_for_current_format())
+            start, end = session.last_trigger
+            if not zm_capture_core.ensure_jpeg(path, files):
+                raise RuntimeError(f"no viewable image for {path}")
+            return {"port": cam["port"], "slug": cam["slug"], "path": path, "start": start, "end": end}
+
+        handle = zm_worker.enqueue(
+            _task, tag="rig_capture", priority=zm_worker.PRIORITY_CAPTURE,
+            lane=zm_worker.camera_lane(cam["port"]),
+        )
+        jobs.append((cam, prefix, handle))
+
+    def _collect():
+        if not all(h.done() for _, _, h in jobs):
+            return 0.1
+        ok = [(cam, prefix, h.result) for cam, prefix, h in jobs if h.status == "done"]
+        failed = [cam["slug"] for cam, _, h in jobs if h.status != "done"]
+        starts = [r["start"] for _, _, r in ok]
+        ends = [r["end"] for _, _, r in ok]
+        report = {
+            "cameras": len(jobs),
+            "ok": len(ok),
+            "failed": failed,
+            "skew_ms": (max(starts) - min(starts)) * 1000 if len(starts) > 1 else 0.0,
+            "ack_skew_ms": (max(ends) - min(ends)) * 1000 if len(ends) > 1 else 0.0,
+        }
+        with state.state_lock:
+            state.control_state["system"]["last_rig_capture"] = report
+        print(f"[Zeta Motion] Capture all: {report['ok']}/{report['cameras']} cameras, "
+              f"trigger skew {report['skew_ms']:.1f} ms (ack {report['ack_skew_ms']:.1f} ms)"
+              + (f", failed: {', '.join(failed)}" if failed else ""))
+        for cam, prefix, result in ok:
+            try:
+                _append_to_strip(bpy.context.scene, prefix, result["path"])
+            except Exception as e:
+                print(f"❌ [Zeta Motion] Could not add {result['path']} to strip '{prefix}': {e}")
+        return None
+
+    bpy.app.timers.register(_collect, first_interval=0.1)
+    return [h for _, _, h in jobs]
+
+# ----------------------------------------------------------------
+# OPERADORES
+# ----------------------------------------------------------------
+class ZM_OT_AddCameraToRig(bpy.types.Operator):
+    bl_idname = "zm.add_camera_to_rig"
+    bl_label = "Add to Rig"
+    bl_description = "Connect the selected camera as an additional rig body"
+
+    def execute(self, context):
+        cams = state.control_state["camera"]["available"]
+        selected = next((c for c in cams if c["port"] == context.scene.zm_camera_list), None)
+        if not selected:
+            self.report({'WARNING'}, "No camera selected.")
+            return {'CANCELLED'}
+        add_to_rig(selected)
+        return {'FINISHED'}
+
+class ZM_OT_RemoveCameraFromRig(bpy.types.Operator):
+    bl_idname = "zm.remove_camera_from_rig"
+    bl_label = "Remove from Rig"
+
+    port: bpy.props.StringProperty()
+
+    def execute(self, context):
+        drop_camera(self.port)
+        return {'FINISHED'}
+
+class ZM_OT_CaptureAll(bpy.types.Operator):
+    bl_idname = "zm.capture_all"
+    bl_label = "Capture All"
+    bl_description = "Trigger every camera in the rig together; each body writes to its own strip"
+
+    def execute(self, context):
+        if not capture_all(context):
+            self.report({'WARNING'}, "No cameras in rig.")
+            return {'CANCELLED'}
+        return {'FINISHED'}
+
+
+classes = (
+    ZM_OT_AddCameraToRig,
+    ZM_OT_RemoveCameraFromRig,
+    ZM_OT_CaptureAll,
+)
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+    print("[Zeta Motion] zm_rig registered.")
+
+def unregister():
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
+    print("[Zeta Motion] zm_rig unregistered.")
@@ -0,0 +1,756 @@
+# zm_session.py — Zeta Motion
+# Blender 4.5+ | Linux-only
+# Sesión persistente con la cámara. En lugar de lanzar un proceso `gphoto2`
+# por comando (reabrir el USB y re-enumerar la cámara cada vez), se mantiene
+# abierto un único backend por puerto:
+#   - libgphoto2 vía python-gphoto2, si está instalado.
+#   - Un hijo `gphoto2 --shell` controlado por pipes, en caso contrario.
+# Las sesiones pertenecen a zm_worker (ver zm_worker.get_session).
+
+import os
+import re
+import select
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from . import zm_stats
+
+# python-gphoto2 es opcional.
+try:
+    import gphoto2 as gp
+except ImportError:
+    gp = None
+
+# Reintentos tras perder la conexión (cable, hub USB, cámara apagada...)
+RECONNECT_ATTEMPTS = 2
+RECONNECT_BACKOFF = 0.5      # segundos, se duplica en cada intento
+DEFAULT_TIMEOUT = 10.0
+CAPTURE_TIMEOUT = 30.0
+LATENCY_HISTORY = 50
+BARRIER_TIMEOUT = 5.0    # espera máxima del disparo sincronizado multi-cámara
+COMPANION_TIMEOUT = 5.0  # RAW+JPEG: espera del segundo archivo de la misma toma
+EVENT_WINDOW = 0.25      # shell: ventana de cada "wait-event Nms" al esperar acompañantes
+LIVEVIEW_MAX_FPS = 30
+# Operaciones demasiado frecuentes para imprimir su latencia
+QUIET_OPS = {"capture_preview"}
+# Operaciones que no se repiten tras reconectar: disparar no es idempotente
+# (dispararía dos veces) y un evento FILE_ADDED perdido no vuelve a llegar
+NO_RETRY_OPS = {"trigger_capture", "wait_for_file", "wait_for_companion"}
+
+
+class SessionError(RuntimeError):
+    """
+    Error de comunicación con la cámara. `lost` indica que el dispositivo o el
+    proceso se perdieron (hay que reconectar); si es False la cámara respondió
+    con un error (valor inválido, ocupada...).
+    """
+
+    def __init__(self, message, lost=False):
+        super().__init__(message)
+        self.lost = lost
+
+
+# Deadline (time.monotonic()) de la tarea que corre en este hilo: acota los
+# timeouts de todas las operaciones de sesión que haga (ver task_deadline()).
+_deadline = threading.local()
+
+
+@contextmanager
+def task_deadline(at):
+    """
+    Acota hasta `at` (time.monotonic(); None = sin límite) las esperas de las
+    sesiones usadas desde este hilo: bloqueo de la sesión, comandos del shell,
+    eventos y reconexiones. Al vencer, la operación falla con SessionError en
+    lugar de seguir en segundo plano.
+    """
+    previous = getattr(_deadline, "at", None)
+    _deadline.at = at
+    try:
+        yield
+    finally:
+        _deadline.at = previous
+
+
+def _remaining(timeout=None):
+    """`timeout` recortado al deadline del hilo (None si no hay ninguno de los dos)."""
+    at = getattr(_deadline, "at", None)
+    if at is None:
+        return timeout
+    remaining = max(0.0, at - time.monotonic())
+    return remaining if timeout is None else min(timeout, remaining)
+
+
+def _check_deadline():
+    if _remaining() == 0.0:
+        raise SessionError("task deadline expired")
+
+
+def parse_config_output(output):
+    """Extrae (current, choices) de la salida de `get-config`."""
+    current_value = None
+    choices = []
+    if output is None:
+        return None, []
+    for line in output.splitlines():
+        line = line.strip()
+        if line.startswith("Current:"):
+            current_value = line.split(":", 1)[1].strip()
+        elif line.startswith("Choice:"):
+            parts = line.split(maxsplit=2)
+            if len(parts) == 3:
+                choices.append(parts[2])
+    return current_value, choices
+
+
+# Línea de evento de gphoto2: "FILEADDED IMG_0001.JPG /store_00020001/DCIM/100CANON"
+FILE_ADDED_RE = re.compile(r"FILEADDED\s+(\S+)\s+(\S+)")
+
+
+def parse_config_listing(output):
+    """
+    Parsea la salida de `list-all-config` (bloques path / Label / Type /
+    Current / Choice... / END) -> {path: {"label", "type", "readonly",
+    "current", "choices"}}.
+    """
+    listing = {}
+    path = None
+    entry = None
+    for line in (output or "").splitlines():
+        line = line.strip()
+        if line == "END":
+            if path:
+                listing[path] = entry
+            path = None
+            continue
+        if path is None:
+            if line.startswith("/"):
+                path = line
+                entry = {"label": None, "type": None, "readonly": False, "current": None, "choices": []}
+            continue
+        key, _, value = line.partition(":")
+        value = value.strip()
+        if key == "Choice":
+            parts = value.split(maxsplit=1)
+            entry["choices"].append(parts[1] if len(parts) == 2 else "")
+        elif key == "Current":
+            entry["current"] = value
+        elif key == "Label":
+            entry["label"] = value
+        elif key == "Type":
+            entry["type"] = value
+        elif key == "Readonly":
+            entry["readonly"] = value == "1"
+    return listing
+
+
+# -----------------------------------------------------------------------------
+# Backend: gphoto2 --shell
+# -----------------------------------------------------------------------------
+class _ShellBackend:
+    """Controla un proceso `gphoto2 --shell` de larga vida a través de pipes."""
+
+    name = "shell"
+    # Ej: "gphoto2: {/tmp/zm_session_x} /store_00020001/DCIM> "
+    PROMPT_RE = re.compile(rb"gphoto2: \{[^}]*\} [^\n]*> $")
+
+    def __init__(self, port=None):
+        self.port = port
+        self.proc = None
+        self.workdir = tempfile.mkdtemp(prefix="zm_session_")
+        self._files = deque()   # FILE_ADDED ya leídos y aún no pedidos
+
+    def open(self):
+        if not shutil.which("gphoto2"):
+            raise SessionError("gphoto2 not found. Install it with 'sudo apt install gphoto2'.", lost=True)
+        cmd = ["gphoto2"]
+        if self.port:
+            cmd += ["--port", self.port]
+        cmd.append("--shell")
+        self.proc = subprocess.Popen(
+            cmd,
+            cwd=self.workdir,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            bufsize=0,
+        )
+        self._read_until_prompt(_remaining(DEFAULT_TIMEOUT))
+
+    def close(self):
+        proc, self.proc = self.proc, None
+        if proc:
+            try:
+                if proc.poll() is None:
+                    proc.stdin.write(b"exit\n")
+                    proc.stdin.flush()
+                    proc.wait(timeout=2)
+            except Exception:
+                proc.kill()
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def is_alive(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def _read_until_prompt(self, timeout):
+        fd = self.proc.stdout.fileno()
+        buf = b""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise SessionError(f"timeout waiting for gphoto2 shell prompt ({timeout:.0f}s)", lost=True)
+            ready, _, _ = select.select([fd], [], [], remaining)
+            if not ready:
+                continue
+            chunk = os.read(fd, 4096)
+            if not chunk:
+                raise SessionError("gphoto2 shell exited unexpectedly", lost=True)
+            buf += chunk
+            match = self.PROMPT_RE.search(buf)
+            if match:
+                return buf[:match.start()].decode("utf-8", errors="replace")
+
+    def execute(self, line, timeout=DEFAULT_TIMEOUT):
+        """Envía una línea al shell y devuelve su salida (sin el prompt)."""
+        timeout = _remaining(timeout)
+        if timeout == 0.0:
+            # Sin enviar nada: el shell sigue sincronizado con su prompt
+            raise SessionError("task deadline expired")
+        if not self.is_alive():
+            raise SessionError("gphoto2 shell is not running", lost=True)
+        try:
+            self.proc.stdin.write(line.encode("utf-8") + b"\n")
+            self.proc.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            raise SessionError(f"gphoto2 shell pipe closed: {e}", lost=True)
+        output = self._read_until_prompt(timeout)
+        # readline puede hacer eco de la línea enviada
+        lines = output.splitlines()
+        if lines and lines[0].strip() == line.strip():
+            lines = lines[1:]
+        output = "\n".join(lines)
+        if "*** Error" in output:
+            raise SessionError(output.strip())
+        return output
+
+    # --- Operaciones ---
+    def get_config(self, path):
+        return parse_config_output(self.execute(f"get-config {path}"))
+
+    def get_configs(self, paths):
+        return {path: self.get_config(path)[0] for path in paths}
+
+    def set_config(self, values):
+        for path, value in values.items():
+            self.execute(f"set-config {path}={value}")
+
+    def list_all_config(self):
+        try:
+            listing = parse_config_listing(self.execute("list-all-config", timeout=CAPTURE_TIMEOUT))
+        except SessionError as e:
+            if e.lost:
+                raise
+            listing = {}
+        if listing:
+            return listing
+        # Shells sin list-all-config: list-config + get-config, en el mismo proceso
+        for path in self.execute("list-config").splitlines():
+            path = path.strip()
+            if path.startswith("/"):
+                block = f"{path}\n{self.execute(f'get-config {path}')}\nEND"
+                listing.update(parse_config_listing(block))
+        return listing
+
+    def trigger_capture(self):
+        self._files.clear()
+        self.execute("trigger-capture", timeout=CAPTURE_TIMEOUT)
+
+    def wait_for_file(self, timeout=CAPTURE_TIMEOUT):
+        """Espera el evento FILE_ADDED de la cámara -> (folder, name)."""
+        try:
+            output = self.execute("wait-event FILEADDED", timeout=timeout)
+        except SessionError as e:
+            if not e.lost or not self.is_alive():
+                raise
+            # Timeout con el shell vivo: la cámara no generó el archivo. El
+            # shell sigue esperando el evento, así que se cierra (se reabre en
+            # la siguiente operación), pero no es una sesión perdida.
+            self.close()
+            raise SessionError(f"no FILE_ADDED event within {timeout:.0f}s")
+        match = FILE_ADDED_RE.search(output)
+        if not match:
+            raise SessionError(f"no FILE_ADDED event: {output.strip()}")
+        name, folder = match.group(1), match.group(2)
+        return folder, name
+
+    def wait_for_companion(self, timeout=COMPANION_TIMEOUT):
+        """
+        Como wait_for_file, para un archivo que puede no llegar (RAW+JPEG con
+        la cámara en un solo formato). Espera en ventanas cortas de
+        "wait-event Nms": si no llega, el shell sigue en su prompt y el
+        timeout es un error normal, no una sesión perdida.
+        """
+        timeout = _remaining(timeout)
+        deadline = time.monotonic() + timeout
+        while not self._files:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise SessionError(f"no FILE_ADDED event within {timeout:.0f}s")
+            window_ms = max(1, int(min(remaining, EVENT_WINDOW) * 1000))
+            output = self.execute(f"wait-event {window_ms}ms", timeout=DEFAULT_TIMEOUT + window_ms / 1000)
+            self._files.extend((m.group(2), m.group(1)) for m in FILE_ADDED_RE.finditer(output))
+        return self._files.popleft()
+
+    def get_file(self, folder, name, dest_path):
+        self.execute(f"cd {folder}")
+        self.execute(f"get {name}", timeout=CAPTURE_TIMEOUT)
+        shutil.move(os.path.join(self.workdir, name), dest_path)
+        return dest_path
+
+    def capture_preview(self):
+        """Un frame del visor (liveview) como bytes JPEG."""
+        output = self.execute("capture-preview")
+        saved = re.findall(r"Saving file as (.+)", output)
+        if not saved:
+            raise SessionError(f"capture-preview produced no file: {output.strip()}")
+        path = os.path.join(self.workdir, os.path.basename(saved[-1].strip()))
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        finally:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+# -----------------------------------------------------------------------------
+# Backend: libgphoto2 (python-gphoto2)
+# -----------------------------------------------------------------------------
+# Códigos de libgphoto2 que indican que el dispositivo ya no está disponible
+_LOST_CODES = set()
+if gp is not None:
+    _LOST_CODES = {
+        gp.GP_ERROR_IO, gp.GP_ERROR_IO_USB_FIND, gp.GP_ERROR_IO_USB_CLAIM,
+        gp.GP_ERROR_IO_READ, gp.GP_ERROR_IO_WRITE, gp.GP_ERROR_MODEL_NOT_FOUND,
+    }
+
+class _BindingsBackend:
+    """Usa libgphoto2 en proceso a través de python-gphoto2."""
+
+    name = "libgphoto2"
+
+    def __init__(self, port=None):
+        self.port = port
+        self.camera = None
+
+    def open(self):
+        try:
+            camera = gp.Camera()
+            if self.port:
+                port_info_list = gp.PortInfoList()
+                port_info_list.load()
+                camera.set_port_info(port_info_list[port_info_list.lookup_path(self.port)])
+            camera.init()
+        except gp.GPhoto2Error as e:
+            raise SessionError(str(e), lost=True)
+        self.camera = camera
+
+    def close(self):
+        camera, self.camera = self.camera, None
+        if camera:
+            try:
+                camera.exit()
+            except Exception:
+                pass
+
+    def is_alive(self):
+        return self.camera is not None
+
+    @staticmethod
+    def _find_widget(config, path):
+        widget = config
+        for name in [p for p in path.split("/") if p and p != "main"]:
+            widget = widget.get_child_by_name(name)
+        return widget
+
+    def _wrap(self, fn, *args):
+        try:
+            return fn(*args)
+        except gp.GPhoto2Error as e:
+            raise SessionError(str(e), lost=e.code in _LOST_CODES)
+
+    def get_config(self, path):
+        def _get():
+            widget = self._find_widget(self.camera.get_config(), path)
+            choices = []
+            if widget.get_type() in (gp.GP_WIDGET_RADIO, gp.GP_WIDGET_MENU):
+                choices = [widget.get_choice(i) for i in range(widget.count_choices())]
+            return str(widget.get_value()), choices
+        return self._wrap(_get)
+
+    def get_configs(self, paths):
+        def _get():
+            config = self.camera.get_config()
+            return {path: str(self._find_widget(config, path).get_value()) for path in paths}
+        return self._wrap(_get)
+
+    def set_config(self, values):
+        def _set():
+            # Todos los cambios se aplican en una única transacción
+            config = self.camera.get_config()
+            for path, value in values.items():
+                self._find_widget(config, path).set_value(value)
+            self.camera.set_config(config)
+        return self._wrap(_set)
+
+    def list_all_config(self):
+        type_names = {
+            gp.GP_WIDGET_TEXT: "TEXT", gp.GP_WIDGET_RANGE: "RANGE", gp.GP_WIDGET_TOGGLE: "TOGGLE",
+            gp.GP_WIDGET_RADIO: "RADIO", gp.GP_WIDGET_MENU: "MENU", gp.GP_WIDGET_BUTTON: "BUTTON",
+            gp.GP_WIDGET_DATE: "DATE",
+        }
+
+        def _walk(widget, prefix, listing):
+            for child in widget.get_children():
+                path = f"{prefix}/{child.get_name()}"
+                kind = child.get_type()
+                if kind in (gp.GP_WIDGET_WINDOW, gp.GP_WIDGET_SECTION):
+                    _walk(child, path, listing)
+                    continue
+                choices = []
+                if kind in (gp.GP_WIDGET_RADIO, gp.GP_WIDGET_MENU):
+                    choices = [child.get_choice(i) for i in range(child.count_choices())]
+                listing[path] = {
+                    "label": child.get_label(),
+                    "type": type_names.get(kind),
+                    "readonly": bool(child.get_readonly()),
+                    "current": str(child.get_value()),
+                    "choices": choices,
+                }
+            return listing
+
+        return self._wrap(lambda: _walk(self.camera.get_config(), "/main", {}))
+
+    def trigger_capture(self):
+        return self._wrap(self.camera.trigger_capture)
+
+    def wait_for_file(self, timeout=CAPTURE_TIMEOUT):
+        timeout = _remaining(timeout)
+
+        def _wait():
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                remaining_ms = max(1, int((deadline - time.monotonic()) * 1000))
+                event_type, data = self.camera.wait_for_event(min(remaining_ms, 1000))
+                if event_type == gp.GP_EVENT_FILE_ADDED:
+                    return data.folder, data.name
+            raise SessionError(f"no FILE_ADDED event within {timeout:.0f}s")
+        return self._wrap(_wait)
+
+    def wait_for_companion(self, timeout=COMPANION_TIMEOUT):
+        # Aquí un timeout ya es un error normal (no perdida la sesión)
+        return self.wait_for_file(timeout)
+
+    def get_file(self, folder, name, dest_path):
+        def _get():
+            self.camera.file_get(folder, name, gp.GP_FILE_TYPE_NORMAL).save(dest_path)
+            return dest_path
+        return self._wrap(_get)
+
+    def capture_preview(self):
+        def _preview():
+            return bytes(memoryview(self.camera.capture_preview().get_data_and_size()))
+        return self._wrap(_preview)
+
+
+# -----------------------------------------------------------------------------
+# Sesión con reconexión automática y medición de latencia
+# -----------------------------------------------------------------------------
+class CameraSession:
+    """
+    Sesión de larga vida con una cámara. Serializa los comandos, abre el
+    backend de forma perezosa, reconecta automáticamente si se pierde el
+    dispositivo y registra la latencia de cada comando.
+    """
+
+    def __init__(self, port=None):
+        self.port = port
+        self._backend = None
+        self._lock = threading.RLock()
+        self.latencies = {}   # op -> deque de segundos
+        self.last_latency = None
+        self.last_trigger = (None, None)
+        # Liveview multiplexado con los demás comandos (ver start_liveview)
+        self._liveview_thread = None
+        self._liveview_stop = threading.Event()   # uno nuevo por cada arranque
+        self._liveview_sink = None
+        self._waiting = 0     # comandos esperando turno mientras corre el liveview
+        self._waiting_lock = threading.Lock()
+
+    @property
+    def backend_name(self):
+        return self._backend.name if self._backend else None
+
+    def _make_backend(self):
+        if gp is not None:
+            return _BindingsBackend(self.port)
+        return _ShellBackend(self.port)
+
+    def _ensure_open(self):
+        if self._backend and self._backend.is_alive():
+            return
+        self._backend = self._make_backend()
+        t0 = time.monotonic()
+        self._backend.open()
+        print(f"[Zeta Motion] Camera session opened ({self._backend.name}, port={self.port}) "
+              f"in {(time.monotonic() - t0) * 1000:.0f} ms.")
+
+    def close(self):
+        """Libera el dispositivo. La siguiente llamada lo vuelve a abrir."""
+        with self._lock:
+            if self._backend:
+                self._backend.close()
+                self._backend = None
+
+    def _record_latency(self, op, seconds):
+        self.last_latency = seconds
+        self.latencies.setdefault(op, deque(maxlen=LATENCY_HISTORY)).append(seconds)
+        zm_stats.record(f"camera:{self.port or 'auto'}", op, seconds)
+        if op not in QUIET_OPS:
+            print(f"[zm_session:{self.port or 'auto'}] {op} {seconds * 1000:.0f} ms")
+
+    @contextmanager
+    def _acquire_priority(self):
+        """
+        Toma el bloqueo de la sesión. Fuera del hilo del liveview se anota en
+        _waiting mientras espera: el bombeo de frames cede el turno a
+        capturas y ajustes en vez de volver a tomarlo entre frames.
+        """
+        pump = threading.current_thread() is self._liveview_thread
+        if not pump:
+            with self._waiting_lock:
+                self._waiting += 1
+        try:
+            wait = _remaining()
+            acquired = self._lock.acquire(timeout=-1 if wait is None else wait)
+        finally:
+            if not pump:
+                with self._waiting_lock:
+                    self._waiting -= 1
+        if not acquired:
+            raise SessionError("task deadline expired waiting for the camera session")
+        try:
+            yield
+        finally:
+            self._lock.release()
+
+    def call(self, op, *args, **kwargs):
+        """Ejecuta una operación del backend con reconexión automática."""
+        with self._acquire_priority():
+            return self._call_locked(op, *args, **kwargs)
+
+    def _call_locked(self, op, *args, **kwargs):
+        backoff = RECONNECT_BACKOFF
+        for attempt in range(RECONNECT_ATTEMPTS + 1):
+            try:
+                _check_deadline()
+                self._ensure_open()
+                t0 = time.monotonic()
+                result = getattr(self._backend, op)(*args, **kwargs)
+                self._record_latency(op, time.monotonic() - t0)
+                return result
+            except SessionError as e:
+                if not e.lost:
+                    # Error de la cámara (valor inválido, etc.): no reconectar
+                    zm_stats.count("failed", f"camera:{self.port or 'auto'}")
+                    raise
+                self.close()
+                if op in NO_RETRY_OPS:
+                    # La sesión se reabre en la siguiente llamada, sin repetir esta
+                    print(f"[Zeta Motion] Camera session lost during {op} ({e}).")
+                    raise
+                if attempt == RECONNECT_ATTEMPTS or _remaining(backoff) < backoff:
+                    print(f"[Zeta Motion] Camera session lost ({e}).")
+                    raise
+                zm_stats.count("reconnect", f"camera:{self.port or 'auto'}")
+                print(f"[Zeta Motion] Camera session lost ({e}). "
+                      f"Reconnecting ({attempt + 1}/{RECONNECT_ATTEMPTS})...")
+                time.sleep(backoff)
+                backoff *= 2
+
+    # --- Liveview ---
+    @property
+    def liveview_active(self):
+        return self._liveview_thread is not None and self._liveview_thread.is_alive()
+
+    def start_liveview(self, sink):
+        """
+        Empieza a bombear frames del visor (bytes JPEG) hacia sink(frame) desde
+        un hilo propio. La sesión sigue siendo la única dueña del dispositivo:
+        las capturas y ajustes se intercalan entre frames, la cámara sale del
+        modo visor solo durante la exposición y el liveview continúa solo.
+        """
+        self._liveview_sink = sink
+        if self.liveview_active and not self._liveview_stop.is_set():
+            return
+        # Evento propio de cada arranque: un bombeo anterior que aún no haya
+        # salido conserva su evento activado y no puede reanudarse
+        stop = self._liveview_stop = threading.Event()
+        self._liveview_thread = threading.Thread(target=self._liveview_loop, args=(stop,), daemon=True,
+                                                 name=f"zm_liveview:{self.port}")
+        self._liveview_thread.start()
+
+    def stop_liveview(self):
+        """
+        Para el bombeo sin bloquear al llamante con la cámara: el propio hilo
+        del liveview saca a la cámara del modo visor al salir.
+        """
+        thread = self._liveview_thread
+        if thread is None:
+            return
+        self._liveview_stop.set()
+        self._liveview_sink = None
+        self._liveview_thread = None
+        if thread is not threading.current_thread():
+            thread.join(timeout=2)
+
+    def _liveview_loop(self, stop):
+        min_interval = 1.0 / LIVEVIEW_MAX_FPS
+        while not stop.is_set():
+            # Ceder el turno a capturas / ajustes pendientes
+            while self._waiting and not stop.is_set():
+                time.sleep(0.002)
+            if stop.is_set():
+                break
+            t0 = time.monotonic()
+            try:
+                frame = self.call("capture_preview")
+            except SessionError as e:
+                print(f"[Zeta Motion] Liveview frame failed: {e}")
+                stop.wait(0.5)
+                continue
+            sink = self._liveview_sink
+            if sink is None or stop.is_set():
+                break
+            try:
+                sink(frame)
+            except Exception as e:
+                # El consumidor se cerró (p. ej. ventana de ffplay): parar el bombeo
+                print(f"[Zeta Motion] Liveview consumer closed: {e}")
+                stop.set()
+                break
+            elapsed = time.monotonic() - t0
+            if elapsed < min_interval:
+                stop.wait(min_interval - elapsed)
+        self._exit_viewfinder()
+
+    def _exit_viewfinder(self):
+        """Fin del bombeo: viewfinder=0, salvo que ya haya arrancado otro liveview."""
+        with self._acquire_priority():
+            if self.liveview_active and self._liveview_thread is not threading.current_thread():
+                return
+            try:
+                self._call_locked("set_config", {"viewfinder": "0"})
+            except SessionError:
+                pass
+
+    def latency_summary(self):
+        """Devuelve {op: {"count", "last_ms", "avg_ms"}}."""
+        with self._lock:
+            return {
+                op: {
+                    "count": len(samples),
+                    "last_ms": samples[-1] * 1000,
+                    "avg_ms": sum(samples) / len(samples) * 1000,
+                }
+                for op, samples in self.latencies.items() if samples
+            }
+
+    # --- Atajos ---
+    def get_config(self, path):
+        return self.call("get_config", path)
+
+    def get_configs(self, paths):
+        return self.call("get_configs", paths)
+
+    def set_config(self, values):
+        return self.call("set_config", values)
+
+    def list_all_config(self):
+        return self.call("list_all_config")
+
+    def capture(self, dest_path, timeout=CAPTURE_TIMEOUT, barrier=None, companions=0):
+        """
+        Dispara y descarga exactamente el archivo que la cámara reporta con su
+        evento FILE_ADDED, en cuanto existe (sin esperas fijas ni adivinar
+        "el último archivo"). La extensión de dest_path se sustituye por la del
+        archivo de la cámara (.jpg, .cr2, .nef...). `companions` es el número
+        de archivos extra de la misma toma (1 en RAW+JPEG).
+        Devuelve la lista de rutas descargadas.
+
+        Con `barrier` (threading.Barrier compartida por varias sesiones) el
+        disparo espera a que todas las cámaras estén listas. self.last_trigger
+        guarda (inicio, fin) del disparo en time.monotonic().
+        """
+        with self._acquire_priority():
+            if barrier is not None:
+                # Disparo sincronizado (rig): abrir antes de esperar a las demás cámaras
+                try:
+                    self._ensure_open()
+                except Exception:
+                    barrier.abort()
+                    raise
+                barrier.wait(_remaining(BARRIER_TIMEOUT))
+            t0 = time.monotonic()
+            self.last_trigger = (t0, None)
+            self.call("trigger_capture")
+            self.last_trigger = (t0, time.monotonic())
+            root = os.path.splitext(dest_path)[0]
+            paths = []
+            for i in range(1 + companions):
+                try:
+                    if i == 0:
+                        folder, name = self.call("wait_for_file", timeout)
+                    else:
+                        folder, name = self.call("wait_for_companion", COMPANION_TIMEOUT)
+                except SessionError:
+                    if not paths:
+                        raise
+                    print(f"[Zeta Motion] Expected {companions + 1} files per capture, got {len(paths)}.")
+                    break
+                path = root + os.path.splitext(name)[1].lower()
+                self.call("get_file", folder, name, path)
+                paths.append(path)
+            self._record_latency("capture", time.monotonic() - t0)
+            return paths
+
+    def get_file(self, folder, name, dest_path):
+        return self.call("get_file", folder, name, dest_path)
+
+    def capture_preview(self):
+        return self.call("capture_preview")
+
+
+def auto_detect():
+    """Devuelve [{"model", "port"}] con las cámaras conectadas."""
+    if gp is not None:
+        try:
+            return [{"model": model, "port": port} for model, port in gp.Camera.autodetect()]
+        except gp.GPhoto2Error as e:
+            raise SessionError(str(e))
+
+    # --auto-detect no existe en el shell: es la única consulta que sigue
+    # lanzando un proceso (no abre el dispositivo, solo enumera el bus).
+    result = subprocess.run(["gphoto2", "--auto-detect"], capture_output=True, text=True, timeout=3)
+    cams = []
+    for line in result.stdout.strip().splitlines()[2:]:
+        parts = line.strip().rsplit(None, 1)
+        if len(parts) == 2:
+            cams.append({"model": parts[0].strip(), "port": parts[1].strip()})
+    return cams
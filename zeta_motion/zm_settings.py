@@ -3,9 +3,14 @@
 # Camera settings intelligence: querying, parsing, and constants.
 
 import bpy
-from . import zm_worker, state
+import glob
+import json
+import os
+import re
+import time
+from . import zm_worker, zm_session, state
 
-# --- CORREGIDO: Diccionario de rutas directas para la Canon EOS 4000D ---
+# --- Rutas por defecto (Canon EOS 4000D), usadas si la cámara no reporta otras ---
 PARAM_PATHS = {
     "iso": "/main/imgsettings/iso",
     "aperture": "/main/capturesettings/aperture",
@@ -13,6 +18,27 @@ PARAM_PATHS = {
     "imageformat": "/main/imgsettings/imageformat",
 }
 
+# Nombres de widget que gphoto2 usa para cada parámetro según el fabricante,
+# en orden de preferencia (Canon, Nikon, Sony, Fuji...).
+PARAM_WIDGET_NAMES = {
+    "iso": ("iso", "isospeed"),
+    "aperture": ("aperture", "f-number", "fnumber"),
+    "shutterspeed": ("shutterspeed", "shutterspeed2"),
+    "imageformat": ("imageformat", "imagequality"),
+}
+MODEL_WIDGET_NAMES = ("cameramodel", "model")
+FIRMWARE_WIDGET_NAMES = ("deviceversion", "firmwareversion")
+
+CAPABILITY_CACHE_VERSION = 1
+
+# Propiedad de escena que refleja cada parámetro en la UI
+SCENE_PROPS = {
+    "iso": "zm_iso_setting",
+    "aperture": "zm_aperture_setting",
+    "shutterspeed": "zm_shutterspeed_setting",
+    "imageformat": "zm_imageformat_setting",
+}
+
 # --- Mapa de correspondencia para resoluciones (sin cambios) ---
 RESOLUTION_MAP = {
     "Large Fine": {"label": "4K+ JPEG", "width": 6000, "height": 4000},
@@ -23,6 +49,17 @@ RESOLUTION_MAP = {
     "RAW": {"label": "RAW", "width": 6000, "height": 4000},
 }
 
+# Formatos de imagen que incluyen RAW (Canon "RAW + Large Fine JPEG", Nikon "NEF+Fine"...)
+RAW_FORMAT_TOKENS = ("RAW", "NEF", "ARW", "CR2", "CR3", "DNG", "ORF", "RAF", "PEF", "RW2")
+
+def is_raw_format(gphoto_format_name):
+    name = (gphoto_format_name or "").upper()
+    return any(token in name for token in RAW_FORMAT_TOKENS)
+
+def is_raw_plus_jpeg(gphoto_format_name):
+    """True si cada disparo entrega dos archivos (RAW y JPEG)."""
+    return is_raw_format(gphoto_format_name) and "+" in gphoto_format_name
+
 def get_resolution_data(gphoto_format_name):
     for key in sorted(RESOLUTION_MAP.keys(), key=len, reverse=True):
         if key in gphoto_format_name:
@@ -30,38 +67,213 @@ def get_resolution_data(gphoto_format_name):
     return None
 
 def parse_gphoto_output(output):
-    current_value = None; choices = []
-    if output is None: return None, []
-    for line in output.splitlines():
-        if line.startswith("Current:"): current_value = line.split(":", 1)[1].strip()
-        elif line.startswith("Choice:"):
-            parts = line.split(maxsplit=2)
-            if len(parts) == 3: choices.append(parts[2])
-    return current_value, choices
+    return zm_session.parse_config_output(output)
+
+def get_param_path(param_name):
+    """Ruta de configuración descubierta para el parámetro (o la ruta por defecto)."""
+    return state.control_state["camera"]["settings"]["paths"].get(param_name) or PARAM_PATHS.get(param_name)
+
+# -----------------------------------------------------------------------------
+# Escritura de ajustes (coalescente, ver zm_worker.SettingsWriter)
+# -----------------------------------------------------------------------------
+def request_setting(param_name, value):
+    """Registra el valor deseado y lo entrega al escritor de ajustes."""
+    if value in (None, "NONE"):
+        return
+    with state.state_lock:
+        settings = state.control_state["camera"]["settings"]
+        settings["desired"][param_name] = value
+        in_sync = settings["current"].get(param_name) == value
+    if in_sync and param_name not in zm_worker.settings_writer.pending():
+        return
+    path = get_param_path(param_name)
+    if not path:
+        print(f"⚠️ [Zeta Motion Settings] No hay una ruta definida para '{param_name}'.")
+        return
+    zm_worker.settings_writer.submit(param_name, path, value)
+
+def _sync_scene_properties(confirmed):
+    """Refleja en la escena los valores que la cámara confirmó."""
+    scene = getattr(bpy.context, "scene", None)
+    if not scene:
+        return
+    for param, value in confirmed.items():
+        prop = SCENE_PROPS.get(param)
+        if not prop or value is None or not hasattr(scene, prop):
+            continue
+        if getattr(scene, prop) == value:
+            continue
+        with state.state_lock:
+            pending_newer = state.control_state["camera"]["settings"]["desired"].get(param) != value
+        if pending_newer:
+            continue
+        try:
+            setattr(scene, prop, value)
+        except TypeError:
+            # Valor fuera de las opciones conocidas del enum
+            pass
+
+zm_worker.settings_writer.on_confirmed = _sync_scene_properties
+
+# -----------------------------------------------------------------------------
+# Descubrimiento de ajustes en una sola lectura (list-all-config)
+# -----------------------------------------------------------------------------
+def _find_entry(listing, widget_names, need_choices=False):
+    """Busca en el listado la primera ruta cuyo nombre final coincida."""
+    for name in widget_names:
+        for path, entry in listing.items():
+            if path.rsplit("/", 1)[-1] == name and (entry["choices"] or not need_choices):
+                return path, entry
+    return None, None
+
+def discover_settings(listing):
+    """
+    Convierte el listado completo de configuración en la estructura de
+    control_state["camera"]["settings"]. Devuelve un dict con
+    "paths", "choices", "current", "model" y "firmware".
+    """
+    result = {"paths": {}, "choices": {}, "current": {}, "model": None, "firmware": None}
+    for param, names in PARAM_WIDGET_NAMES.items():
+        path, entry = _find_entry(listing, names, need_choices=True)
+        if path:
+            result["paths"][param] = path
+            result["choices"][param] = list(entry["choices"])
+            result["current"][param] = entry["current"]
+    _, model_entry = _find_entry(listing, MODEL_WIDGET_NAMES)
+    _, firmware_entry = _find_entry(listing, FIRMWARE_WIDGET_NAMES)
+    result["model"] = model_entry["current"] if model_entry else None
+    result["firmware"] = firmware_entry["current"] if firmware_entry else None
+    return result
+
+# -----------------------------------------------------------------------------
+# Caché en disco de capacidades por modelo y firmware
+# -----------------------------------------------------------------------------
+def _capabilities_dir():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "zeta_motion", "capabilities")
+
+def _safe_name(text):
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", text or "unknown").strip("_")
+
+def _capabilities_path(model, firmware):
+    return os.path.join(_capabilities_dir(), f"{_safe_name(model)}__{_safe_name(firmware)}.json")
+
+def load_capabilities(model):
+    """Devuelve las capacidades cacheadas más recientes para el modelo, o None."""
+    candidates = glob.glob(os.path.join(_capabilities_dir(), f"{_safe_name(model)}__*.json"))
+    for path in sorted(candidates, key=os.path.getmtime, reverse=True):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == CAPABILITY_CACHE_VERSION:
+                return data
+        except (OSError, ValueError) as e:
+            print(f"⚠️ [Zeta Motion Settings] Caché ilegible {path}: {e}")
+    return None
+
+def save_capabilities(model, firmware, paths, choices):
+    """Guarda las rutas y opciones de la cámara en disco (escritura atómica)."""
+    path = _capabilities_path(model, firmware)
+    data = {
+        "version": CAPABILITY_CACHE_VERSION,
+        "model": model,
+        "firmware": firmware,
+        "paths": paths,
+        "choices": choices,
+        "saved": time.time(),
+    }
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"⚠️ [Zeta Motion Settings] No se pudo guardar la caché de capacidades: {e}")
+
+def apply_cached_capabilities(model):
+    """Rellena las opciones de los enums desde la caché, sin tocar la cámara."""
+    data = load_capabilities(model)
+    if not data:
+        return False
+    with state.state_lock:
+        settings = state.control_state["camera"]["settings"]
+        settings["paths"].update(data.get("paths", {}))
+        for param, choices in data.get("choices", {}).items():
+            if param in settings["choices"]:
+                settings["choices"][param] = list(choices)
+        settings["model"] = data.get("model")
+        settings["firmware"] = data.get("firmware")
+    print(f"[Zeta Motion Settings] Capacidades cargadas desde caché ({data.get('model')} / {data.get('firmware')}).")
+    return True
+
+def query_all_settings(model, on_done=None):
+    """
+    Lee toda la configuración de la cámara con una sola llamada, actualiza
+    control_state y la caché en disco. on_done(ok) se llama en el hilo principal.
+    """
+    def _task():
+        try:
+            return discover_settings(zm_worker.get_session().list_all_config())
+        except zm_session.SessionError as e:
+            print(f"⚠️ [Zeta Motion Settings] Error leyendo la configuración: {e}")
+            return None
+
+    def _on_result(result):
+        if not result or not result["paths"]:
+            print("⚠️ [Zeta Motion Settings] La cámara no devolvió ajustes reconocibles.")
+            if on_done:
+                on_done(False)
+            return
+        cam_model = result["model"] or model
+        pending = zm_worker.settings_writer.pending()
+        with state.state_lock:
+            settings = state.control_state["camera"]["settings"]
+            settings["paths"].update(result["paths"])
+            settings["model"] = cam_model
+            settings["firmware"] = result["firmware"]
+            for param in settings["choices"]:
+                if param in result["choices"]:
+                    settings["choices"][param] = result["choices"][param]
+                    settings["current"][param] = result["current"][param]
+                    # Un valor aún en cola es más nuevo que lo leído: la UI lo conserva
+                    if param not in pending:
+                        settings["desired"][param] = result["current"][param]
+        # La caché se indexa por el modelo con el que se detectó la cámara
+        save_capabilities(model, result["firmware"], result["paths"], result["choices"])
+        print(f"[Zeta Motion Settings] Ajustes leídos: {', '.join(result['paths'])}.")
+        if on_done:
+            on_done(True)
+
+    zm_worker.enqueue(_task, tag="settings_read", callback=_on_result, dedupe_key="settings_read_all")
 
 def get_gphoto_config(param_name, on_result_callback):
     """
-    CORREGIDO: Ya no prueba múltiples rutas. Va directamente a la ruta correcta
-    y encola una única solicitud de lectura en el worker.
+    Va directamente a la ruta correcta y encola una única lectura en la
+    sesión persistente de la cámara (zm_worker).
     """
-    path = PARAM_PATHS.get(param_name)
+    path = get_param_path(param_name)
     if not path:
         print(f"⚠️ [Zeta Motion Settings] No hay una ruta definida para '{param_name}'.")
         on_result_callback(param_name, None, [])
         return
 
-    command = f"gphoto2 --get-config '{path}'"
-    
-    def worker_callback(stdout, stderr):
-        if stdout:
-            current, choices = parse_gphoto_output(stdout)
-            if choices:
-                on_result_callback(param_name, current, choices)
-                return
-        
+    def _task():
+        try:
+            return zm_worker.get_session().get_config(path)
+        except zm_session.SessionError as e:
+            print(f"⚠️ [Zeta Motion Settings] Error leyendo '{param_name}': {e}")
+            return None, []
+
+    def worker_callback(result):
+        current, choices = result
+        if choices:
+            on_result_callback(param_name, current, choices)
+            return
+
         # Si falló o no devolvió opciones
         print(f"⚠️ [Zeta Motion Settings] La consulta para '{param_name}' falló o no devolvió opciones.")
         on_result_callback(param_name, None, [])
 
     # Encolamos la única consulta necesaria en el worker
-    zm_worker.enqueue_command(command, retries=1, callback=worker_callback)
\ No newline at end of file
+    zm_worker.enqueue(_task, tag="settings_read", callback=worker_callback, dedupe_key=f"settings_read:{param_name}")
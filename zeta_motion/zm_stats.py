@@ -0,0 +1,160 @@
+# zm_stats.py — Zeta Motion
+# Blender 4.5+ | Linux-only
+# Instrumentación del worker y de la cámara: histogramas móviles de latencia
+# por tag y etapa (cola, ejecución, despacho al hilo principal), contadores
+# de fallos y profundidad de cola. Thread-safe.
+
+import bpy
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# Muestras que conserva cada histograma móvil
+WINDOW = 200
+
+_lock = threading.Lock()
+_histograms = {}   # (tag, stage) -> deque de segundos
+_counters = {}     # (name, tag) -> int
+_gauges = {}       # name -> {"value", "max"}
+_started = time.time()
+
+
+def record(tag, stage, seconds):
+    """Añade una muestra (en segundos) al histograma tag/etapa."""
+    with _lock:
+        samples = _histograms.get((tag, stage))
+        if samples is None:
+            samples = _histograms[(tag, stage)] = deque(maxlen=WINDOW)
+        samples.append(seconds)
+
+
+def count(name, tag="all", amount=1):
+    """Incrementa un contador (p. ej. 'failed', 'timeout', 'cancelled')."""
+    with _lock:
+        _counters[(name, tag)] = _counters.get((name, tag), 0) + amount
+
+
+def gauge(name, value):
+    """Registra el valor actual de una magnitud (y su máximo)."""
+    with _lock:
+        g = _gauges.setdefault(name, {"value": 0, "max": 0})
+        g["value"] = value
+        g["max"] = max(g["max"], value)
+
+
+def _percentile(sorted_samples, pct):
+    if not sorted_samples:
+        return 0.0
+    idx = min(len(sorted_samples) - 1, int(round(pct / 100.0 * (len(sorted_samples) - 1))))
+    return sorted_samples[idx]
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "p50_ms": _percentile(ordered, 50) * 1000,
+        "p95_ms": _percentile(ordered, 95) * 1000,
+        "max_ms": (ordered[-1] if ordered else 0.0) * 1000,
+    }
+
+
+def snapshot():
+    """
+    Devuelve un dict serializable:
+    {"uptime_s", "latency": {tag: {stage: {count, p50_ms, p95_ms, max_ms}}},
+     "counters": {name: {tag: n}}, "gauges": {name: {value, max}}}
+    """
+    with _lock:
+        hist = {key: list(samples) for key, samples in _histograms.items()}
+        counters = dict(_counters)
+        gauges = {name: dict(g) for name, g in _gauges.items()}
+
+    latency = {}
+    for (tag, stage), samples in sorted(hist.items()):
+        latency.setdefault(tag, {})[stage] = summarize(samples)
+    counter_tree = {}
+    for (name, tag), n in sorted(counters.items()):
+        counter_tree.setdefault(name, {})[tag] = n
+    return {
+        "uptime_s": time.time() - _started,
+        "latency": latency,
+        "counters": counter_tree,
+        "gauges": gauges,
+    }
+
+
+def reset():
+    global _started
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+        _gauges.clear()
+        _started = time.time()
+
+
+def dump_json(path):
+    """Escribe snapshot() en `path` como JSON. Devuelve la ruta escrita."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(snapshot(), f, indent=2)
+    return path
+
+
+# ----------------------------------------------------------------
+# OPERADORES
+# ----------------------------------------------------------------
+class ZM_OT_DumpStats(bpy.types.Operator):
+    bl_idname = "zm.dump_stats"
+    bl_label = "Dump Stats (JSON)"
+    bl_description = "Write worker and camera latency statistics to a JSON file"
+
+    filepath: bpy.props.StringProperty(subtype='FILE_PATH')
+
+    def invoke(self, context, event):
+        if not self.filepath:
+            self.filepath = bpy.path.abspath("//zeta_motion_stats.json") if bpy.data.filepath else \
+                os.path.join(os.path.expanduser("~"), "zeta_motion_stats.json")
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        try:
+            path = dump_json(bpy.path.abspath(self.filepath))
+        except OSError as e:
+            self.report({'ERROR'}, f"Could not write stats: {e}")
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"Stats written to {path}")
+        return {'FINISHED'}
+
+
+class ZM_OT_ResetStats(bpy.types.Operator):
+    bl_idname = "zm.reset_stats"
+    bl_label = "Reset Stats"
+
+    def execute(self, context):
+        reset()
+        return {'FINISHED'}
+
+
+classes = (
+    ZM_OT_DumpStats,
+    ZM_OT_ResetStats,
+)
+
+def register():
+    bpy.types.Scene.zm_show_stats = bpy.props.BoolProperty(name="Show Stats", default=False)
+    for cls in classes:
+        bpy.utils.register_class(cls)
+    print("[Zeta Motion] zm_stats registered.")
+
+def unregister():
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
+    if hasattr(bpy.types.Scene, "zm_show_stats"):
+        try:
+            delattr(bpy.types.Scene, "zm_show_stats")
+        except Exception:
+            pass
+    print("[Zeta Motion] zm_stats unregistered.")
@@ -1,39 +1,201 @@
 # zm_stream.py
 # -----------------------------------------------
 # Zeta Motion - Stream management module
-# Controla los procesos Live View y VSE Preview
-# usando gphoto2 + ffmpeg/ffplay
+# Controla el Live View (ffplay), Live Blend y el VSE Preview en memoria.
+# La cámara alimenta un único bus de frames (zm_framebus);
+# ffplay / ffmpeg / VSE se suscriben como consumidores.
 # -----------------------------------------------
 
 import bpy
 import subprocess
 import os
 import signal
-from . import state, zm_camera
+import threading
+import time
+from . import state, zm_camera, zm_worker, zm_framebus, zm_convert, zm_vse_live, zm_live_blend
 
-# Procesos activos en runtime (gphoto2 + ffplay/ffmpeg corren en el mismo pgid)
+# Procesos de salida (ffplay / ffmpeg) alimentados por el bus de frames
 stream_processes = {
     "live_view": None,
     "vse_preview": None,
     "live_blend": None,
 }
 
+# Bus único del liveview: una fuente de cámara, varios consumidores
+bus = zm_framebus.FrameBus()
+_feed = {"source": None, "port": None, "kind": None, "paused": False, "started_at": None}
+# El watchdog reinicia la fuente desde su hilo: serializar con la UI
+_feed_lock = threading.RLock()
+
+SOURCE_ITEMS = [
+    ('SESSION', "Camera Session", "Viewfinder frames pulled by the camera session. Captures do not interrupt the stream"),
+    ('MOVIE', "Capture Movie", "A single gphoto2 --capture-movie stream. Higher frame rate, paused while capturing"),
+]
+
+# Nombre del consumidor -> valor de state["stream"]["method"]
+_METHODS = {"live_view": "ffplay", "vse_preview": "vse", "live_blend": "live_blend"}
+_active_outputs = []   # salidas arrancadas, en orden
+
 # ----------------------------------------------------------------
-# FUNCIONES DE CONTROL DE STREAM
+# FUENTE DEL BUS
 # ----------------------------------------------------------------
+def ensure_feed(context, cam=None):
+    """Arranca la fuente del bus si no corre ya para esta cámara. Devuelve True si hay fuente."""
+    cam = cam or zm_camera.get_active_camera()
+    if not cam:
+        print("[Zeta Motion] No active camera for stream.")
+        return False
+    kind = getattr(context.scene, "zm_stream_source", 'SESSION')
+    with _feed_lock:
+        source = _feed["source"]
+        if source and source.is_alive() and _feed["port"] == cam["port"] and _feed["kind"] == kind:
+            return True
 
-def stop_all_streams():
-    """Detiene todos los procesos activos de stream (ffplay, ffmpeg, gphoto2)."""
-    for key, proc in stream_processes.items():
-        if proc and proc.poll() is None:
+        stop_feed()
+        if kind == 'MOVIE':
+            source = zm_framebus.MovieSource(cam["port"], bus)
+        else:
+            source = zm_framebus.SessionSource(zm_worker.get_session(cam["port"]), bus)
+        try:
+            _start_source(source)
+        except Exception as e:
+            print(f"[Zeta Motion] Error starting camera stream: {e}")
+            return False
+        _feed.update(source=source, port=cam["port"], kind=kind, paused=False)
+    state.control_state["stream"]["source"] = source.name
+    print(f"[Zeta Motion] Camera stream started ({source.name}, {cam['port']}).")
+    return True
+
+def _start_source(source):
+    if source.exclusive:
+        # El proceso --capture-movie necesita el dispositivo para él solo
+        zm_worker.release_sessions()
+    source.start()
+    _feed["started_at"] = time.monotonic()
+
+def stop_feed():
+    with _feed_lock:
+        source = _feed["source"]
+        _feed.update(source=None, port=None, kind=None, paused=False, started_at=None)
+        if source:
+            source.stop()
+        bus.clear()
+    state.control_state["stream"]["source"] = "none"
+
+def restart_feed():
+    """Reinicia la fuente actual (la usa el watchdog). Devuelve True si arrancó."""
+    with _feed_lock:
+        source = _feed["source"]
+        if not source or _feed["paused"]:
+            return False
+        source.stop()
+        try:
+            _start_source(source)
+        except Exception as e:
+            print(f"[Zeta Motion] Error restarting camera stream: {e}")
+            return False
+    return True
+
+def feed_info():
+    """Instantánea de la fuente: {"source", "alive", "paused", "started_at"} (o None)."""
+    with _feed_lock:
+        source = _feed["source"]
+        if source is None:
+            return None
+        return {
+            "source": source.name,
+            "alive": source.is_alive(),
+            "paused": _feed["paused"],
+            "started_at": _feed["started_at"],
+        }
+
+def pause_feed():
+    """
+    Para la fuente si ocupa el dispositivo (capture-movie) dejando suscritos
+    a los consumidores. Devuelve True si hubo que pausar.
+    """
+    with _feed_lock:
+        source = _feed["source"]
+        if not source or not source.exclusive:
+            return False
+        print(f"[Zeta Motion] Pausing '{source.name}' camera stream for capture...")
+        _feed["paused"] = True
+        source.stop()
+    return True
+
+def resume_feed():
+    with _feed_lock:
+        source = _feed["source"]
+        _feed["paused"] = False
+        if source and not source.is_alive():
             try:
-                # Matar grupo de procesos para incluir gphoto2 y ffplay/ffmpeg
-                os.killpg(os.getpgid(proc.pid), signal.SIGTERM)
-                print(f"[Zeta Motion] {key} stream detenido.")
+                _start_source(source)
+                print(f"[Zeta Motion] '{source.name}' camera stream resumed.")
             except Exception as e:
-                print(f"[Zeta Motion] Error deteniendo {key}: {e}")
-        stream_processes[key] = None
+                print(f"[Zeta Motion] Error resuming camera stream: {e}")
+
+# ----------------------------------------------------------------
+# CONSUMIDORES
+# ----------------------------------------------------------------
+def _pipe_writer(proc):
+    """Consumidor que escribe cada frame JPEG en el stdin de `proc`."""
+    def _write(frame):
+        proc.stdin.write(frame.data)
+        proc.stdin.flush()
+    return _write
+
+def _update_method():
+    active = _active_outputs
+    state.control_state["stream"]["method"] = _METHODS[active[-1]] if active else "none"
+
+def _mark_output(key):
+    if key in _active_outputs:
+        _active_outputs.remove(key)
+    _active_outputs.append(key)
+    _update_method()
+
+def active_outputs():
+    return list(_active_outputs)
+
+def _start_output(key, callback, proc=None):
+    stream_processes[key] = proc
+    bus.subscribe(key, callback)
+    _mark_output(key)
+
+def stop_output(key, keep_feed=False):
+    """Quita un consumidor del bus (y su proceso). Sin consumidores se para la cámara."""
+    if key == zm_vse_live.CONSUMER_NAME:
+        zm_vse_live.stop(bus)
+    elif key == zm_live_blend.CONSUMER_NAME:
+        zm_live_blend.stop(bus)
+    bus.unsubscribe(key)
+    if key in _active_outputs:
+        _active_outputs.remove(key)
+    proc = stream_processes.get(key)
+    stream_processes[key] = None
+    if proc and proc.poll() is None:
+        try:
+            os.killpg(os.getpgid(proc.pid), signal.SIGTERM)
+            print(f"[Zeta Motion] {key} stream detenido.")
+        except Exception as e:
+            print(f"[Zeta Motion] Error deteniendo {key}: {e}")
+    if not keep_feed and not bus.consumers():
+        stop_feed()
+    _update_method()
 
+# ----------------------------------------------------------------
+# FUNCIONES DE CONTROL DE STREAM
+# ----------------------------------------------------------------
+
+def stop_all_streams():
+    """Detiene todos los consumidores del bus, sus procesos y la fuente de cámara."""
+    from . import zm_record
+    zm_record.stop_recording()
+    for key in stream_processes:
+        stop_output(key, keep_feed=True)
+    bus.unsubscribe_all()
+    stop_feed()
+    zm_live_blend.stop_tracking()
     state.control_state["stream"]["method"] = "none"
     print("[Zeta Motion] All streams stopped.")
 
@@ -43,94 +205,58 @@ def stop_all_streams():
 def start_live_stream(context, image_path=None, blend_factor=0.5):
     """
     Inicia el stream de la cámara.
-    - Si image_path es None, inicia el Live View estándar.
-    - Si image_path se proporciona, inicia el modo Live Blend.
+    - Sin Live Blend, inicia el Live View estándar.
+    - Con scene.zm_live_blend_enabled (o un image_path inicial), inicia el
+      modo Live Blend: la referencia sigue al playhead del VSE.
+    Cambiar de modo no reinicia la cámara: solo cambia el consumidor del bus.
     """
-    stop_all_streams()
-
-    cam = zm_camera.get_active_camera()
-    if not cam:
-        print("[Zeta Motion] No active camera for stream.")
+    if not ensure_feed(context):
         return
 
+    scene = context.scene
     # Lógica para modo Blend
-    if image_path and os.path.exists(image_path):
-        print(f"[Zeta Motion] Live Blend started (Overlaying: {os.path.basename(image_path)}).")
-        stream_key = "live_blend"
-        state.control_state["stream"]["method"] = "live_blend"
-        
-        cmd_str_core = (
-            f"gphoto2 --set-config viewfinder=1 --capture-movie --stdout | "
-            f"ffmpeg -f mjpeg -i - -loop 1 -i '{image_path}' "
-            f"-filter_complex \"[1:v]format=yuv420p[bg];[0:v]format=yuv420p[cam];[bg][cam]scale2ref[bg_scaled][cam_ref];[cam_ref][bg_scaled]blend=all_mode=overlay:all_opacity={blend_factor}\" "
-            f"-f mjpeg - | ffplay -window_title 'Zeta Live Blend' -"
-        )
-    # Lógica para modo Normal (fallback)
-    else:
-        print("[Zeta Motion] Live View started (ffplay window).")
-        stream_key = "live_view"
-        state.control_state["stream"]["method"] = "ffplay"
-        cmd_str_core = "gphoto2 --set-config viewfinder=1 --capture-movie --stdout | ffplay -window_title 'Zeta Live View' -f mjpeg -"
-
-    # Ejecución del comando
-    cmd = ["bash", "-c", "set -m; exec " + cmd_str_core]
+    if image_path or scene.zm_live_blend_enabled:
+        if image_path:
+            zm_live_blend.set_reference(image_path)
+        stop_output("live_view", keep_feed=True)
+        scale = zm_convert.SCALE_MAP.get(scene.zm_proxy_scale, 0.5)
+        zm_live_blend.start(bus, scene, scale=scale)
+        _mark_output("live_blend")
+        print(f"[Zeta Motion] Live Blend started ({scene.zm_blend_mode.lower()}, opacity {scene.zm_blend_factor:.2f}).")
+        return
+
+    # Lógica para modo Normal
+    stop_output("live_view", keep_feed=True)
+    cmd = ["ffplay", "-loglevel", "error", "-fflags", "nobuffer",
+           "-window_title", "Zeta Live View", "-f", "mjpeg", "-"]
     try:
-        proc = subprocess.Popen(
-            cmd,
-            preexec_fn=os.setsid,
-            stdout=None,
-            stderr=None
-        )
-        stream_processes[stream_key] = proc
+        proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, preexec_fn=os.setsid)
     except Exception as e:
         print(f"[Zeta Motion] Error starting stream: {e}")
+        return
+    _start_output("live_view", _pipe_writer(proc), proc)
+    stop_output("live_blend", keep_feed=True)
+    print("[Zeta Motion] Live View started (ffplay window).")
 
 
 # ----------------------------------------------------------------
-# VSE Preview (ffmpeg) - silent, writes preview.jpg continuously
+# VSE Preview - frames decodificados en memoria y dibujados en el Sequencer
 # ----------------------------------------------------------------
 def start_vse_preview(context):
-    """Inicia el stream continuo para el VSE Preview. Sobrescribe preview.jpg continuamente."""
-    if state.control_state["stream"].get("method") == "vse":
+    """Inicia el liveview dentro del preview del VSE (sin disco ni strips)."""
+    if zm_vse_live.is_active():
         print("[Zeta Motion] VSE Preview already active.")
         return
 
-    stop_all_streams()
-
-    cam = zm_camera.get_active_camera()
-    if not cam:
+    if not ensure_feed(context):
         print("[Zeta Motion] No active camera. Please detect and connect a camera first.")
         return
 
-    scene = context.scene
-    dir_path = bpy.path.abspath(getattr(scene, "zm_preview_path", "//"))
-    if not dir_path or not os.path.isdir(os.path.dirname(bpy.path.abspath(dir_path))):
-        print(f"[Zeta Motion] Error: preview path is not a valid directory.")
-        return
-
-    if os.path.isfile(dir_path):
-        dir_path = os.path.dirname(dir_path)
-
-    if not os.path.isdir(dir_path):
-        print(f"[Zeta Motion] Error: preview folder does not exist: {dir_path}")
-        return
-
-    output_path = os.path.join(dir_path, "preview.jpg")
-    cmd = [
-        "bash", "-c",
-        f"gphoto2 --set-config viewfinder=1 --capture-movie --stdout | "
-        f"ffmpeg -y -f mjpeg -i - -vf fps=1 -update 1 '{output_path}'"
-    ]
-
-    try:
-        proc = subprocess.Popen(
-            cmd, preexec_fn=os.setsid, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
-        )
-        stream_processes["vse_preview"] = proc
-        state.control_state["stream"]["method"] = "vse"
-        print(f"[Zeta Motion] VSE Preview started (writing: {output_path}).")
-    except Exception as e:
-        print(f"[Zeta Motion] Error starting VSE Preview: {e}")
+    scale = zm_convert.SCALE_MAP.get(context.scene.zm_proxy_scale, 0.5)
+    zm_live_blend.configure(context.scene)
+    zm_vse_live.start(bus, scale=scale)
+    _mark_output("vse_preview")
+    print(f"[Zeta Motion] VSE Preview started (in-memory, {int(scale * 100)}% resolution).")
 
 # ----------------------------------------------------------------
 # OPERADORES
@@ -142,11 +268,6 @@ class ZM_OT_StartVSEPreview(bpy.types.Operator):
 
     def execute(self, context):
         start_vse_preview(context)
-        try:
-            from . import zm_preview
-            zm_preview.refresh_preview_strip(context)
-        except Exception as e:
-            print("[Zeta Motion] Warning: zm_preview.refresh_preview_strip failed:", e)
         return {'FINISHED'}
 
 
@@ -168,6 +289,8 @@ classes = (
 )
 
 def register():
+    bpy.types.Scene.zm_stream_source = bpy.props.EnumProperty(
+        name="Stream Source", items=SOURCE_ITEMS, default='SESSION')
     for cls in classes:
         bpy.utils.register_class(cls)
     print("[Zeta Motion] zm_stream registered.")
@@ -176,4 +299,9 @@ def unregister():
     stop_all_streams()
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
+    if hasattr(bpy.types.Scene, "zm_stream_source"):
+        try:
+            delattr(bpy.types.Scene, "zm_stream_source")
+        except Exception:
+            pass
     print("[Zeta Motion] zm_stream unregistered.")
\ No newline at end of file
@@ -2,14 +2,16 @@
 # Blender 4.5+ | Linux-only
 
 import bpy
-from . import zm_camera, state, zm_settings, zm_stream, zm_movie_source
+import time
+from . import zm_camera, state, zm_settings, zm_stream, zm_movie_source, zm_worker, zm_stats, zm_hotplug, zm_proxy_pool, zm_convert, zm_movie
 
 # -----------------------------------------------------------------------------
 # Handler persistente
 # -----------------------------------------------------------------------------
 def update_camera_list(dummy=None):
     cams = state.control_state["camera"].get("available", [])
-    return [(c["model"], f"{c['model']} ({c['port']})", "") for c in cams]
+    # Identificador = puerto: dos cuerpos del mismo modelo deben poder distinguirse
+    return [(c["port"], f"{c['model']} ({c['port']})", "") for c in cams]
 
 # -----------------------------------------------------------------------------
 # Operadores
@@ -17,14 +19,14 @@ def update_camera_list(dummy=None):
 class ZM_OT_DetectCameras(bpy.types.Operator):
     bl_idname = "zm.detect_cameras"
     bl_label = "Detect Cameras"
-    def execute(self, context): zm_camera.detect_cameras(); return {'FINISHED'}
+    def execute(self, context): zm_hotplug.request_rescan(); return {'FINISHED'}
 
 class ZM_OT_ConnectCamera(bpy.types.Operator):
     bl_idname = "zm.connect_camera"
     bl_label = "Connect Camera"
     def execute(self, context):
         cams = state.control_state["camera"]["available"]
-        selected = next((c for c in cams if c["model"] == context.scene.zm_camera_list), None)
+        selected = next((c for c in cams if c["port"] == context.scene.zm_camera_list), None)
         if selected: zm_camera.connect_camera(selected)
         return {'FINISHED'}
 
@@ -66,15 +68,12 @@ class ZM_OT_MatchCameraToScene(bpy.types.Operator):
 class ZM_OT_StartLiveView(bpy.types.Operator):
     bl_idname = "zm.start_live_view"
     bl_label = "Live View / Blend"
-    bl_description = "Start a live camera preview. If Live Blend is enabled, overlays on the current VSE frame"
+    bl_description = "Start a live camera preview. If Live Blend is enabled, overlays on the VSE frame under the playhead"
     def execute(self, context):
         scene = context.scene
-        image_path = None
-        if scene.zm_live_blend_enabled:
-            image_path = zm_movie_source.get_active_frame_path(context)
-            if not image_path:
-                self.report({'WARNING'}, "Live Blend enabled, but no active frame found.")
-        zm_stream.start_live_stream(context, image_path, scene.zm_blend_factor)
+        if scene.zm_live_blend_enabled and not zm_movie_source.get_active_frame_path(context):
+            self.report({'INFO'}, "Live Blend enabled: select an image strip under the playhead to use as reference.")
+        zm_stream.start_live_stream(context)
         return {'FINISHED'}
 
 class ZM_OT_SwapHDProxy(bpy.types.Operator):
@@ -83,7 +82,20 @@ class ZM_OT_SwapHDProxy(bpy.types.Operator):
     bl_description = "Swap between High-Definition and Proxy versions of the movie strip"
     use_proxy: bpy.props.BoolProperty()
     def execute(self, context):
-        print(f"Swapping to {'proxy' if self.use_proxy else 'HD'}")
+        # Strip activo o, si no es de imágenes, el de la secuencia (nombre base de zm_capture_path)
+        seq = context.scene.sequence_editor
+        strip = seq.active_strip if seq else None
+        strip_name = None
+        if strip is None or strip.type != 'IMAGE':
+            strip_name = zm_movie.sequence_target(context.scene)[1]
+        t0 = time.perf_counter()
+        swapped = zm_convert.swap_strip_resolution(context, strip_name, use_proxy=self.use_proxy,
+                                                   scale_label=context.scene.zm_proxy_scale)
+        if swapped is None:
+            self.report({'WARNING'}, "Could not swap: some frames have no matching HD/proxy file (see console).")
+            return {'CANCELLED'}
+        target = f"{context.scene.zm_proxy_scale}% proxy" if self.use_proxy else "HD"
+        self.report({'INFO'}, f"'{swapped.name}' now uses {target} ({(time.perf_counter() - t0) * 1000:.1f} ms).")
         return {'FINISHED'}
 
 # -----------------------------------------------------------------------------
@@ -140,15 +152,103 @@ class ZM_PT_CameraPanel(bpy.types.Panel):
         # --- CÓDIGO RESTAURADO: Sección de Streams ---
         stream_box = layout.box()
         stream_box.label(text="Live Preview", icon="CAMERA_DATA")
+        stream_box.prop(scene, "zm_stream_source", text="Source")
+        stream_stats = state.control_state["stream"].get("stats")
+        if stream_stats and stream_stats["status"] != "idle":
+            _draw_stream_stats(stream_box, stream_stats)
         col_stream = stream_box.column(align=True)
         col_stream.operator("zm.start_live_view", icon="PLAY")
         col_stream.operator("zm.start_vse_preview", icon="PREVIEW_RANGE")
         col_stream.operator("zm.stop_streams", icon="PAUSE")
+        snap_row = col_stream.row(align=True)
+        snap_row.operator("zm.capture_preview", text="Snapshot", icon="IMAGE_DATA").full_resolution = False
+        snap_row.operator("zm.capture_preview", text="Full Res", icon="RENDER_STILL").full_resolution = True
+        rec_row = stream_box.row(align=True)
+        if state.control_state["stream"].get("recording"):
+            rec_row.operator("zm.stop_recording", icon="SNAP_FACE")
+        else:
+            rec_row.operator("zm.start_recording", icon="REC")
+        rec_row.prop(scene, "zm_record_path", text="")
         blend_box = stream_box.box()
         blend_box.prop(scene, "zm_live_blend_enabled", text="Enable Live Blend")
         blend_row = blend_box.row()
         blend_row.enabled = scene.zm_live_blend_enabled
         blend_row.prop(scene, "zm_blend_factor", text="Opacity")
+        onion_col = blend_box.column(align=True)
+        onion_col.enabled = scene.zm_live_blend_enabled
+        onion_col.prop(scene, "zm_blend_mode", text="Mode")
+        onion_row = onion_col.row(align=True)
+        onion_row.prop(scene, "zm_onion_prev", text="Prev")
+        onion_row.prop(scene, "zm_onion_next", text="Next")
+        onion_col.prop(scene, "zm_onion_falloff", text="Falloff")
+        tint_row = onion_col.row(align=True)
+        tint_row.prop(scene, "zm_onion_use_tint", text="Tint")
+        tint_sub = tint_row.row(align=True)
+        tint_sub.enabled = scene.zm_onion_use_tint
+        tint_sub.prop(scene, "zm_onion_tint_prev", text="")
+        tint_sub.prop(scene, "zm_onion_tint_next", text="")
+        onion_col.prop(scene, "zm_onion_cache_mb", text="Cache (MB)")
+        layout.separator()
+
+        # --- Estadísticas del worker y la cámara (colapsable) ---
+        stats_box = layout.box()
+        header = stats_box.row(align=True)
+        header.prop(scene, "zm_show_stats", text="Worker Stats",
+                    icon="TRIA_DOWN" if scene.zm_show_stats else "TRIA_RIGHT", emboss=False)
+        header.operator("zm.dump_stats", text="", icon="EXPORT")
+        header.operator("zm.reset_stats", text="", icon="X")
+        if scene.zm_show_stats:
+            _draw_stats(stats_box)
+
+def _draw_stream_stats(box, stats):
+    status = stats["status"]
+    icon = {"ok": "CHECKMARK", "restarting": "ERROR", "paused": "PAUSE"}.get(status, "TIME")
+    row = box.row()
+    if status == "ok":
+        row.label(text=f"{stats['fps']:.1f} fps  ·  {stats['interval_ms']:.0f} ms/frame  "
+                       f"(p95 {stats['jitter_ms']:.0f} ms)", icon=icon)
+    else:
+        row.label(text=status.capitalize(), icon=icon)
+    if stats["restarts"]:
+        box.label(text=f"Stream restarts: {stats['restarts']}")
+
+def _draw_stats(box):
+    snap = zm_stats.snapshot()
+    depth = snap["gauges"].get("queue_depth", {"value": 0, "max": 0})
+    box.label(text=f"Queue depth: {depth['value']} (max {depth['max']})", icon="SORTSIZE")
+    failures = snap["counters"]
+    if failures:
+        col = box.column(align=True)
+        for name, per_tag in failures.items():
+            col.label(text=f"{name}: " + ", ".join(f"{tag} {n}" for tag, n in per_tag.items()), icon="ERROR")
+    if not snap["latency"]:
+        box.label(text="No samples yet.")
+        return
+    col = box.column(align=True)
+    for tag, stages in snap["latency"].items():
+        col.label(text=tag, icon="TIME")
+        for stage, h in stages.items():
+            row = col.row()
+            row.label(text=f"  {stage}")
+            row.label(text=f"p50 {h['p50_ms']:.0f}  p95 {h['p95_ms']:.0f}  max {h['max_ms']:.0f} ms")
+
+def _draw_proxy_job(layout):
+    job = zm_proxy_pool.job_status()
+    if not job or not job["running"]:
+        row = layout.row(align=True)
+        row.operator("zm.rebuild_proxies", icon="FILE_REFRESH")
+        if zm_proxy_pool.zm_develop.available():
+            row.operator("zm.develop_raw", icon="IMAGE_RGB")
+        if job and job["failed"]:
+            layout.label(text=f"Last rebuild: {job['failed']} frames failed", icon="ERROR")
+        return
+    box = layout.box()
+    text = f"{job['label']} {job['done'] + job['failed']}/{job['total']}"
+    if job["eta_s"] is not None:
+        text += f"  ·  ETA {int(job['eta_s']) // 60}:{int(job['eta_s']) % 60:02d}"
+    row = box.row(align=True)
+    row.label(text=text, icon="TIME")
+    row.operator("zm.cancel_proxy_rebuild", text="", icon="CANCEL")
 
 class ZM_PT_MoviePanel(bpy.types.Panel):
     bl_label = "Stop Motion Sequence"
@@ -168,12 +268,20 @@ class ZM_PT_MoviePanel(bpy.types.Panel):
         row = box.row(align=True)
         row.prop(scene, "zm_movie_length", text="Frames")
         row.prop(scene, "zm_movie_overwrite", text="Overwrite")
-        box.prop(scene, "zm_proxy_scale")
+        row = box.row(align=True)
+        row.prop(scene, "zm_proxy_scale")
+        row.prop(scene, "zm_proxy_decode", text="")
+        row.operator("zm.benchmark_proxy_decode", text="", icon="SORTTIME")
+        box.row(align=True).prop(scene, "zm_proxy_levels")
+        box.prop(scene, "zm_proxy_layout", text="")
         layout.separator()
         layout.operator("zm.create_movie_sequence", text="Create Sequence", icon="ADD")
-        row = layout.row(align=True)
-        row.operator("zm.swap_hd_proxy", text="Use HD").use_proxy = False
-        row.operator("zm.swap_hd_proxy", text="Use Proxy").use_proxy = True
+        # Con los proxies de Blender el tamaño de la vista previa elige la resolución
+        if scene.zm_proxy_layout != 'BLENDER':
+            row = layout.row(align=True)
+            row.operator("zm.swap_hd_proxy", text="Use HD").use_proxy = False
+            row.operator("zm.swap_hd_proxy", text="Use Proxy").use_proxy = True
+        _draw_proxy_job(layout)
 
 class ZM_PT_ShootingPanel(bpy.types.Panel):
     bl_label = "Shooting"
@@ -196,12 +304,8 @@ class ZM_PT_ShootingPanel(bpy.types.Panel):
         box = layout.box()
         box.label(text="Photo Sequence Tools", icon="IMAGE_DATA")
 
-        # If a photo task is running, disable buttons and show status
-        busy = False
-        try:
-            busy = bool(state.control_state["system"].get("photo_task_active", False))
-        except Exception:
-            busy = False
+        # If a capture-class task is running or queued, disable buttons and show status
+        busy = zm_worker.lane_busy("capture")
 
         row = box.row(align=True)
         row.enabled = not busy
@@ -214,6 +318,43 @@ class ZM_PT_ShootingPanel(bpy.types.Panel):
 
         if busy:
             box.label(text="Photo task in progress...", icon="TIME")
+class ZM_PT_RigPanel(bpy.types.Panel):
+    bl_label = "Multi-Camera Rig"
+    bl_idname = "ZM_PT_rig_panel"
+    bl_space_type = "SEQUENCE_EDITOR"
+    bl_region_type = "UI"
+    bl_category = "Zeta Motion"
+    bl_parent_id = "ZM_PT_camera_panel"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    def draw(self, context):
+        layout = self.layout
+        scene = context.scene
+        rig = state.control_state["camera"]["rig"]
+        active_port = state.control_state["camera"]["active_port"]
+
+        box = layout.box()
+        box.label(text="Rig Cameras", icon="OUTLINER_OB_CAMERA")
+        if not rig:
+            box.label(text="Connect a camera to start a rig.")
+        for cam in rig:
+            row = box.row(align=True)
+            busy = zm_worker.lane_busy("capture", lane=zm_worker.camera_lane(cam["port"]))
+            icon = "TIME" if busy else ("CHECKMARK" if cam["port"] == active_port else "CAMERA_DATA")
+            row.label(text=f"{cam['slug']}: {cam['model']} ({cam['port']})", icon=icon)
+            row.operator("zm.remove_camera_from_rig", text="", icon="X").port = cam["port"]
+        if state.control_state["camera"]["available"]:
+            box.prop(scene, "zm_camera_list", text="")
+            box.operator("zm.add_camera_to_rig", icon="ADD")
+
+        row = layout.row()
+        row.enabled = bool(rig) and not zm_worker.lane_busy("capture")
+        row.operator("zm.capture_all", icon="RENDER_STILL")
+        report = state.control_state["system"].get("last_rig_capture")
+        if report:
+            layout.label(text=f"Last: {report['ok']}/{report['cameras']} bodies, skew {report['skew_ms']:.1f} ms",
+                         icon="ERROR" if report["failed"] else "INFO")
+
 # -----------------------------------------------------------------------------
 # Registro
 # -----------------------------------------------------------------------------
@@ -227,6 +368,7 @@ classes = (
     ZM_PT_CameraPanel,
     ZM_PT_MoviePanel,
     ZM_PT_ShootingPanel,
+    ZM_PT_RigPanel,
 )
 
 def register():
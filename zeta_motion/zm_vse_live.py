@@ -0,0 +1,161 @@
+# zm_vse_live.py — Zeta Motion
+# Blender 4.5+ | Linux-only
+# Liveview dentro del Sequencer sin tocar disco ni strips.
+# Un consumidor del bus de frames decodifica cada JPEG a resolución proxy
+# (escalado DCT de libjpeg vía Image.draft) en su propio hilo; el hilo
+# principal sube solo el último frame a una textura GPU y la dibuja sobre
+# la región de preview del VSE.
+
+import bpy
+import gpu
+import io
+import threading
+import time
+
+import numpy as np
+from PIL import Image
+from gpu_extras.presets import draw_texture_2d
+
+from . import zm_stats, zm_live_blend
+
+CONSUMER_NAME = "vse_preview"
+IMAGE_NAME = ".zm_vse_live"   # imagen interna que recibe los frames (el punto la oculta)
+REFRESH_INTERVAL = 1.0 / 60   # sondeo del hilo principal (el bus marca el ritmo real)
+
+_lock = threading.Lock()
+_pending = None        # (seq, width, height, pixels float32 RGBA) aún no subido
+_texture = None        # GPUTexture de IMAGE_NAME con el último frame subido
+_texture_size = None
+_draw_handle = None
+_scale = 0.5           # escala de decodificación (zm_proxy_scale)
+_frame_times = []      # tiempos de los últimos frames subidos (para fps)
+
+
+# ----------------------------------------------------------------
+# Decodificación (hilo del consumidor)
+# ----------------------------------------------------------------
+def decode_frame(data, scale=0.5):
+    """
+    JPEG -> array float32 RGBA (filas de abajo arriba, como espera la GPU).
+    Image.draft deja que libjpeg decodifique directamente a 1/2, 1/4 u 1/8.
+    """
+    img = Image.open(io.BytesIO(data))
+    if scale < 1.0:
+        img.draft("RGB", (max(1, int(img.width * scale)), max(1, int(img.height * scale))))
+    rgb = np.asarray(img.convert("RGB"))
+    rgba = np.empty((rgb.shape[0], rgb.shape[1], 4), dtype=np.float32)
+    rgba[..., :3] = rgb[::-1]
+    rgba[..., :3] *= 1.0 / 255.0
+    rgba[..., 3] = 1.0
+    return rgba
+
+def _on_frame(frame):
+    global _pending
+    t0 = time.monotonic()
+    pixels = decode_frame(frame.data, _scale)
+    zm_stats.record("vse_live", "decode", time.monotonic() - t0)
+    if zm_live_blend.is_enabled():
+        pixels = zm_live_blend.apply(pixels)
+    with _lock:
+        _pending = (frame.seq, pixels.shape[1], pixels.shape[0], pixels)
+
+
+# ----------------------------------------------------------------
+# Subida a GPU y dibujo (hilo principal)
+# ----------------------------------------------------------------
+def _frame_image(width, height):
+    """
+    Imagen donde se copia cada frame. Su textura GPU (gpu.texture.from_image)
+    se reutiliza entre frames; solo se reasigna cuando cambia el tamaño.
+    """
+    image = bpy.data.images.get(IMAGE_NAME)
+    if image is None:
+        image = bpy.data.images.new(IMAGE_NAME, width, height, alpha=True)
+        image.colorspace_settings.name = 'Non-Color'   # valores tal cual, como la textura RGBA8
+    elif tuple(image.size) != (width, height):
+        image.scale(width, height)
+    return image
+
+def _upload():
+    global _pending, _texture, _texture_size
+    with _lock:
+        pending, _pending = _pending, None
+    if pending is None:
+        return False
+    _, width, height, pixels = pending
+    image = _frame_image(width, height)
+    image.pixels.foreach_set(pixels.ravel())
+    image.update()
+    _texture = gpu.texture.from_image(image)
+    _texture_size = (width, height)
+    now = time.monotonic()
+    _frame_times.append(now)
+    del _frame_times[:-30]
+    return True
+
+def _refresh_timer():
+    if _draw_handle is None:
+        return None
+    if _upload():
+        for window in bpy.context.window_manager.windows:
+            for area in window.screen.areas:
+                if area.type == 'SEQUENCE_EDITOR':
+                    area.tag_redraw()
+    return REFRESH_INTERVAL
+
+def _draw():
+    if _texture is None:
+        return
+    region = bpy.context.region
+    scene = bpy.context.scene
+    view2d = getattr(region, "view2d", None)
+    if view2d is None:
+        return
+    # El preview del VSE usa coordenadas en píxeles de render centradas en el origen
+    half_w = scene.render.resolution_x / 2
+    half_h = scene.render.resolution_y / 2
+    x0, y0 = view2d.view_to_region(-half_w, -half_h, clip=False)
+    x1, y1 = view2d.view_to_region(half_w, half_h, clip=False)
+    # Encajar el frame de la cámara respetando su aspecto
+    tex_w, tex_h = _texture_size
+    box_w, box_h = x1 - x0, y1 - y0
+    fit = min(box_w / tex_w, box_h / tex_h)
+    w, h = tex_w * fit, tex_h * fit
+    draw_texture_2d(_texture, (x0 + (box_w - w) / 2, y0 + (box_h - h) / 2), w, h)
+
+def fps():
+    if len(_frame_times) < 2:
+        return 0.0
+    span = _frame_times[-1] - _frame_times[0]
+    return (len(_frame_times) - 1) / span if span > 0 else 0.0
+
+
+# ----------------------------------------------------------------
+# API
+# ----------------------------------------------------------------
+def is_active():
+    return _draw_handle is not None
+
+def start(bus, scale=0.5):
+    """Suscribe el liveview del VSE al bus y empieza a dibujarlo."""
+    global _draw_handle, _scale
+    _scale = scale
+    bus.subscribe(CONSUMER_NAME, _on_frame)
+    if _draw_handle is None:
+        _draw_handle = bpy.types.SpaceSequenceEditor.draw_handler_add(_draw, (), 'PREVIEW', 'POST_PIXEL')
+        bpy.app.timers.register(_refresh_timer, first_interval=REFRESH_INTERVAL)
+
+def stop(bus):
+    global _draw_handle, _texture, _texture_size, _pending
+    bus.unsubscribe(CONSUMER_NAME)
+    if _draw_handle is not None:
+        bpy.types.SpaceSequenceEditor.draw_handler_remove(_draw_handle, 'PREVIEW')
+        _draw_handle = None
+    with _lock:
+        _pending = None
+    _texture = None
+    _texture_size = None
+    image = bpy.data.images.get(IMAGE_NAME)
+    if image is not None:
+        bpy.data.images.remove(image)
+    _frame_times.clear()
@@ -0,0 +1,154 @@
+# zm_watchdog.py — Zeta Motion
+# Blender 4.5+ | Linux-only
+# Supervisor del liveview: mide fps e intervalo entre frames del bus,
+# detecta fuentes muertas (proceso gphoto2 / bombeo de la sesión) y
+# atascos sin frames, y reinicia la fuente con backoff exponencial.
+# También limpia consumidores cuya ventana (ffplay) se cerró; eso toca bpy
+# (draw handlers del VSE), así que se hace en el hilo principal.
+# Mientras corre una captura la sesión no entrega frames: cuenta como pausa.
+# Publica las cifras en control_state["stream"]["stats"] para la UI.
+
+import bpy
+import threading
+import time
+
+from . import state, zm_stats, zm_stream
+
+CHECK_INTERVAL = 0.5     # segundos entre comprobaciones
+STARTUP_GRACE = 5.0      # la cámara tarda en entregar el primer frame
+STALL_TIMEOUT = 3.0      # sin frames durante este tiempo = atasco
+BACKOFF_START = 1.0
+BACKOFF_MAX = 30.0
+HEALTHY_RESET = 10.0     # segundos sanos para volver al backoff inicial
+
+_thread = None
+_stop = threading.Event()
+_restart = {"backoff": BACKOFF_START, "next_at": 0.0, "count": 0, "healthy_since": None, "paused_at": 0.0}
+_reaping = set()          # salidas cerradas pendientes de quitar en el hilo principal
+_reaping_lock = threading.Lock()
+
+
+def _publish(status, fps=0.0, interval=0.0, jitter_ms=0.0, age=None):
+    stats = {
+        "status": status,            # "idle", "starting", "ok", "paused", "restarting"
+        "fps": fps,
+        "interval_ms": interval * 1000,
+        "jitter_ms": jitter_ms,      # p95 del intervalo entre frames
+        "age_ms": None if age is None else age * 1000,
+        "restarts": _restart["count"],
+    }
+    with state.state_lock:
+        state.control_state["stream"]["stats"] = stats
+    zm_stats.gauge("stream_fps", round(fps, 1))
+
+def _stop_closed_outputs(keys):
+    """Timer del hilo principal: quita las salidas cerradas."""
+    for key in keys:
+        with _reaping_lock:
+            _reaping.discard(key)
+        if key in zm_stream.active_outputs():
+            print(f"[Zeta Motion] {key} output closed.")
+            zm_stream.stop_output(key)
+    return None
+
+def _reap_closed_outputs():
+    """Programa la retirada de las salidas cuyo proceso o consumidor murió (p. ej. se cerró ffplay)."""
+    closed = []
+    for key in zm_stream.active_outputs():
+        proc = zm_stream.stream_processes.get(key)
+        if (proc is not None and proc.poll() is not None) or not zm_stream.bus.has_consumer(key):
+            closed.append(key)
+    with _reaping_lock:
+        closed = [key for key in closed if key not in _reaping]
+        _reaping.update(closed)
+    if closed:
+        bpy.app.timers.register(lambda: _stop_closed_outputs(closed), first_interval=0.0)
+
+def _capture_in_progress():
+    with state.state_lock:
+        return bool(state.control_state["system"].get("photo_task_active"))
+
+def _schedule_restart(now, reason):
+    if now < _restart["next_at"]:
+        return "restarting"
+    print(f"[Zeta Motion] Camera stream {reason}. Restarting (retry in {_restart['backoff']:.0f}s if it fails)...")
+    _restart["count"] += 1
+    _restart["healthy_since"] = None
+    _restart["next_at"] = now + _restart["backoff"]
+    _restart["backoff"] = min(_restart["backoff"] * 2, BACKOFF_MAX)
+    zm_stats.count("restart", "stream")
+    zm_stream.restart_feed()
+    return "restarting"
+
+def check():
+    """Una pasada del supervisor. Devuelve el estado publicado."""
+    _reap_closed_outputs()
+    info = zm_stream.feed_info()
+    if info is None:
+        _restart.update(backoff=BACKOFF_START, next_at=0.0, healthy_since=None)
+        _publish("idle")
+        return "idle"
+    now = time.monotonic()
+    if info["paused"] or _capture_in_progress():
+        # Una captura de la sesión retiene el bloqueo más de STALL_TIMEOUT: no es un atasco
+        _restart["paused_at"] = now
+        _publish("paused")
+        return "paused"
+
+    bus = zm_stream.bus
+    last = bus.last_arrival()
+    started_at = info["started_at"] or now
+    # Los plazos cuentan desde el arranque o desde el fin de la última pausa
+    since_start = now - max(started_at, _restart["paused_at"])
+    # Frames anteriores al último arranque no cuentan
+    age = (now - last) if last is not None and last >= (info["started_at"] or 0) else None
+    quiet = None if age is None else min(age, now - _restart["paused_at"])
+
+    if not info["alive"]:
+        status = _schedule_restart(now, "died")
+    elif (age is None and since_start > STARTUP_GRACE) or (quiet is not None and quiet > STALL_TIMEOUT):
+        status = _schedule_restart(now, "stalled")
+    elif age is None:
+        status = "starting"
+    else:
+        status = "ok"
+        if _restart["healthy_since"] is None:
+            _restart["healthy_since"] = now
+        elif now - _restart["healthy_since"] > HEALTHY_RESET:
+            _restart["backoff"] = BACKOFF_START
+
+    intervals = bus.intervals() if status == "ok" else []
+    interval = sum(intervals) / len(intervals) if intervals else 0.0
+    _publish(status,
+             fps=bus.fps() if status == "ok" else 0.0,
+             interval=interval,
+             jitter_ms=zm_stats.summarize(intervals)["p95_ms"],
+             age=age)
+    return status
+
+def _run():
+    while not _stop.wait(CHECK_INTERVAL):
+        try:
+            check()
+        except Exception as e:
+            print(f"[Zeta Motion] Stream watchdog error: {e}")
+
+def start():
+    global _thread
+    if _thread is not None and _thread.is_alive():
+        return
+    _stop.clear()
+    _thread = threading.Thread(target=_run, daemon=True, name="zm_stream_watchdog")
+    _thread.start()
+
+def stop():
+    _stop.set()
+
+
+def register():
+    start()
+    print("[Zeta Motion] zm_watchdog registered.")
+
+def unregister():
+    stop()
+    print("[Zeta Motion] zm_watchdog unregistered.")
@@ -2,90 +2,498 @@
 # Blender 4.5+ | Linux-only
 # Asynchronous, non-blocking task executor for gphoto2 and other callables.
 
-import subprocess
+import heapq
+import itertools
 import threading
-from queue import Queue
+import time
 import bpy
 from . import state # <-- necesario para manipular flags de estado
+from . import zm_session
+from . import zm_stats
 
-task_queue = Queue()
+# --- Clases de tarea: menor valor = mayor prioridad ---
+PRIORITY_CAPTURE = 0
+PRIORITY_SETTINGS = 1
+PRIORITY_BACKGROUND = 2
 
-def _camera_command_worker():
+PRIORITY_NAMES = {
+    PRIORITY_CAPTURE: "capture",
+    PRIORITY_SETTINGS: "settings",
+    PRIORITY_BACKGROUND: "background",
+}
+
+# Clase por defecto según el tag de la tarea
+TAG_PRIORITIES = {
+    "foto_capture": PRIORITY_CAPTURE,
+    "capture": PRIORITY_CAPTURE,
+    "movie_capture": PRIORITY_CAPTURE,
+    "preview_capture": PRIORITY_CAPTURE,
+    "settings_write": PRIORITY_SETTINGS,
+    "settings_read": PRIORITY_SETTINGS,
+    "camera": PRIORITY_SETTINGS,
+}
+
+
+class TaskHandle:
+    """
+    Devuelto por enqueue(). Permite cancelar la tarea, consultar su estado
+    ("queued", "running", "done", "failed", "cancelled", "timeout") y esperarla.
+    """
+
+    def __init__(self, func, tag, callback, priority, dedupe_key, timeout):
+        self.func = func
+        self.tag = tag
+        self.callback = callback
+        self.priority = priority
+        self.dedupe_key = dedupe_key
+        self.timeout = timeout
+        self.status = "queued"
+        self.enqueued_at = time.monotonic()
+        self.result = None
+        self.error = None
+        self.lane = None
+        self._scheduler = None
+        self._done = threading.Event()
+
+    @property
+    def deadline(self):
+        return self.enqueued_at + self.timeout if self.timeout else None
+
+    def cancel(self):
+        """
+        Cancela la tarea. Si aún está en cola no llega a ejecutarse; si ya está
+        en ejecución no se interrumpe, pero su callback no se llamará.
+        Devuelve True si la tarea no había terminado.
+        """
+        if self._done.is_set():
+            return False
+        if self._scheduler is not None and self._scheduler.cancel(self):
+            zm_stats.count("cancelled", self.tag)
+            self._finish()
+        return True
+
+    @property
+    def cancelled(self):
+        return self.status == "cancelled"
+
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def _finish(self):
+        self._done.set()
+
+    def __repr__(self):
+        return f"<TaskHandle {self.tag} {PRIORITY_NAMES.get(self.priority)} {self.status}>"
+
+
+class _TaskScheduler:
+    """Cola de prioridad con deduplicación por clave (FIFO dentro de cada clase)."""
+
+    def __init__(self):
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._dedupe = {}        # dedupe_key -> handle en cola
+        self._running = None
+        self._stopped = False
+
+    def put(self, handle):
+        """Encola `handle`; si ya hay una tarea en cola con su clave, devuelve esa."""
+        with self._cond:
+            if handle.dedupe_key is not None:
+                existing = self._dedupe.get(handle.dedupe_key)
+                if existing is not None and existing.status == "queued":
+                    return existing
+                self._dedupe[handle.dedupe_key] = handle
+            heapq.heappush(self._heap, (handle.priority, next(self._seq), handle))
+            self._cond.notify()
+            return handle
+
+    def cancel(self, handle):
+        """Marca la tarea como cancelada. True si seguía en cola (no llegará a correr)."""
+        with self._cond:
+            was_queued = handle.status == "queued"
+            handle.status = "cancelled"
+            if handle.dedupe_key is not None and self._dedupe.get(handle.dedupe_key) is handle:
+                del self._dedupe[handle.dedupe_key]
+            # El heap se limpia de forma perezosa en get()
+            return was_queued
+
+    def get(self):
+        """Bloquea hasta la siguiente tarea viva. Devuelve None al detenerse."""
+        with self._cond:
+            while True:
+                while self._heap and self._heap[0][2].status != "queued":
+                    heapq.heappop(self._heap)
+                if self._heap:
+                    handle = heapq.heappop(self._heap)[2]
+                    if handle.dedupe_key is not None and self._dedupe.get(handle.dedupe_key) is handle:
+                        del self._dedupe[handle.dedupe_key]
+                    handle.status = "running"
+                    self._running = handle
+                    return handle
+                if self._stopped:
+                    return None
+                self._cond.wait()
+
+    def task_done(self):
+        with self._cond:
+            self._running = None
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def restart(self):
+        with self._cond:
+            self._stopped = False
+
+    def running_priority(self):
+        with self._cond:
+            return self._running.priority if self._running is not None else None
+
+    def busy(self, priority):
+        """True si hay una tarea de esa clase en ejecución o en cola."""
+        with self._cond:
+            if self._running is not None and self._running.priority == priority:
+                return True
+            return any(h.priority == priority and h.status == "queued" for _, _, h in self._heap)
+
+    def depth(self):
+        with self._cond:
+            return sum(1 for _, _, h in self._heap if h.status == "queued")
+
+
+class _Lane:
+    """Carril de ejecución: una cola con prioridad y su propio hilo (serializado)."""
+
+    def __init__(self, name):
+        self.name = name
+        self.scheduler = _TaskScheduler()
+        self.thread = None
+
+    def start(self):
+        if self.thread is None or not self.thread.is_alive():
+            self.scheduler.restart()
+            self.thread = threading.Thread(target=_camera_command_worker, args=(self,), daemon=True,
+                                           name=f"zm_worker:{self.name}")
+            self.thread.start()
+
+    def stop(self):
+        self.scheduler.stop()
+
+
+# Carril principal (tareas generales y cámara activa) + un carril por cámara del rig
+MAIN_LANE = "main"
+_lanes = {}
+_lanes_lock = threading.Lock()
+_running = False
+
+def camera_lane(port):
+    """Nombre del carril serializado de la cámara en `port`."""
+    return f"camera:{port}"
+
+def _get_lane(name):
+    with _lanes_lock:
+        lane = _lanes.get(name)
+        if lane is None:
+            lane = _lanes[name] = _Lane(name)
+            if _running:
+                lane.start()
+        return lane
+
+def remove_lane(name):
+    """Detiene el carril (termina las tareas en cola y luego su hilo)."""
+    with _lanes_lock:
+        lane = _lanes.pop(name, None)
+    if lane:
+        lane.stop()
+
+def _all_lanes():
+    with _lanes_lock:
+        return list(_lanes.values())
+
+# --- Sesiones persistentes con la cámara (una por puerto) ---
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+def get_session(port=None):
+    """
+    Devuelve la sesión persistente de la cámara en `port` (por defecto la
+    cámara activa). Las operaciones de la sesión son bloqueantes: llamarlas
+    solo desde tareas del worker.
+    """
+    if port is None:
+        port = state.control_state["camera"].get("active_port")
+    with _sessions_lock:
+        session = _sessions.get(port)
+        if session is None:
+            session = zm_session.CameraSession(port)
+            _sessions[port] = session
+        return session
+
+def close_sessions(keep_ports=()):
+    """Cierra todas las sesiones (salvo las de `keep_ports`) liberando el dispositivo USB."""
+    keep_ports = set(keep_ports)
+    with _sessions_lock:
+        ports = [p for p in _sessions if p not in keep_ports]
+        sessions = [_sessions.pop(p) for p in ports]
+    for session in sessions:
+        session.close()
+
+def release_sessions():
     """
-    Hilo worker que procesa tareas (funciones o comandos) de la cola secuencialmente.
-    Marca/limpia state.control_state['system']['photo_task_active'] cuando el tag
-    sea 'foto_capture' para evitar colisiones.
+    Libera el dispositivo sin olvidar las sesiones, p. ej. antes de lanzar un
+    proceso `gphoto2 --capture-movie`. Se reabren solas en el siguiente comando.
+    """
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+    for session in sessions:
+        session.close()
+
+def enqueue_camera(op, *args, tag="camera", callback=None, port=None, **options):
+    """
+    Encola una operación de la sesión de cámara (p. ej. 'get_config',
+    'set_config'). callback(result) se ejecuta en el hilo principal.
+    Con `port` la tarea va al carril de esa cámara; sin él, al principal.
+    `options` se pasan a enqueue() (priority, dedupe_key, timeout).
+    """
+    def _task():
+        return getattr(get_session(port), op)(*args)
+    lane = camera_lane(port) if port else None
+    return enqueue(_task, tag=tag, callback=callback, lane=lane, **options)
+
+def _any_capture_running():
+    return any(l.scheduler.running_priority() == PRIORITY_CAPTURE for l in _all_lanes())
+
+def _set_photo_flag(active):
+    # Compatibilidad: el flag antiguo refleja la clase "capture"
+    try:
+        with state.state_lock:
+            state.control_state["system"]["photo_task_active"] = active
+    except Exception as e:
+        print(f"[worker] Warning: failed to update photo_task_active: {e}")
+
+def _run_with_timeout(handle):
+    """Ejecuta la tarea respetando su deadline y devuelve su resultado."""
+    if handle.deadline is None:
+        return handle.func()
+    if handle.deadline <= time.monotonic():
+        raise TimeoutError("deadline expired while queued")
+
+    # La tarea corre en este hilo (los hilos de Python no se pueden
+    # interrumpir, y abandonarla la dejaría con el bloqueo de la sesión):
+    # el deadline acota cada espera de la sesión de cámara, que falla al
+    # vencer en vez de terminar más tarde en segundo plano.
+    try:
+        with zm_session.task_deadline(handle.deadline):
+            return handle.func()
+    except Exception as e:
+        if time.monotonic() >= handle.deadline:
+            raise TimeoutError(f"task exceeded {handle.timeout:.1f}s ({e})") from e
+        raise
+
+def _timed_callback(tag, callback, result):
+    """Envuelve el callback para medir cuánto tarda el hilo principal en despacharlo."""
+    scheduled = time.monotonic()
+    def _dispatch():
+        zm_stats.record(tag, "dispatch", time.monotonic() - scheduled)
+        callback(result)
+    return _dispatch
+
+def _camera_command_worker(lane):
+    """
+    Hilo worker de un carril: procesa sus tareas por prioridad (captura >
+    ajustes > segundo plano). Mantiene state.control_state['system']['photo_task_active']
+    mientras corre una tarea de clase captura en cualquier carril.
     """
     while True:
-        item = task_queue.get()
-        if item is None:
+        handle = lane.scheduler.get()
+        if handle is None:
             break
 
-        func, tag, callback = item
-        print(f"[worker:{tag}] task started")
-
-        # Si es tarea de foto, marcar el flag (thread-safe con state_lock)
-        if tag == "foto_capture":
-            try:
-                with state.state_lock:
-                    state.control_state["system"]["photo_task_active"] = True
-            except Exception as e:
-                print(f"[worker] Warning: failed to set photo_task_active: {e}")
+        tag = handle.tag
+        is_capture = handle.priority == PRIORITY_CAPTURE
+        started = time.monotonic()
+        queue_wait = started - handle.enqueued_at
+        zm_stats.record(tag, "queue", queue_wait)
+        zm_stats.gauge("queue_depth", queue_depth())
+        print(f"[worker:{tag}] task started ({PRIORITY_NAMES.get(handle.priority, handle.priority)}, "
+              f"waited {queue_wait * 1000:.0f} ms)")
+        if is_capture:
+            _set_photo_flag(True)
 
         result = None
         error = None
-
         try:
-            if callable(func):
-                result = func()
-            else:
-                raise TypeError(f"Task must be a callable function, but got {type(func)}")
-
+            result = _run_with_timeout(handle)
+        except TimeoutError as e:
+            print(f"❌ [worker:{tag}] task timed out: {e}")
+            error = e
         except Exception as e:
             print(f"❌ [worker:{tag}] task failed: {e}")
             error = e
+        zm_stats.record(tag, "exec", time.monotonic() - started)
 
-        # schedule callback on main thread if provided and task succeeded
-        if callback and error is None:
+        handle.result, handle.error = result, error
+        if handle.status == "running":
+            if isinstance(error, TimeoutError):
+                handle.status = "timeout"
+            else:
+                handle.status = "failed" if error else "done"
+        if handle.status != "done":
+            zm_stats.count(handle.status, tag)
+
+        # schedule callback on main thread if provided, task succeeded and was not cancelled
+        callback = handle.callback
+        if callback and error is None and handle.status == "done":
             try:
-                bpy.app.timers.register(lambda: callback(result))
+                bpy.app.timers.register(_timed_callback(tag, callback, result))
             except Exception as cb_err:
                 print(f"❌ [worker:{tag}] callback scheduling failed: {cb_err}")
 
-        # Si fue tarea de foto, limpiar el flag (thread-safe)
-        if tag == "foto_capture":
-            try:
-                with state.state_lock:
-                    state.control_state["system"]["photo_task_active"] = False
-            except Exception as e:
-                print(f"[worker] Warning: failed to clear photo_task_active: {e}")
+        lane.scheduler.task_done()
+        if is_capture:
+            _set_photo_flag(_any_capture_running())
 
-        task_queue.task_done()
+        handle._finish()
 
-def enqueue(func, tag="general", callback=None):
+def enqueue(func, tag="general", callback=None, priority=None, dedupe_key=None, timeout=None, lane=None):
     """
     Añade una tarea (función callable) a la cola del worker.
 
-    Mantiene la misma firma: enqueue(func, tag='general', callback=None)
+    - priority: PRIORITY_CAPTURE / PRIORITY_SETTINGS / PRIORITY_BACKGROUND.
+      Por defecto se deduce del tag (TAG_PRIORITIES) o es de segundo plano.
+    - dedupe_key: si ya hay una tarea en cola con la misma clave no se encola
+      otra; se devuelve el handle existente.
+    - timeout: segundos máximos desde que se encola hasta que termina. Acota
+      las operaciones de la sesión de cámara de la tarea (zm_session.task_deadline);
+      el resto de su código no se interrumpe.
+    - lane: carril de ejecución (ver camera_lane); por defecto el principal.
+      Los carriles corren en paralelo entre sí.
+
+    Devuelve un TaskHandle (o None si func no es callable).
     """
     if not callable(func):
         print(f"❌ [zm_worker] Error: la tarea encolada debe ser una función (callable), no {type(func)}.")
-        return
+        return None
 
-    task_queue.put((func, tag, callback))
+    if priority is None:
+        priority = TAG_PRIORITIES.get(tag, PRIORITY_BACKGROUND)
+    handle = TaskHandle(func, tag, callback, priority, dedupe_key, timeout)
+    handle.lane = lane or MAIN_LANE
+    handle._scheduler = _get_lane(handle.lane).scheduler
+    queued = handle._scheduler.put(handle)
+    if queued is not handle:
+        print(f"[zm_worker] Tarea '{tag}' ya en cola (clave {dedupe_key!r}); se reutiliza.")
+        zm_stats.count("deduplicated", tag)
+    zm_stats.gauge("queue_depth", queue_depth())
+    return queued
 
-# --- Funciones para el ciclo de vida del addon ---
-_worker_thread = None
+def lane_busy(task_class, lane=None):
+    """
+    True si hay una tarea de esa clase ('capture', 'settings', 'background'
+    o su constante PRIORITY_*) en ejecución o en cola, en `lane` o en
+    cualquier carril. Pensado para la UI.
+    """
+    if isinstance(task_class, str):
+        task_class = {name: prio for prio, name in PRIORITY_NAMES.items()}.get(task_class)
+    lanes = [l for l in _all_lanes() if lane is None or l.name == lane]
+    return any(l.scheduler.busy(task_class) for l in lanes)
+
+def queue_depth(lane=None):
+    return sum(l.scheduler.depth() for l in _all_lanes() if lane is None or l.name == lane)
+
+# --- Escritor de ajustes de cámara: coalescente, gana el último valor ---
+class SettingsWriter:
+    """
+    Agrupa los cambios de ajustes de cámara. Por cada parámetro solo se
+    conserva el último valor pendiente y todos los parámetros sucios se
+    aplican juntos en una única tarea del worker (una transacción con la
+    cámara). Después se leen de vuelta los valores confirmados y se guardan
+    en settings["current"].
+
+    on_confirmed(confirmed) se llama en el hilo principal con
+    {param: valor_confirmado} tras cada escritura.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}       # param -> (config_path, value)
+        self._scheduled = False
+        self.on_confirmed = None
 
+    def submit(self, param, config_path, value):
+        """Marca `param` como sucio con `value`; sustituye cualquier valor pendiente."""
+        with self._lock:
+            self._pending[param] = (config_path, value)
+            if self._scheduled:
+                return
+            self._scheduled = True
+        enqueue(self._flush, tag="settings_write", callback=self._on_flushed)
+
+    def pending(self):
+        with self._lock:
+            return {param: value for param, (_, value) in self._pending.items()}
+
+    def _flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, {}
+            self._scheduled = False
+        if not batch:
+            return {}
+
+        session = get_session()
+        values = {path: value for path, value in batch.values()}
+        print(f"[Zeta Motion Sync] Aplicando {len(values)} ajuste(s): {values}")
+        try:
+            session.set_config(values)
+        except zm_session.SessionError as e:
+            # Valor rechazado: se relee igualmente para resincronizar la UI
+            print(f"❌ [Zeta Motion Sync] La cámara rechazó los ajustes: {e}")
+        confirmed = session.get_configs(list(values))
+        return {param: confirmed.get(path) for param, (path, _) in batch.items()}
+
+    def _on_flushed(self, confirmed):
+        if not confirmed:
+            return
+        pending = self.pending()
+        with state.state_lock:
+            settings = state.control_state["camera"]["settings"]
+            for param, value in confirmed.items():
+                if value is None:
+                    continue
+                settings["current"][param] = value
+                # Si no hay un valor más nuevo en cola, la UI refleja lo que la cámara aceptó
+                if param not in pending:
+                    settings["desired"][param] = value
+        if self.on_confirmed:
+            try:
+                self.on_confirmed(confirmed)
+            except Exception as e:
+                print(f"[worker] Warning: settings confirmation hook failed: {e}")
+
+settings_writer = SettingsWriter()
+
+# --- Funciones para el ciclo de vida del addon ---
 def start_worker():
-    """Inicia el hilo del worker. Se llama desde __init__.py en register()."""
-    global _worker_thread
-    if _worker_thread is None or not _worker_thread.is_alive():
-        _worker_thread = threading.Thread(target=_camera_command_worker, daemon=True)
-        _worker_thread.start()
-        print("[Zeta Motion] Worker asíncrono iniciado.")
+    """Inicia los hilos de los carriles. Se llama desde __init__.py en register()."""
+    global _running
+    _running = True
+    _get_lane(MAIN_LANE)
+    for lane in _all_lanes():
+        lane.start()
+    print("[Zeta Motion] Worker asíncrono iniciado.")
 
 def stop_worker():
-    """Envía la señal de apagado a la cola. Se llama desde __init__.py en unregister()."""
-    task_queue.put(None)
+    """Envía la señal de apagado a los carriles. Se llama desde __init__.py en unregister()."""
+    global _running
+    _running = False
+    for lane in _all_lanes():
+        lane.stop()
+    close_sessions()
     print("[Zeta Motion] Señal de apagado enviada al worker.")